@@ -0,0 +1,250 @@
+# adaptive_ocr.py - Confidence-driven multi-pass OCR
+#
+# A cheap first pass reads the whole image (downscaled, sparse-text PSM).
+# Later, more expensive passes only run when the result is not good
+# enough, and only where it is not: blocks below the target confidence
+# are re-read from padded crops of the colour image, while a pass that
+# found nothing or averaged below the minimum confidence is repeated over
+# the whole image. The controller stops as soon as every block meets the target.
+# Given a process pool, a pass with several escalation crops reads them in
+# parallel (preprocessing included); whole-image reads stay on the caller's thread.
+# Blocks still below the minimum confidence after the last pass are
+# dropped instead of being sent to the translator.
+#
+# Passes are configured as 'name:scale:profile:psm[:lang]', comma
+# separated, e.g. 'cheap:0.5:fast:11,full:1:request:6'. 'request' uses the
+# request's preprocessing profile; lang is a Tesseract language spec such
+# as 'eng+fra+deu' (the traineddata must be installed).
+import threading
+import time
+from contextlib import nullcontext
+
+import cv2
+import numpy as np
+import pytesseract
+
+from ocr import image_to_data, merge_overlapping_boxes, parse_tesseract_data
+from preprocessing import parse_profile, preprocess, rotate_boxes
+
+DEFAULT_PASSES = 'cheap:0.5:fast:11,full:1:request:11,accurate:1:accurate+deskew:6'
+
+MIN_SCALED_SIDE = 64  # Below this a downscaling pass reads the image at full size
+REGION_PADDING = 0.5  # Crop margin around a low-confidence block, as a share of its height
+MAX_REGION_COVERAGE = 0.5  # Escalate the whole image when the regions cover more than this
+
+
+class OcrPass:
+    """One OCR attempt: resolution, preprocessing profile, page segmentation mode and languages"""
+
+    def __init__(self, name, scale=1.0, profile='request', psm=None, lang='eng'):
+        self.name = name
+        self.scale = scale
+        self.profile = profile
+        self.psm = psm
+        self.lang = lang
+
+    def __repr__(self):
+        return f'<OcrPass {self.name} x{self.scale} {self.profile} psm={self.psm} {self.lang}>'
+
+    def spec(self):
+        """The pass as a 'name:scale:profile:psm:lang' entry"""
+        return f"{self.name}:{self.scale:g}:{self.profile}:{self.psm if self.psm is not None else ''}:{self.lang}"
+
+
+def parse_passes(spec):
+    """List of OcrPass from a spec like 'cheap:0.5:fast:11,full:1:request:6'; ValueError if malformed"""
+    passes = []
+    for entry in (spec or DEFAULT_PASSES).split(','):
+        fields = [field.strip() for field in entry.split(':')]
+        if not fields[0]:
+            continue
+        if len(fields) not in (4, 5):
+            raise ValueError(f"OCR pass '{entry}' must be name:scale:profile:psm[:lang]")
+        name, scale, profile, psm = fields[:4]
+        scale = float(scale)
+        if not 0 < scale <= 1:
+            raise ValueError(f"OCR pass '{name}': scale must be in (0, 1]")
+        if profile != 'request':
+            parse_profile(profile)
+        passes.append(OcrPass(name, scale, profile, int(psm) if psm else None,
+                              fields[4] if len(fields) == 5 and fields[4] else 'eng'))
+    if not passes:
+        raise ValueError('At least one OCR pass is required')
+    return passes
+
+
+class PassStats:
+    """Process-wide counters per pass, for /api/metrics"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.runs = {}  # pass -> times run
+        self.regions = {}  # pass -> crops (or whole images) read
+        self.improved = {}  # pass -> regions whose result it replaced
+        self.stops = {}  # pass -> requests that finished after it
+
+    def record(self, name, regions, improved):
+        with self._lock:
+            self.runs[name] = self.runs.get(name, 0) + 1
+            self.regions[name] = self.regions.get(name, 0) + regions
+            self.improved[name] = self.improved.get(name, 0) + improved
+
+    def record_stop(self, name):
+        with self._lock:
+            self.stops[name] = self.stops.get(name, 0) + 1
+
+    def samples(self):
+        """(name, type, help, labels, value) tuples for MetricsRegistry.expose"""
+        with self._lock:
+            return (
+                [('signboard_ocr_pass_runs_total', 'counter', 'Adaptive OCR passes run',
+                  {'pass': name}, count) for name, count in sorted(self.runs.items())]
+                + [('signboard_ocr_pass_regions_total', 'counter', 'Images or crops read by each adaptive OCR pass',
+                    {'pass': name}, count) for name, count in sorted(self.regions.items())]
+                + [('signboard_ocr_pass_improved_total', 'counter', 'Regions where a pass beat the earlier result',
+                    {'pass': name}, count) for name, count in sorted(self.improved.items())]
+                + [('signboard_ocr_pass_stops_total', 'counter', 'Requests whose OCR finished after this pass',
+                    {'pass': name}, count) for name, count in sorted(self.stops.items())]
+            )
+
+
+pass_stats = PassStats()
+
+
+def score(text_blocks, min_confidence):
+    """Confidence-weighted amount of usable text; garbage below min_confidence counts for nothing"""
+    return sum(block['confidence'] * len(block['text'])
+               for block in text_blocks if block['confidence'] >= min_confidence)
+
+
+def mean_confidence(text_blocks):
+    """Character-weighted mean confidence, 0 for no blocks"""
+    characters = sum(len(block['text']) for block in text_blocks)
+    if not characters:
+        return 0.0
+    return sum(block['confidence'] * len(block['text']) for block in text_blocks) / characters
+
+
+def read_region(image, ocr_pass, region, default_profile, backend, grouping, use_opencl=False):
+    """OCR one (x, y, w, h) region of a colour image with a pass's settings; boxes in image coordinates"""
+    x, y, w, h = region
+    return read_crop(image[y:y + h, x:x + w], x, y, ocr_pass, default_profile, backend, grouping, use_opencl)
+
+
+def _read_crop_task(crop, x, y, ocr_pass, default_profile, backend, grouping, tesseract_cmd):
+    """Process pool task: read_crop in a worker (CPU preprocessing; OpenCL contexts do not survive fork)"""
+    pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+    return read_crop(crop, x, y, ocr_pass, default_profile, backend, grouping)
+
+
+def read_crop(crop, x, y, ocr_pass, default_profile, backend, grouping, use_opencl=False):
+    """OCR a crop whose top-left corner is at (x, y) in the image; boxes in image coordinates"""
+    h, w = crop.shape[:2]
+    scale = ocr_pass.scale
+    if scale < 1 and min(w, h) * scale < MIN_SCALED_SIDE:
+        scale = 1.0
+    if scale < 1:
+        crop = cv2.resize(crop, (max(1, int(w * scale)), max(1, int(h * scale))), interpolation=cv2.INTER_AREA)
+    profile = default_profile if ocr_pass.profile == 'request' else ocr_pass.profile
+    binary, rotation = preprocess(crop, profile, use_opencl=use_opencl)
+    data = image_to_data(binary, psm=ocr_pass.psm, lang=ocr_pass.lang, backend=backend)
+    text_blocks = parse_tesseract_data(data, grouping=grouping)
+    if rotation is not None:
+        rotate_boxes(text_blocks, rotation)
+    for block in text_blocks:
+        if scale < 1:
+            block['x'], block['y'] = int(block['x'] / scale), int(block['y'] / scale)
+            block['width'], block['height'] = int(block['width'] / scale), int(block['height'] / scale)
+        block['x'] += x
+        block['y'] += y
+        block['ocr_pass'] = ocr_pass.name
+    return text_blocks
+
+
+def escalation_regions(text_blocks, width, height, target_confidence):
+    """Padded, merged (x, y, w, h) boxes around blocks below the target confidence
+
+    Returns None when the whole image should be read again instead.
+    """
+    boxes = []
+    for block in text_blocks:
+        if block['confidence'] >= target_confidence:
+            continue
+        pad = max(4, int(block['height'] * REGION_PADDING))
+        boxes.append([max(0, block['x'] - pad), max(0, block['y'] - pad),
+                      min(width, block['x'] + block['width'] + pad), min(height, block['y'] + block['height'] + pad)])
+    boxes = [box for box in merge_overlapping_boxes(boxes) if box[2] > box[0] and box[3] > box[1]]
+    covered = sum((x1 - x0) * (y1 - y0) for x0, y0, x1, y1 in boxes)
+    if covered > MAX_REGION_COVERAGE * width * height:
+        return None
+    return [(x0, y0, x1 - x0, y1 - y0) for x0, y0, x1, y1 in boxes]
+
+
+def inside(block, region):
+    """Whether a block's centre lies in an (x, y, w, h) region"""
+    x, y, w, h = region
+    cx, cy = block['x'] + block['width'] / 2, block['y'] + block['height'] / 2
+    return x <= cx < x + w and y <= cy < y + h
+
+
+def read_regions(image, ocr_pass, regions, default_profile, backend, grouping, use_opencl=False, pool=None):
+    """Text blocks for each region, in order; several regions are read in parallel on `pool` if given"""
+    if pool is None or len(regions) < 2:
+        return [read_region(image, ocr_pass, region, default_profile, backend, grouping, use_opencl)
+                for region in regions]
+    tesseract_cmd = pytesseract.pytesseract.tesseract_cmd
+    futures = [
+        pool.submit(_read_crop_task, np.ascontiguousarray(image[y:y + h, x:x + w]), x, y, ocr_pass,
+                    default_profile, backend, grouping, tesseract_cmd)
+        for x, y, w, h in regions
+    ]
+    return [future.result() for future in futures]
+
+
+def adaptive_ocr(image, passes, target_confidence=80, min_confidence=45, default_profile='balanced',
+                 backend='auto', grouping='line', use_opencl=False, timed=None, pool=None):
+    """Read a colour image with escalating OCR passes until the confidence target is met
+
+    `timed(stage)` is a context manager factory used to time each pass
+    (stage 'ocr:<pass name>'). `pool` is an optional process pool for
+    escalation crops. Returns (text blocks, per-pass log); each
+    block records the pass that produced it in block['ocr_pass'] and the
+    log has one dict per pass run with its region/block counts and time.
+    """
+    height, width = image.shape[:2]
+    whole = (0, 0, width, height)
+    text_blocks = None
+    log = []
+    for ocr_pass in passes:
+        if not text_blocks or mean_confidence(text_blocks) < min_confidence:
+            regions = [whole]
+        else:
+            regions = escalation_regions(text_blocks, width, height, target_confidence) or [whole]
+        start = time.perf_counter()
+        improved = 0
+        with timed(f'ocr:{ocr_pass.name}') if timed else nullcontext():
+            candidates = read_regions(image, ocr_pass, regions, default_profile, backend, grouping, use_opencl, pool)
+            for region, candidate in zip(regions, candidates):
+                if text_blocks is None:
+                    text_blocks = candidate
+                    continue
+                current = [block for block in text_blocks if inside(block, region)]
+                if score(candidate, min_confidence) > score(current, min_confidence):
+                    text_blocks = [block for block in text_blocks if not inside(block, region)] + candidate
+                    improved += 1
+        pass_stats.record(ocr_pass.name, len(regions), improved)
+        log.append({
+            'pass': ocr_pass.name,
+            'regions': len(regions),
+            'improved': improved,
+            'blocks': len(text_blocks),
+            'mean_confidence': round(mean_confidence(text_blocks), 2),
+            'seconds': round(time.perf_counter() - start, 4),
+        })
+        if text_blocks and all(block['confidence'] >= target_confidence for block in text_blocks):
+            break
+    pass_stats.record_stop(log[-1]['pass'])
+
+    text_blocks = [block for block in text_blocks if block['confidence'] >= min_confidence]
+    text_blocks.sort(key=lambda block: (block['y'], block['x']))
+    return text_blocks, log
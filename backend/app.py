@@ -1,45 +1,177 @@
 # app.py - Flask Backend for Signboard Translator with Database
-from flask import Flask, request, jsonify, session
+from flask import Flask, Response, g, request, jsonify, send_file, session, stream_with_context
 from flask_cors import CORS
 from flask_migrate import Migrate
 import cv2
 import numpy as np
 import pytesseract
-from googletrans import Translator
 import os
 from werkzeug.utils import secure_filename
 import base64
-from PIL import Image, ImageDraw, ImageFont
-import io
 import json
 import time
 import uuid
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from models import db, User, Translation, UserSession
+from models import db, User, Translation, TextBlock, UserSession, TranslationJob, SessionStats, SUMMARY_COLUMNS
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import load_only, selectinload
+from translators import chunk_texts, create_translator_backend
+from language_id import identify_blocks, reads_as
+from rendering import composite, layout_overlay, overlay_layer, vector_overlay
+from preprocessing import preprocess, profile_name, rotate_boxes
+from image_input import ImageRejected, SpooledRequest, decode_image, decode_plan, sniff_image, upload_size
+from translation_memory import TranslationMemory
+from result_cache import ResultCache, content_key
+from jobs import JobQueue
+from session_activity import SessionActivityBuffer
+from session_stats import reset_session_stats
+from search import install_search_index, search_translations
+from ocr import get_region_pool, ocr_full_image, ocr_regions
+from adaptive_ocr import adaptive_ocr, parse_passes, pass_stats
+from imaging import OcrTransform, normalize_for_ocr
+from blob_store import BlobStore, encode_array, encode_image
+from db_tuning import engine_options, install_sqlite_pragmas
+from metrics import registry, REQUEST_SECONDS, start_stage_timings, timed
 import pytesseract
 pytesseract.pytesseract.tesseract_cmd = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
 
 app = Flask(__name__)
+app.request_class = SpooledRequest  # File uploads spill to disk past UPLOAD_SPOOL_MAX_MEMORY
 CORS(app, supports_credentials=True)  # Enable CORS with credentials
 
 # Configuration
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'your-secret-key-change-in-production')
 app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///signboard_translator.db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+app.config['SQLITE_TUNING'] = os.environ.get('SQLITE_TUNING', '1') == '1'  # Apply the SQLite pragmas below
+app.config['SQLITE_JOURNAL_MODE'] = os.environ.get('SQLITE_JOURNAL_MODE', 'WAL')  # WAL lets readers run alongside the writer
+app.config['SQLITE_SYNCHRONOUS'] = os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')  # NORMAL is durable enough with WAL
+app.config['SQLITE_BUSY_TIMEOUT'] = int(os.environ.get('SQLITE_BUSY_TIMEOUT', 5000))  # Milliseconds to wait for a lock
+app.config['SQLITE_MMAP_SIZE'] = int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))  # Bytes of memory-mapped I/O
+app.config['DB_POOL_SIZE'] = int(os.environ.get('DB_POOL_SIZE', 5))  # Server databases only
+app.config['DB_MAX_OVERFLOW'] = int(os.environ.get('DB_MAX_OVERFLOW', 10))  # Extra connections above the pool size
+app.config['DB_POOL_TIMEOUT'] = int(os.environ.get('DB_POOL_TIMEOUT', 30))  # Seconds to wait for a free connection
+app.config['DB_POOL_RECYCLE'] = int(os.environ.get('DB_POOL_RECYCLE', 1800))  # Seconds before a connection is replaced
+app.config['DB_POOL_PRE_PING'] = os.environ.get('DB_POOL_PRE_PING', '1') == '1'  # Check connections before use
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config['SQLALCHEMY_DATABASE_URI'], app.config)
 UPLOAD_FOLDER = 'uploads'
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
-app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
+app.config['MAX_CONTENT_LENGTH'] = int(os.environ.get('MAX_CONTENT_LENGTH', 16 * 1024 * 1024))  # 16MB max request size
+app.config['UPLOAD_SPOOL_MAX_MEMORY'] = int(os.environ.get('UPLOAD_SPOOL_MAX_MEMORY', 1024 * 1024))  # Uploads above this are spooled to a temp file
+app.config['IMAGE_MAX_PIXELS'] = int(os.environ.get('IMAGE_MAX_PIXELS', 100 * 1000000))  # Declared resolution above this is rejected (413)
+app.config['IMAGE_DECODE_MAX_BYTES'] = int(os.environ.get('IMAGE_DECODE_MAX_BYTES', 100 * 1024 * 1024))  # Decoded frame budget; larger JPEGs decode at 1/2, 1/4 or 1/8
+app.config['TRANSLATION_BATCH_SIZE'] = int(os.environ.get('TRANSLATION_BATCH_SIZE', 50))  # Max texts per translator call
+app.config['TRANSLATION_BATCH_MAX_CHARS'] = int(os.environ.get('TRANSLATION_BATCH_MAX_CHARS', 4000))  # Max characters per translator call
+app.config['TRANSLATION_MEMORY_ENABLED'] = os.environ.get('TRANSLATION_MEMORY_ENABLED', '1') == '1'
+app.config['TRANSLATION_MEMORY_SIZE'] = int(os.environ.get('TRANSLATION_MEMORY_SIZE', 10000))  # In-process LRU entries
+app.config['TRANSLATION_MEMORY_TTL'] = int(os.environ.get('TRANSLATION_MEMORY_TTL', 3600))  # Seconds before re-reading from the DB
+app.config['TRANSLATION_ENGINE'] = os.environ.get('TRANSLATION_ENGINE', 'google_translate')  # 'google_translate', 'phrase_table' or 'marian' (both offline)
+app.config['LANGUAGE_ID_ENABLED'] = os.environ.get('LANGUAGE_ID_ENABLED', '1') == '1'  # Local language ID; skips blocks already in the target language
+app.config['LANGUAGE_ID_MIN_CONFIDENCE'] = float(os.environ.get('LANGUAGE_ID_MIN_CONFIDENCE', 0.6))  # Below this a block's language is unknown
+app.config['TRANSLATION_WARM_UP_LANGUAGES'] = [lang for lang in os.environ.get('TRANSLATION_WARM_UP_LANGUAGES', '').split(',') if lang]  # Target languages to load at startup
+app.config['PHRASE_TABLE_DIR'] = os.environ.get('PHRASE_TABLE_DIR', 'phrase_tables')  # <target>.tsv files for the phrase_table engine
+app.config['MARIAN_MODEL_TEMPLATE'] = os.environ.get('MARIAN_MODEL_TEMPLATE', 'Helsinki-NLP/opus-mt-{source}-{target}')  # Model name or local path per language pair
+app.config['MARIAN_SOURCE_LANGUAGE'] = os.environ.get('MARIAN_SOURCE_LANGUAGE', 'mul')  # 'mul' = multilingual source model, published for target 'en' only
+app.config['MARIAN_THREADS'] = int(os.environ.get('MARIAN_THREADS', 0)) or None  # torch threads per worker (default: torch's choice)
+app.config['OCR_MODE'] = os.environ.get('OCR_MODE', 'full')  # 'full', 'regions' (parallel per text region) or 'auto'; only with OCR_ADAPTIVE=0
+app.config['OCR_REGION_MIN_PIXELS'] = int(os.environ.get('OCR_REGION_MIN_PIXELS', 4000000))  # 'auto' uses regions above this
+app.config['OCR_BACKEND'] = os.environ.get('OCR_BACKEND', 'auto')  # 'tesserocr' (in-process), 'pytesseract' or 'auto'
+app.config['OCR_WORKERS'] = int(os.environ.get('OCR_WORKERS', os.cpu_count() or 2))  # Processes for region OCR and adaptive escalation crops
+app.config['OCR_GROUPING'] = os.environ.get('OCR_GROUPING', 'line')  # Text block unit: 'line', 'paragraph' or 'word'
+app.config['OCR_ADAPTIVE'] = os.environ.get('OCR_ADAPTIVE', '1') == '1'  # Escalating OCR passes (see adaptive_ocr.py); OCR_MODE applies when off
+app.config['OCR_PASSES'] = parse_passes(os.environ.get('OCR_PASSES'))  # name:scale:profile:psm[:lang],... cheapest first
+app.config['OCR_TARGET_CONFIDENCE'] = float(os.environ.get('OCR_TARGET_CONFIDENCE', 80))  # Stop escalating once every block reaches this
+app.config['OCR_MIN_CONFIDENCE'] = float(os.environ.get('OCR_MIN_CONFIDENCE', 45))  # Blocks below this after the last pass are dropped
+app.config['PREPROCESS_PROFILE'] = os.environ.get('PREPROCESS_PROFILE', 'balanced')  # fast, balanced or accurate, plus '+deskew'/'+denoise'; per request via preprocess_profile
+app.config['PREPROCESS_OPENCL'] = os.environ.get('PREPROCESS_OPENCL', '0') == '1'  # Run preprocessing on OpenCL (UMat) when available
+app.config['OCR_NORMALIZE'] = os.environ.get('OCR_NORMALIZE', '1') == '1'  # Downscale before preprocessing
+app.config['OCR_TARGET_TEXT_HEIGHT'] = int(os.environ.get('OCR_TARGET_TEXT_HEIGHT', 32))  # Character height in pixels to scale towards
+app.config['OCR_MAX_PIXELS'] = int(os.environ.get('OCR_MAX_PIXELS', 4000000))  # Pixel cap for the OCR input
+app.config['OCR_CROP_TO_TEXT'] = os.environ.get('OCR_CROP_TO_TEXT', '0') == '1'  # Crop to detected text regions first
+app.config['BATCH_MAX_IMAGES'] = int(os.environ.get('BATCH_MAX_IMAGES', 50))  # Images per batch request
+app.config['BATCH_MAX_BYTES'] = int(os.environ.get('BATCH_MAX_BYTES', 200 * 1024 * 1024))  # Uncompressed zip content per batch
+app.config['BATCH_WORKERS'] = int(os.environ.get('BATCH_WORKERS', os.cpu_count() or 2))  # Threads decoding/OCRing a batch
+app.config['RENDER_FOLDER'] = os.environ.get('RENDER_FOLDER', 'rendered')  # Blob store for rendered overlays
+app.config['RENDER_FORMAT'] = os.environ.get('RENDER_FORMAT', 'webp')  # 'webp', 'jpeg' or 'png'
+app.config['RENDER_QUALITY'] = int(os.environ.get('RENDER_QUALITY', 85))  # WebP/JPEG quality
+app.config['RENDER_PNG_COMPRESS_LEVEL'] = int(os.environ.get('RENDER_PNG_COMPRESS_LEVEL', 3))  # 0-9, PNG only
+app.config['RENDER_MODE'] = os.environ.get('RENDER_MODE', 'composite')  # 'composite' (photo + text), 'overlay' (transparent layer) or 'vector' (JSON only)
+app.config['RENDER_FONTS'] = tuple(os.environ.get('RENDER_FONTS', 'arial.ttf,DejaVuSans.ttf').split(','))  # Font faces, first that loads wins
+app.config['RENDER_MIN_FONT_SIZE'] = int(os.environ.get('RENDER_MIN_FONT_SIZE', 8))
+app.config['RENDER_MAX_FONT_SIZE'] = int(os.environ.get('RENDER_MAX_FONT_SIZE', 96))
+app.config['RENDER_CACHE_MAX_AGE'] = int(os.environ.get('RENDER_CACHE_MAX_AGE', 365 * 24 * 3600))  # Seconds
+app.config['STORE_STAGE_TIMINGS'] = os.environ.get('STORE_STAGE_TIMINGS', '1') == '1'  # Save per-stage breakdown on Translation rows
+app.config['PIPELINE_VERSION'] = '6'  # Bump whenever OCR/translation/rendering output changes
+app.config['RESULT_CACHE_ENABLED'] = os.environ.get('RESULT_CACHE_ENABLED', '1') == '1'
+app.config['RESULT_CACHE_MAX_ENTRIES'] = int(os.environ.get('RESULT_CACHE_MAX_ENTRIES', 1000))
+app.config['RESULT_CACHE_MAX_BYTES'] = int(os.environ.get('RESULT_CACHE_MAX_BYTES', 256 * 1024 * 1024))
+app.config['ASYNC_JOBS_ENABLED'] = os.environ.get('ASYNC_JOBS_ENABLED', '1') == '1'
+app.config['JOB_WORKERS'] = int(os.environ.get('JOB_WORKERS', os.cpu_count() or 2))  # Background worker processes
+app.config['JOB_QUEUE_DEPTH'] = int(os.environ.get('JOB_QUEUE_DEPTH', 100))  # Max queued + running jobs per web process
+app.config['JOB_RECOVERY_GRACE'] = float(os.environ.get('JOB_RECOVERY_GRACE', 60))  # Age in seconds after which jobs left by a stopped process are recovered
+app.config['JOB_TIMEOUT'] = float(os.environ.get('JOB_TIMEOUT', 120))  # Seconds per job once running
+app.config['JOB_EXECUTOR'] = os.environ.get('JOB_EXECUTOR', 'process')  # 'process' or 'thread'
+app.config['SESSION_ACTIVITY_FLUSH_INTERVAL'] = float(os.environ.get('SESSION_ACTIVITY_FLUSH_INTERVAL', 30))  # Max staleness of last_activity in seconds; 0 writes immediately
+app.config['JOB_POLL_INTERVAL'] = float(os.environ.get('JOB_POLL_INTERVAL', 0.5))  # Seconds between SSE status checks
 
 # Initialize database
 db.init_app(app)
 migrate = Migrate(app, db)
+with app.app_context():
+    install_sqlite_pragmas(db.engine, app.config)
 
 # Create upload directory if it doesn't exist
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
-# Initialize translator
-translator = Translator()
+# Initialize translator backend (swap via set_translator_backend, e.g. for offline tests)
+translator_backend = create_translator_backend(app.config['TRANSLATION_ENGINE'], app.config)
+if app.config['TRANSLATION_WARM_UP_LANGUAGES']:
+    translator_backend.warm_up(app.config['TRANSLATION_WARM_UP_LANGUAGES'])
+
+# Translation memory shared by all workers through the translation_memory table
+translation_memory = TranslationMemory(
+    max_size=app.config['TRANSLATION_MEMORY_SIZE'],
+    ttl=app.config['TRANSLATION_MEMORY_TTL']
+)
+
+# Rendered overlays, stored once per content hash
+blob_store = BlobStore(app.config['RENDER_FOLDER'])
+
+# Results of previously processed uploads, keyed by content hash
+result_cache = ResultCache(
+    max_entries=app.config['RESULT_CACHE_MAX_ENTRIES'],
+    max_bytes=app.config['RESULT_CACHE_MAX_BYTES'],
+    blob_store=blob_store
+)
+
+# Background job queue for async translations
+job_queue = JobQueue(app)
+
+# Session last_activity bumps, written in bulk every flush interval
+session_activity = SessionActivityBuffer(app)
+
+def set_translator_backend(backend):
+    """Replace the translation backend used by the pipeline"""
+    global translator_backend
+    translator_backend = backend
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+
+@app.after_request
+def record_request_duration(response):
+    if 'request_start' in g:
+        REQUEST_SECONDS.observe(
+            time.perf_counter() - g.request_start,
+            endpoint=request.endpoint or 'unknown',
+            method=request.method,
+            status=response.status_code
+        )
+    return response
 
 def get_or_create_session():
     """Get existing session or create new one"""
@@ -58,150 +190,581 @@ def get_or_create_session():
     return session['session_id']
 
 def update_session_activity():
-    """Update last activity timestamp"""
+    """Update last activity timestamp (buffered, see session_activity.py)"""
     if 'session_id' in session:
-        user_session = UserSession.query.filter_by(session_id=session['session_id']).first()
-        if user_session:
-            user_session.last_activity = datetime.utcnow()
-            db.session.commit()
+        session_activity.touch(session['session_id'])
 
 def allowed_file(filename):
     """Check if file extension is allowed"""
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
-def preprocess_image(image):
-    """Preprocess image for better OCR results"""
-    # Convert to grayscale
-    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-    
-    # Apply Gaussian blur to reduce noise
-    blurred = cv2.GaussianBlur(gray, (5, 5), 0)
-    
-    # Apply adaptive thresholding
-    thresh = cv2.adaptiveThreshold(
-        blurred, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2
+def prepare_ocr_input(image):
+    """Downscale/crop the decoded image for OCR according to the app config"""
+    if not app.config['OCR_NORMALIZE']:
+        return image, OcrTransform()
+    return normalize_for_ocr(
+        image,
+        target_text_height=app.config['OCR_TARGET_TEXT_HEIGHT'],
+        max_pixels=app.config['OCR_MAX_PIXELS'],
+        crop_to_text=app.config['OCR_CROP_TO_TEXT']
     )
-    
-    # Morphological operations to clean up the image
-    kernel = np.ones((2, 2), np.uint8)
-    cleaned = cv2.morphologyEx(thresh, cv2.MORPH_CLOSE, kernel)
-    
-    return cleaned
 
-def extract_text_with_positions(image):
-    """Extract text and their positions from image using OCR"""
+def check_image_budget(source):
+    """Sniff an upload's header and check it against the pixel/memory budgets; raises ImageRejected"""
+    return decode_plan(sniff_image(source), app.config['IMAGE_MAX_PIXELS'], app.config['IMAGE_DECODE_MAX_BYTES'])
+
+def decode_upload(file_content):
+    """Decode uploaded bytes or an upload file within the configured budgets; raises ImageRejected"""
+    image, _, _ = decode_image(file_content, app.config['IMAGE_MAX_PIXELS'], app.config['IMAGE_DECODE_MAX_BYTES'])
+    return image
+
+def preprocess_image(image, profile=None):
+    """Preprocess image for better OCR results
+
+    Returns (binary image, inverse deskew rotation or None); the image is
+    a per-thread buffer, valid until this thread preprocesses again.
+    """
+    return preprocess(image, profile or app.config['PREPROCESS_PROFILE'], use_opencl=app.config['PREPROCESS_OPENCL'])
+
+def extract_text_with_positions(image, failures=None):
+    """Extract text and their positions from image using OCR
+
+    On an OCR error no blocks are returned and 'ocr' is appended to
+    `failures`, if given.
+    """
     try:
-        # Get detailed data including bounding boxes
-        data = pytesseract.image_to_data(image, output_type=pytesseract.Output.DICT)
-        
-        text_blocks = []
-        for i in range(len(data['text'])):
-            if int(data['conf'][i]) > 1:  # Confidence threshold
-                text = data['text'][i].strip()
-                if text and len(text) > 1:  # Only process non-empty text with more than 1 character
-                    text_blocks.append({
-                        'text': text,
-                        'x': data['left'][i],
-                        'y': data['top'][i],
-                        'width': data['width'][i],
-                        'height': data['height'][i],
-                        'confidence': data['conf'][i]
-                    })
-        
-        return text_blocks
+        height, width = image.shape[:2]
+        mode = app.config['OCR_MODE']
+        if mode == 'auto':
+            mode = 'regions' if height * width >= app.config['OCR_REGION_MIN_PIXELS'] else 'full'
+        
+        backend = app.config['OCR_BACKEND']
+        grouping = app.config['OCR_GROUPING']
+        if mode == 'regions':
+            return ocr_regions(image, backend=backend, workers=app.config['OCR_WORKERS'], grouping=grouping)
+        return ocr_full_image(image, backend=backend, grouping=grouping)
     except Exception as e:
         print(f"OCR Error: {e}")
+        if failures is not None:
+            failures.append('ocr')
         return []
 
-def translate_text(text, target_language='en'):
-    """Translate text to target language"""
+def extract_text_adaptive(image, timings=None, profile=None, failures=None):
+    """OCR a colour image with the configured escalating passes (see adaptive_ocr.py)"""
     try:
-        if not text.strip():
-            return text
-        
-        # Skip translation if text is too short or contains only numbers/symbols
-        if len(text.strip()) < 2 or text.isdigit():
-            return text
-            
-        print(f"Translating: '{text}' to {target_language}")
-        
-        # Detect source language and translate
-        result = translator.translate(text, dest=target_language)
-        
-        print(f"Translation result: '{result.text}' (detected: {result.src})")
-        
-        # If source and destination are the same, return original
-        if result.src == target_language:
-            return text
-            
-        return result.text
+        text_blocks, passes = adaptive_ocr(
+            image,
+            app.config['OCR_PASSES'],
+            target_confidence=app.config['OCR_TARGET_CONFIDENCE'],
+            min_confidence=app.config['OCR_MIN_CONFIDENCE'],
+            default_profile=profile or app.config['PREPROCESS_PROFILE'],
+            backend=app.config['OCR_BACKEND'],
+            grouping=app.config['OCR_GROUPING'],
+            use_opencl=app.config['PREPROCESS_OPENCL'],
+            timed=lambda stage: timed(stage, timings),
+            pool=get_region_pool(app.config['OCR_WORKERS']) if app.config['OCR_WORKERS'] > 1 else None
+        )
     except Exception as e:
-        print(f"Translation Error for '{text}': {e}")
-        return text  # Return original text if translation fails
-print("Using database:", app.config['SQLALCHEMY_DATABASE_URI'])
+        print(f"OCR Error: {e}")
+        if failures is not None:
+            failures.append('ocr')
+        return []
+    print("OCR passes: " + ', '.join(
+        f"{p['pass']} ({p['regions']} regions, {p['blocks']} blocks, conf {p['mean_confidence']}, {p['seconds']}s)"
+        for p in passes
+    ))
+    return text_blocks
 
-def create_translated_image(original_image, text_blocks):
-    """Create image with translated text overlaid"""
-    try:
-        # Convert OpenCV image to PIL
-        if len(original_image.shape) == 3:
-            image_rgb = cv2.cvtColor(original_image, cv2.COLOR_BGR2RGB)
+def needs_translation(text):
+    """Check whether a text should be sent to the translator at all"""
+    text = text.strip()
+    # Skip translation if text is too short or contains only numbers/symbols
+    return len(text) >= 2 and not text.isdigit()
+
+def identify_languages(text_blocks):
+    """Label each block's language locally and return the request's detected language"""
+    if not app.config['LANGUAGE_ID_ENABLED'] or not text_blocks:
+        return None
+    with timed('language_id'):
+        return identify_blocks(text_blocks, app.config['LANGUAGE_ID_MIN_CONFIDENCE'])
+
+def in_target_language(block, target_language):
+    """True if the block is already in the target language ('zh' matches 'zh-cn')
+
+    Either its own language detection says so, or, when the block was too
+    short to detect, it consists only of common sign words of the target.
+    """
+    if not app.config['LANGUAGE_ID_ENABLED']:
+        return False
+    target = target_language.split('-')[0].lower()
+    language = block.get('language')
+    if language:
+        return language == target
+    return reads_as(block['text'], target)
+
+def iter_translations(texts, target_language='en', failures=None):
+    """Translate texts batch by batch, yielding {text: translation} as each batch lands
+
+    Distinct texts are sent to the backend in size-bounded batches. Texts
+    that need no translation and translation memory hits come first; texts
+    that fail to translate are yielded unchanged, and 'translate' is
+    appended to `failures`, if given, for each failed batch.
+    """
+    ready = {}
+    pending = []
+    seen = set()
+    for text in texts:
+        if text in seen:
+            continue
+        seen.add(text)
+        if needs_translation(text):
+            pending.append(text)
         else:
-            image_rgb = cv2.cvtColor(original_image, cv2.COLOR_GRAY2RGB)
-        
-        pil_image = Image.fromarray(image_rgb)
-        draw = ImageDraw.Draw(pil_image)
-        
-        # Try to use a font, fallback to default if not available
+            ready[text] = text
+
+    # Serve repeated strings from the translation memory without a network call
+    if pending and app.config['TRANSLATION_MEMORY_ENABLED']:
+        cached = translation_memory.get_many(pending, target_language, translator_backend.name)
+        ready.update(cached)
+        pending = [text for text in pending if text not in cached]
+
+    if ready:
+        yield ready
+
+    for chunk in chunk_texts(pending,
+                             max_items=app.config['TRANSLATION_BATCH_SIZE'],
+                             max_chars=app.config['TRANSLATION_BATCH_MAX_CHARS']):
         try:
-            font = ImageFont.truetype("arial.ttf", 20)
-        except:
-            font = ImageFont.load_default()
-        
-        for block in text_blocks:
-            if block.get('translated_text') and block['translated_text'] != block['text']:
-                x, y = block['x'], block['y']
-                width, height = block['width'], block['height']
-                
-                # Create background rectangle for better readability
-                draw.rectangle(
-                    [x-2, y-2, x + width + 2, y + height + 2], 
-                    fill='white', 
-                    outline='black'
-                )
-                
-                # Draw translated text
-                draw.text(
-                    (x, y), 
-                    block['translated_text'], 
-                    fill='black', 
-                    font=font
-                )
+            print(f"Translating batch of {len(chunk)} texts to {target_language}")
+            with timed('translate'):
+                results = translator_backend.translate_batch(chunk, target_language)
+            translated_chunk = {}
+            for text, result in zip(chunk, results):
+                # Keep the original when the backend says this line is already in the target language;
+                # backends that only know a batch-level language report src=None and are taken at their text
+                translated_chunk[text] = text if result.src == target_language else result.text
+        except Exception as e:
+            print(f"Translation Error for batch {chunk}: {e}")
+            if failures is not None:
+                failures.append('translate')
+            yield {text: text for text in chunk}  # Return original text if translation fails
+            continue
         
-        return pil_image
+        if app.config['TRANSLATION_MEMORY_ENABLED']:
+            # A failed write only loses the cache entry, never the translation
+            try:
+                translation_memory.put_many(
+                    translated_chunk, target_language, translator_backend.name,
+                    detected_languages={text: result.src for text, result in zip(chunk, results)}
+                )
+            except Exception as e:
+                print(f"Translation memory write failed: {e}")
+        yield translated_chunk
+
+def translate_texts(texts, target_language='en', failures=None):
+    """Translate a list of texts using as few translator calls as possible
+
+    Results are mapped back onto the input order.
+    """
+    translations = {}
+    for translated_chunk in iter_translations(texts, target_language, failures):
+        translations.update(translated_chunk)
+    return [translations.get(text, text) for text in texts]
+
+def translate_text(text, target_language='en'):
+    """Translate text to target language"""
+    return translate_texts([text], target_language)[0]
+
+print("Using database:", app.config['SQLALCHEMY_DATABASE_URI'])
+
+def overlay_elements(text_blocks):
+    """Fitted boxes and text for the translated blocks"""
+    return layout_overlay(text_blocks, app.config['RENDER_FONTS'],
+                          min_size=app.config['RENDER_MIN_FONT_SIZE'], max_size=app.config['RENDER_MAX_FONT_SIZE'])
+
+def create_translated_image(original_image, text_blocks):
+    """Render translations for the configured RENDER_MODE, one box per text block (line)
+
+    'composite' draws onto original_image in place and returns the BGR
+    array; 'overlay' returns a transparent RGBA PIL image of the same size;
+    'vector' renders nothing and returns None (see overlay_description).
+    """
+    try:
+        mode = app.config['RENDER_MODE']
+        if mode == 'vector':
+            return None
+        elements = overlay_elements(text_blocks)
+        height, width = original_image.shape[:2]
+        if mode == 'overlay':
+            return overlay_layer(width, height, elements)
+        if original_image.ndim == 2:
+            original_image = cv2.cvtColor(original_image, cv2.COLOR_GRAY2BGR)
+        return composite(original_image, elements)
     except Exception as e:
         print(f"Image creation error: {e}")
         return None
 
+def overlay_description(image_dimensions, text_blocks):
+    """Vector overlay for the response in RENDER_MODE 'vector', otherwise None"""
+    if app.config['RENDER_MODE'] != 'vector' or not image_dimensions:
+        return None
+    width, height = (int(value) for value in image_dimensions.split('x'))
+    return vector_overlay(width, height, overlay_elements(text_blocks))
+
+def extract_text_blocks(original_image, timings=None, profile=None, failures=None):
+    """Normalise, preprocess and OCR a decoded image
+
+    Returns text blocks in original image coordinates. Stage times go to
+    the metrics histograms and to `timings` (or the current request's
+    breakdown); an OCR error is recorded in `failures`.
+
+    This is the pipeline's only OCR entry point, for adaptive and
+    single-pass OCR alike, so harnesses that replace OCR (the load test)
+    patch this function.
+    """
+    with timed('normalize', timings):
+        # Bring the image down to the resolution OCR needs; boxes are mapped back below
+        ocr_input, ocr_transform = prepare_ocr_input(original_image)
+    
+    if app.config['OCR_ADAPTIVE']:
+        # Each pass preprocesses what it reads, timed as stage 'ocr:<pass>'
+        text_blocks = extract_text_adaptive(ocr_input, timings, profile, failures)
+        return ocr_transform.to_original(text_blocks)
+
+    with timed('preprocess', timings):
+        # Preprocess image for better OCR
+        processed_image, rotation = preprocess_image(ocr_input, profile)
+    
+    with timed('ocr', timings):
+        # Extract text with positions
+        text_blocks = extract_text_with_positions(processed_image, failures)
+        if rotation is not None:
+            rotate_boxes(text_blocks, rotation)
+        text_blocks = ocr_transform.to_original(text_blocks)
+    return text_blocks
+
+def store_rendered_image(image):
+    """Encode a rendered image (BGR array or PIL overlay layer) with the configured format and store it
+
+    Returns the blob store key, or None when there is no image.
+    """
+    if image is None:
+        return None
+    image_format = app.config['RENDER_FORMAT']
+    with timed('encode'):
+        if isinstance(image, np.ndarray):
+            data, extension = encode_array(
+                image,
+                image_format=image_format,
+                quality=app.config['RENDER_QUALITY'],
+                png_compress_level=app.config['RENDER_PNG_COMPRESS_LEVEL']
+            )
+        else:
+            data, extension = encode_image(
+                image,
+                image_format='png' if image_format == 'jpeg' else image_format,  # Keep the alpha channel
+                quality=app.config['RENDER_QUALITY'],
+                png_compress_level=app.config['RENDER_PNG_COMPRESS_LEVEL']
+            )
+    with timed('blob_store'):
+        return blob_store.put(data, extension)
+
+def rendered_image_url(image_key):
+    """URL the rendered image is served from"""
+    return f'/api/images/{image_key}' if image_key else None
+
+def ocr_version():
+    """The OCR settings that shape a result: the adaptive passes and thresholds, or OCR_MODE"""
+    if app.config['OCR_ADAPTIVE']:
+        passes = ','.join(ocr_pass.spec() for ocr_pass in app.config['OCR_PASSES'])
+        ocr = f"adaptive[{passes}]:{app.config['OCR_TARGET_CONFIDENCE']:g}:{app.config['OCR_MIN_CONFIDENCE']:g}"
+    else:
+        ocr = app.config['OCR_MODE']
+    return f"{ocr}:{app.config['OCR_GROUPING']}"
+
+def result_version(preprocess_profile=None):
+    """Pipeline version plus everything else that shapes a result, so cached results never cross them"""
+    profile = profile_name(preprocess_profile or app.config['PREPROCESS_PROFILE'])
+    return (f"{app.config['PIPELINE_VERSION']}:{translator_backend.name}:{app.config['RENDER_MODE']}:{profile}:"
+            f"{ocr_version()}")
+
+def stored_stage_timings(timings):
+    """Per-stage breakdown to save on the Translation row, if enabled"""
+    if not app.config['STORE_STAGE_TIMINGS']:
+        return None
+    return {stage: round(seconds, 4) for stage, seconds in timings.items()}
+
+def record_cached_translation(cached, content_hash, filename, file_size, session_id, start_time):
+    """Record a history entry pointing at a cached result and return its response body"""
+    text_blocks = cached['text_blocks']
+    original_texts = [block['text'] for block in text_blocks]
+    translated_texts = [block.get('translated_text', block['text']) for block in text_blocks]
+    detected_language = identify_languages(text_blocks)
+    
+    translation_record = Translation.create_from_result(
+        filename=filename,
+        file_size=file_size,
+        dimensions=cached['image_dimensions'],
+        text_blocks=text_blocks,
+        processing_time=time.time() - start_time,
+        session_id=session_id,
+        content_hash=content_hash,
+        image_key=cached['image_key'],
+        translation_engine=translator_backend.name,
+        detected_language=detected_language
+    )
+    db.session.add(translation_record)
+    with timed('db_commit'):
+        db.session.commit()
+    
+    if not text_blocks:
+        return {
+            'message': 'No text detected in the image',
+            'translation_id': translation_record.id,
+            'original_texts': [],
+            'translated_texts': [],
+            'processed_image_url': None,
+            'cached': True
+        }
+    
+    return {
+        'message': 'Translation completed successfully',
+        'translation_id': translation_record.id,
+        'original_texts': original_texts,
+        'translated_texts': translated_texts,
+        'text_blocks': text_blocks,
+        'processed_image_url': rendered_image_url(cached['image_key']),
+        'render_mode': app.config['RENDER_MODE'],
+        'overlay': overlay_description(cached['image_dimensions'], text_blocks),
+        'processing_time': round(time.time() - start_time, 2),
+        'cached': True
+    }
+
+def run_pipeline(file_content, original_filename, target_language, session_id, start_time=None,
+                 preprocess_profile=None):
+    """Run the OCR -> translate -> render -> DB pipeline on uploaded image bytes or an upload file
+
+    A file (the spooled request upload) is hashed in chunks and decoded in
+    place, so the encoded body is never held as one bytes object.
+
+    Generator of (event, data) tuples so callers can report progress:
+    'ocr' once text blocks are extracted, 'translation' for every block as
+    its translation lands, 'image' with the rendered overlay, then 'done'
+    with the full response body. Input problems end the stream with an
+    'error' event carrying the message and HTTP status.
+    """
+    start_time = start_time or time.time()
+    file_size = upload_size(file_content)
+    stage_timings = start_stage_timings()
+    failures = []  # Stages that degraded; such results are not cached
+    
+    # Return the stored result if these exact bytes were processed before
+    content_hash = content_key(file_content, target_language, result_version(preprocess_profile))
+    if app.config['RESULT_CACHE_ENABLED']:
+        with timed('result_cache'):
+            cached = result_cache.get(content_hash)
+        if cached is not None:
+            print(f"Result cache hit: {content_hash[:12]}")
+            result = record_cached_translation(
+                cached, content_hash, original_filename, file_size, session_id, start_time
+            )
+            text_blocks = result.get('text_blocks', [])
+            yield 'ocr', {'image_dimensions': cached['image_dimensions'], 'text_blocks': text_blocks}
+            for i, block in enumerate(text_blocks):
+                yield 'translation', {'index': i, 'text': block['text'],
+                                      'translated_text': block.get('translated_text', block['text'])}
+            yield 'image', {'processed_image_url': result['processed_image_url'], 'overlay': result.get('overlay')}
+            yield 'done', result
+            return
+    
+    # Read image (oversized JPEGs are reduced while decoding)
+    try:
+        with timed('decode'):
+            original_image = decode_upload(file_content)
+    except ImageRejected as e:
+        yield 'error', {'error': e.message, 'status': e.status}
+        return
+    
+    # Get image dimensions
+    height, width = original_image.shape[:2]
+    image_dimensions = f"{width}x{height}"
+    
+    print(f"Processing image: {original_filename} ({image_dimensions})")
+    
+    # Normalise, preprocess and OCR; boxes come back in original image coordinates
+    text_blocks = extract_text_blocks(original_image, profile=preprocess_profile, failures=failures)
+    print(f"Extracted {len(text_blocks)} text blocks")
+    yield 'ocr', {'image_dimensions': image_dimensions, 'text_blocks': text_blocks}
+    
+    if not text_blocks:
+        # Save translation record even if no text found
+        translation_record = Translation.create_from_result(
+            filename=original_filename,
+            file_size=file_size,
+            dimensions=image_dimensions,
+            text_blocks=[],
+            processing_time=time.time() - start_time,
+            session_id=session_id,
+            content_hash=content_hash,
+            translation_engine=translator_backend.name,
+            stage_timings=stored_stage_timings(stage_timings)
+        )
+        db.session.add(translation_record)
+        if app.config['RESULT_CACHE_ENABLED'] and not failures:
+            result_cache.put(content_hash, [], image_dimensions=image_dimensions)
+        with timed('db_commit'):
+            db.session.commit()
+        
+        yield 'done', {
+            'message': 'No text detected in the image',
+            'translation_id': translation_record.id,
+            'original_texts': [],
+            'translated_texts': [],
+            'processed_image_url': None
+        }
+        return
+    
+    # Print original texts
+    original_texts = [block['text'] for block in text_blocks]
+    print(f"Original texts: {original_texts}")
+    
+    # Blocks already in the target language are kept as they are, without a translator call
+    detected_language = identify_languages(text_blocks)
+    blocks_by_text = {}
+    for i, block in enumerate(text_blocks):
+        if in_target_language(block, target_language):
+            block['translated_text'] = block['text']
+            yield 'translation', {'index': i, 'text': block['text'], 'translated_text': block['text']}
+        else:
+            blocks_by_text.setdefault(block['text'], []).append(i)
+    print(f"Detected language: {detected_language}")
+    
+    # Translate the remaining text blocks in as few translator calls as possible
+    for translated_chunk in iter_translations(list(blocks_by_text), target_language, failures):
+        for text, translated in translated_chunk.items():
+            for i in blocks_by_text.get(text, []):
+                text_blocks[i]['translated_text'] = translated
+                print(f"Block {i+1}: '{text}' -> '{translated}'")
+                yield 'translation', {'index': i, 'text': text, 'translated_text': translated}
+    translated_texts = [block.setdefault('translated_text', block['text']) for block in text_blocks]
+    
+    print(f"Final - Original: {original_texts}")
+    print(f"Final - Translated: {translated_texts}")
+    
+    # Create image with translations
+    with timed('render'):
+        result_image = create_translated_image(original_image, text_blocks)
+    
+    # Store the encoded image once; the response only carries its URL
+    image_key = store_rendered_image(result_image)
+    overlay = overlay_description(image_dimensions, text_blocks)
+    yield 'image', {'processed_image_url': rendered_image_url(image_key), 'overlay': overlay}
+    
+    # Save translation to database
+    translation_record = Translation.create_from_result(
+        filename=original_filename,
+        file_size=file_size,
+        dimensions=image_dimensions,
+        text_blocks=text_blocks,
+        processing_time=time.time() - start_time,
+        session_id=session_id,
+        content_hash=content_hash,
+        image_key=image_key,
+        translation_engine=translator_backend.name,
+        detected_language=detected_language,
+        stage_timings=stored_stage_timings(stage_timings)
+    )
+    db.session.add(translation_record)
+    if app.config['RESULT_CACHE_ENABLED'] and not failures:
+        result_cache.put(content_hash, text_blocks,
+                         image_dimensions=image_dimensions, image_key=image_key)
+    elif failures:
+        print(f"Not caching degraded result ({', '.join(sorted(set(failures)))} failed)")
+    with timed('db_commit'):
+        db.session.commit()
+    
+    yield 'done', {
+        'message': 'Translation completed successfully',
+        'translation_id': translation_record.id,
+        'original_texts': original_texts,
+        'translated_texts': translated_texts,
+        'text_blocks': text_blocks,
+        'processed_image_url': rendered_image_url(image_key),
+        'render_mode': app.config['RENDER_MODE'],
+        'overlay': overlay,
+        'processing_time': round(time.time() - start_time, 2)
+    }
+
+def process_upload(file_content, original_filename, target_language, session_id, start_time=None,
+                   preprocess_profile=None):
+    """Run the whole pipeline and return a (response body, HTTP status) tuple
+
+    Used by the synchronous endpoint and by background job workers.
+    """
+    for event, data in run_pipeline(file_content, original_filename, target_language, session_id, start_time,
+                                    preprocess_profile):
+        if event == 'done':
+            return data, 200
+        if event == 'error':
+            return {'error': data['error']}, data['status']
+    return {'error': 'Processing failed: pipeline ended without a result'}, 500
+
+def read_translate_upload():
+    """Validate the uploaded image in the current request
+
+    Returns (file, None) or (None, (error body, HTTP status)).
+    """
+    # Check if image is provided
+    if 'image' not in request.files:
+        return None, ({'error': 'No image file provided'}, 400)
+    
+    file = request.files['image']
+    
+    if file.filename == '':
+        return None, ({'error': 'No file selected'}, 400)
+    
+    if not allowed_file(file.filename):
+        return None, ({'error': 'Invalid file type'}, 400)
+    
+    # Refuse unusable or oversized images from the header, before reading the body
+    try:
+        check_image_budget(file.stream)
+    except ImageRejected as e:
+        return None, ({'error': e.message}, e.status)
+    
+    return file, None
+
+def read_preprocess_profile():
+    """The preprocess_profile requested (form field or query string), canonicalised
+
+    Returns (profile or None for the server default, None) or (None, (error body, HTTP status)).
+    """
+    requested = request.values.get('preprocess_profile')
+    if not requested:
+        return None, None
+    try:
+        return profile_name(requested), None
+    except ValueError as e:
+        return None, ({'error': str(e)}, 400)
+
 @app.route('/api/translate', methods=['POST'])
 def translate_image():
-    """Main endpoint to process and translate image"""
+    """Main endpoint to process and translate image
+
+    With `async=1` (form field or query string) the upload is queued and a
+    job id is returned immediately; poll /api/jobs/<job_id> for the result.
+    """
     start_time = time.time()
     session_id = get_or_create_session()
     update_session_activity()
     
     try:
-        # Check if image is provided
-        if 'image' not in request.files:
-            return jsonify({'error': 'No image file provided'}), 400
-        
-        file = request.files['image']
-        
-        if file.filename == '':
-            return jsonify({'error': 'No file selected'}), 400
-        
-        if not allowed_file(file.filename):
-            return jsonify({'error': 'Invalid file type'}), 400
+        file, error = read_translate_upload()
+        if error:
+            return jsonify(error[0]), error[1]
+        preprocess_profile, error = read_preprocess_profile()
+        if error:
+            return jsonify(error[0]), error[1]
         
         # Get target language from request (default to English)
         target_language = request.form.get('target_language', 'en')
@@ -209,114 +772,386 @@ def translate_image():
         
         # Get file info
         original_filename = secure_filename(file.filename)
-        file_content = file.read()
-        file_size = len(file_content)
-        
-        # Read image
-        file_bytes = np.frombuffer(file_content, np.uint8)
-        original_image = cv2.imdecode(file_bytes, cv2.IMREAD_COLOR)
-        
-        if original_image is None:
-            return jsonify({'error': 'Invalid image file'}), 400
         
-        # Get image dimensions
-        height, width = original_image.shape[:2]
-        image_dimensions = f"{width}x{height}"
-        
-        print(f"Processing image: {original_filename} ({image_dimensions})")
-        
-        # Preprocess image for better OCR
-        processed_image = preprocess_image(original_image)
-        
-        # Extract text with positions
-        text_blocks = extract_text_with_positions(processed_image)
-        print(f"Extracted {len(text_blocks)} text blocks")
-        
-        if not text_blocks:
-            # Save translation record even if no text found
-            translation_record = Translation.create_from_result(
-                filename=original_filename,
-                file_size=file_size,
-                dimensions=image_dimensions,
-                original_texts=[],
-                translated_texts=[],
-                confidence_scores=[],
-                processing_time=time.time() - start_time,
-                session_id=session_id
-            )
-            db.session.add(translation_record)
-            db.session.commit()
-            
+        if request.values.get('async') in ('1', 'true'):
+            if not app.config['ASYNC_JOBS_ENABLED']:
+                return jsonify({'error': 'Async mode is disabled'}), 400
+            job = job_queue.submit(file.stream, original_filename, target_language, session_id, preprocess_profile)
+            if job is None:
+                return jsonify({'error': 'Job queue is full, try again later'}), 503
             return jsonify({
-                'message': 'No text detected in the image',
-                'translation_id': translation_record.id,
-                'original_texts': [],
-                'translated_texts': [],
-                'processed_image': None
-            })
+                'message': 'Translation job queued',
+                'job_id': job.id,
+                'status': job.status,
+                'status_url': f'/api/jobs/{job.id}',
+                'events_url': f'/api/jobs/{job.id}/events'
+            }), 202
         
-        # Print original texts
-        original_texts = [block['text'] for block in text_blocks]
-        print(f"Original texts: {original_texts}")
+        result, status = process_upload(file.stream, original_filename, target_language, session_id, start_time,
+                                        preprocess_profile)
+        return jsonify(result), status
         
-        # Translate each text block
-        translated_texts = []
-        for i, block in enumerate(text_blocks):
-            original_text = block['text']
-            translated = translate_text(original_text, target_language)
-            block['translated_text'] = translated
-            translated_texts.append(translated)
-            print(f"Block {i+1}: '{original_text}' -> '{translated}'")
+    except Exception as e:
+        print(f"Error in translate_image: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({'error': f'Processing failed: {str(e)}'}), 500
+
+def iter_batch_uploads(files):
+    """Yield (filename, bytes) for every image in the uploaded files
+
+    Zip archives are expanded; members with unsupported extensions are
+    skipped. Other unsupported files yield None as content so they are
+    reported back as errors.
+    """
+    remaining_bytes = app.config['BATCH_MAX_BYTES']
+    for file in files:
+        if file.filename == '':
+            continue
+        filename = secure_filename(file.filename)
+        if filename.lower().endswith('.zip'):
+            with zipfile.ZipFile(file.stream) as archive:
+                for info in archive.infolist():
+                    if info.is_dir() or not allowed_file(info.filename):
+                        continue
+                    # Check declared sizes before inflating anything
+                    remaining_bytes -= info.file_size
+                    if remaining_bytes < 0:
+                        raise ValueError('Batch archive is too large')
+                    yield secure_filename(os.path.basename(info.filename)), archive.read(info)
+        elif allowed_file(filename):
+            yield filename, file.read()
+        else:
+            yield filename, None
+
+def ocr_batch_item(file_content, preprocess_profile=None):
+    """Decode and OCR one batch image; returns (dimensions, text_blocks, timings, failures)"""
+    timings = {}
+    failures = []
+    try:
+        with timed('decode', timings):
+            image = decode_upload(file_content)
+    except ImageRejected:
+        return None, None, timings, failures
+    height, width = image.shape[:2]
+    return f"{width}x{height}", extract_text_blocks(image, timings, preprocess_profile, failures), timings, failures
+
+def render_batch_item(file_content, text_blocks):
+    """Re-decode one batch image, render and store its overlay; returns (image key, timings)
+
+    Images are decoded again rather than kept from the OCR stage so a
+    large batch never holds every full-resolution frame in memory.
+    """
+    timings = {}
+    # Timed apart from the OCR-side 'decode' so batch stage totals do not count decoding twice
+    with timed('render_decode', timings):
+        image = decode_upload(file_content)  # Same budget, so the same (possibly reduced) frame OCR saw
+    
+    with timed('render', timings):
+        result_image = create_translated_image(image, text_blocks)
+    
+    stage_start = time.perf_counter()
+    image_key = store_rendered_image(result_image)
+    timings['encode'] = time.perf_counter() - stage_start
+    return image_key, timings
+
+@app.route('/api/translate/batch', methods=['POST'])
+def translate_batch():
+    """Translate many images in one request
+
+    Accepts several `images` files and/or zip archives of images. Images
+    are decoded and OCRed concurrently, translation strings are
+    deduplicated across the whole batch and sent through one translation
+    pass, and all history rows are written in a single commit.
+    """
+    start_time = time.time()
+    session_id = get_or_create_session()
+    update_session_activity()
+    
+    try:
+        files = request.files.getlist('images') + request.files.getlist('image')
+        if not files:
+            return jsonify({'error': 'No image files provided'}), 400
+        preprocess_profile, error = read_preprocess_profile()
+        if error:
+            return jsonify(error[0]), error[1]
         
-        print(f"Final - Original: {original_texts}")
-        print(f"Final - Translated: {translated_texts}")
+        target_language = request.form.get('target_language', 'en')
+        try:
+            uploads = list(iter_batch_uploads(files))
+        except (ValueError, zipfile.BadZipFile) as e:
+            return jsonify({'error': f'Invalid batch upload: {str(e)}'}), 400
         
-        # Create image with translations
-        result_image = create_translated_image(original_image, text_blocks)
+        if not uploads:
+            return jsonify({'error': 'No images found in upload'}), 400
+        if len(uploads) > app.config['BATCH_MAX_IMAGES']:
+            return jsonify({'error': f"Too many images (max {app.config['BATCH_MAX_IMAGES']})"}), 400
         
-        # Convert result image to base64 for frontend
-        processed_image_base64 = None
-        if result_image:
-            buffer = io.BytesIO()
-            result_image.save(buffer, format='PNG')
-            processed_image_base64 = base64.b64encode(buffer.getvalue()).decode()
+        stage_totals = {'decode': 0, 'preprocess': 0, 'ocr': 0, 'translate': 0, 'render': 0, 'encode': 0, 'db': 0}
+        items = []
+        for filename, content in uploads:
+            item = {'filename': filename, 'content': content, 'result': None}
+            if content is None:
+                item['result'] = {'filename': filename, 'error': 'Invalid file type'}
+            else:
+                item['content_hash'] = content_key(content, target_language, result_version(preprocess_profile))
+                item['cached'] = result_cache.get(item['content_hash']) if app.config['RESULT_CACHE_ENABLED'] else None
+                if item['cached'] is None:
+                    try:
+                        check_image_budget(content)
+                    except ImageRejected as e:
+                        item['result'] = {'filename': filename, 'error': e.message}
+            items.append(item)
         
-        # Prepare confidence scores
-        confidence_scores = [block['confidence'] for block in text_blocks]
+        # Decode + OCR every uncached image concurrently
+        to_process = [item for item in items if item['result'] is None and item['cached'] is None]
+        with ThreadPoolExecutor(max_workers=app.config['BATCH_WORKERS']) as pool:
+            for item, (dimensions, text_blocks, timings, failures) in zip(
+                    to_process, pool.map(ocr_batch_item, [item['content'] for item in to_process],
+                                         [preprocess_profile] * len(to_process))):
+                item['timings'] = timings
+                item['failures'] = failures
+                for stage, seconds in timings.items():
+                    stage_totals[stage] = stage_totals.get(stage, 0) + seconds
+                if dimensions is None:
+                    item['result'] = {'filename': item['filename'], 'error': 'Invalid image file'}
+                else:
+                    item['image_dimensions'] = dimensions
+                    item['text_blocks'] = text_blocks
+            to_process = [item for item in to_process if item['result'] is None]
+            
+            # One translation pass over the distinct strings of the whole batch, minus
+            # blocks language ID places in the target language already
+            stage_start = time.perf_counter()
+            for item in to_process:
+                item['detected_language'] = identify_languages(item['text_blocks'])
+            all_texts = [block['text'] for item in to_process for block in item['text_blocks']
+                         if not in_target_language(block, target_language)]
+            translate_failures = []
+            translations = dict(zip(all_texts, translate_texts(all_texts, target_language, translate_failures)))
+            for item in to_process:
+                item['failures'].extend(translate_failures)  # One shared pass, so a failed batch taints them all
+            stage_totals['translate'] = time.perf_counter() - stage_start
+            for item in to_process:
+                for block in item['text_blocks']:
+                    block['translated_text'] = translations.get(block['text'], block['text'])
+            
+            # Render overlays concurrently
+            to_render = [item for item in to_process if item['text_blocks']]
+            for item, (image_key, timings) in zip(to_render, pool.map(
+                    render_batch_item, [item['content'] for item in to_render],
+                    [item['text_blocks'] for item in to_render])):
+                item['image_key'] = image_key
+                for stage, seconds in timings.items():
+                    stage_totals[stage] = stage_totals.get(stage, 0) + seconds
+                    item['timings'][stage] = item['timings'].get(stage, 0) + seconds
         
-        # Save translation to database
-        translation_record = Translation.create_from_result(
-            filename=original_filename,
-            file_size=file_size,
-            dimensions=image_dimensions,
-            original_texts=original_texts,
-            translated_texts=translated_texts,
-            confidence_scores=confidence_scores,
-            processing_time=time.time() - start_time,
-            session_id=session_id
-        )
-        db.session.add(translation_record)
-        db.session.commit()
+        # Write every history row in one bulk insert
+        stage_start = time.perf_counter()
+        translate_share = stage_totals['translate'] / len(to_process) if to_process else 0
+        records = []
+        for item in items:
+            if item['result'] is not None:
+                continue
+            if item['cached'] is not None:
+                cached = item['cached']
+                text_blocks = cached['text_blocks']
+                dimensions = item['image_dimensions'] = cached['image_dimensions']
+                item['image_key'] = cached['image_key']
+                item['detected_language'] = identify_languages(text_blocks)
+                processing_time = 0
+            else:
+                text_blocks = item['text_blocks']
+                dimensions = item['image_dimensions']
+                processing_time = sum(item['timings'].values()) + translate_share
+                if app.config['RESULT_CACHE_ENABLED'] and not item['failures']:
+                    result_cache.put(item['content_hash'], text_blocks, image_dimensions=dimensions,
+                                     image_key=item.get('image_key'))
+            record = Translation.create_from_result(
+                filename=item['filename'],
+                file_size=len(item['content']),
+                dimensions=dimensions,
+                text_blocks=text_blocks,
+                processing_time=processing_time,
+                session_id=session_id,
+                content_hash=item['content_hash'],
+                image_key=item.get('image_key'),
+                translation_engine=translator_backend.name,
+                detected_language=item.get('detected_language')
+            )
+            item['record'] = record
+            item['text_blocks'] = text_blocks
+            records.append(record)
+        db.session.add_all(records)
+        with timed('db_commit'):
+            db.session.commit()
+        stage_totals['db'] = time.perf_counter() - stage_start
+        
+        results = []
+        for item in items:
+            if item['result'] is not None:
+                results.append(item['result'])
+                continue
+            text_blocks = item['text_blocks']
+            results.append({
+                'filename': item['filename'],
+                'translation_id': item['record'].id,
+                'original_texts': [block['text'] for block in text_blocks],
+                'translated_texts': [block.get('translated_text', block['text']) for block in text_blocks],
+                'text_blocks': text_blocks,
+                'processed_image_url': rendered_image_url(item.get('image_key')),
+                'render_mode': app.config['RENDER_MODE'],
+                'overlay': overlay_description(item['image_dimensions'], text_blocks),
+                'cached': item['cached'] is not None
+            })
         
         return jsonify({
-            'message': 'Translation completed successfully',
-            'translation_id': translation_record.id,
-            'original_texts': original_texts,
-            'translated_texts': translated_texts,
-            'text_blocks': text_blocks,
-            'processed_image': processed_image_base64,
+            'message': f'Processed {len(results)} images',
+            'results': results,
+            'total_texts': len(all_texts),
+            'unique_texts': len(set(all_texts)),
+            'stage_times': {stage: round(seconds, 4) for stage, seconds in stage_totals.items()},
             'processing_time': round(time.time() - start_time, 2)
         })
         
     except Exception as e:
-        print(f"Error in translate_image: {e}")
+        print(f"Error in translate_batch: {e}")
         import traceback
         traceback.print_exc()
-        return jsonify({'error': f'Processing failed: {str(e)}'}), 500
+        return jsonify({'error': f'Batch processing failed: {str(e)}'}), 500
+
+def format_stream_event(event, data, sse=False):
+    """Serialize a pipeline event as an SSE message or an NDJSON line"""
+    if sse:
+        return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+    return json.dumps({'event': event, **data}) + "\n"
+
+@app.route('/api/translate/stream', methods=['POST'])
+def translate_image_stream():
+    """Streaming variant of /api/translate
+
+    Emits events as newline-delimited JSON (default) or Server-Sent Events
+    (`Accept: text/event-stream` or `format=sse`): 'ocr' with the text
+    blocks, one 'translation' per block, 'image' with the rendered overlay
+    and a final 'done' carrying the same body /api/translate returns.
+    """
+    start_time = time.time()
+    session_id = get_or_create_session()
+    update_session_activity()
+    
+    file, error = read_translate_upload()
+    if error:
+        return jsonify(error[0]), error[1]
+    preprocess_profile, error = read_preprocess_profile()
+    if error:
+        return jsonify(error[0]), error[1]
+    
+    target_language = request.form.get('target_language', 'en')
+    original_filename = secure_filename(file.filename)
+    sse = request.values.get('format') == 'sse' or 'text/event-stream' in request.headers.get('Accept', '')
+    
+    def generate():
+        try:
+            for event, data in run_pipeline(file.stream, original_filename, target_language, session_id, start_time,
+                                            preprocess_profile):
+                yield format_stream_event(event, data, sse)
+        except Exception as e:
+            print(f"Error in translate_image_stream: {e}")
+            db.session.rollback()
+            yield format_stream_event('error', {'error': f'Processing failed: {str(e)}', 'status': 500}, sse)
+    
+    return Response(stream_with_context(generate()),
+                    mimetype='text/event-stream' if sse else 'application/x-ndjson',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job_status(job_id):
+    """Get status, and the result once finished, of an async translation job"""
+    session_id = get_or_create_session()
+    update_session_activity()
+    
+    try:
+        job = TranslationJob.query.filter_by(id=job_id, session_id=session_id).first()
+        
+        if not job:
+            return jsonify({'error': 'Job not found'}), 404
+        
+        return jsonify(job_queue.expire(job).to_dict())
+        
+    except Exception as e:
+        return jsonify({'error': f'Failed to fetch job: {str(e)}'}), 500
+
+@app.route('/api/jobs/<job_id>/events', methods=['GET'])
+def stream_job_status(job_id):
+    """Stream job status changes as Server-Sent Events until the job finishes"""
+    session_id = get_or_create_session()
+    update_session_activity()
+    
+    if not TranslationJob.query.filter_by(id=job_id, session_id=session_id).first():
+        return jsonify({'error': 'Job not found'}), 404
+    
+    poll_interval = app.config['JOB_POLL_INTERVAL']
+    
+    def generate():
+        last_status = None
+        while True:
+            db.session.expire_all()
+            job = job_queue.expire(db.session.get(TranslationJob, job_id))
+            if job.status != last_status:
+                last_status = job.status
+                yield f"event: status\ndata: {json.dumps(job.to_dict())}\n\n"
+            if job.is_finished:
+                return
+            time.sleep(poll_interval)
+    
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/api/images/<image_key>', methods=['GET'])
+def get_rendered_image(image_key):
+    """Serve a rendered overlay from the blob store
+
+    Keys are content hashes, so responses are immutable: they carry an
+    ETag and a long Cache-Control max-age, and conditional requests
+    (If-None-Match / If-Modified-Since) are answered with 304.
+    """
+    path = blob_store.path(image_key)
+    if path is None or not os.path.exists(path):
+        return jsonify({'error': 'Image not found'}), 404
+    
+    response = send_file(
+        os.path.abspath(path),
+        mimetype=blob_store.mimetype(image_key),
+        etag=image_key.split('.')[0],
+        conditional=True,
+        max_age=app.config['RENDER_CACHE_MAX_AGE']
+    )
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
+def encode_history_cursor(translation):
+    """Opaque cursor pointing just after `translation` in newest-first order"""
+    raw = f"{translation.created_at.isoformat()}|{translation.id}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+def decode_history_cursor(cursor):
+    """(created_at, id) from a history cursor; raises ValueError if malformed"""
+    try:
+        created_at, translation_id = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8').split('|')
+        return datetime.fromisoformat(created_at), int(translation_id)
+    except (UnicodeError, TypeError, ValueError) as e:
+        raise ValueError(f'Invalid cursor: {cursor}') from e
 
 @app.route('/api/history', methods=['GET'])
 def get_translation_history():
-    """Get translation history for current session"""
+    """Get translation history for current session
+    
+    Pass the returned `next_cursor` as `cursor` to fetch the following page
+    (keyset pagination, constant cost at any depth); `page` still works but
+    costs an OFFSET scan. `include_total=0` skips the total/pages fields,
+    `summary=1` returns a lightweight projection without the OCR texts.
+    """
     session_id = get_or_create_session()
     update_session_activity()
     
@@ -324,23 +1159,99 @@ def get_translation_history():
         # Get pagination parameters
         page = request.args.get('page', 1, type=int)
         per_page = min(request.args.get('per_page', 10, type=int), 50)  # Max 50 per page
+        cursor = request.args.get('cursor')
+        include_total = request.args.get('include_total', '1') != '0'
+        summary = request.args.get('summary', '0') == '1'
+        
+        # Newest first; id breaks ties so the order (and the cursor) is total
+        query = Translation.query.filter_by(session_id=session_id)\
+                                 .order_by(Translation.created_at.desc(), Translation.id.desc())
+        if summary:
+            query = query.options(load_only(*SUMMARY_COLUMNS))
+        else:
+            # Blocks for the whole page in one extra query
+            query = query.options(selectinload(Translation.blocks))
+        if cursor:
+            try:
+                created_at, translation_id = decode_history_cursor(cursor)
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            query = query.filter(or_(
+                Translation.created_at < created_at,
+                and_(Translation.created_at == created_at, Translation.id < translation_id)
+            ))
+        elif page > 1:
+            query = query.offset((page - 1) * per_page)
+        
+        # One extra row tells us whether another page follows
+        translations = query.limit(per_page + 1).all()
+        has_next = len(translations) > per_page
+        translations = translations[:per_page]
+        
+        response = {
+            'translations': [t.to_dict(summary=summary) for t in translations],
+            'next_cursor': encode_history_cursor(translations[-1]) if has_next else None,
+            'has_next': has_next
+        }
+        if not cursor:
+            response['current_page'] = page
+            response['has_prev'] = page > 1
+        if include_total:
+            # Maintained per insert/delete, so no COUNT(*) over the history
+            stats = SessionStats.query.filter_by(session_id=session_id).first()
+            total = stats.translation_count if stats else 0
+            response['total'] = total
+            response['pages'] = (total + per_page - 1) // per_page
+        
+        return jsonify(response)
+        
+    except Exception as e:
+        return jsonify({'error': f'Failed to fetch history: {str(e)}'}), 500
+
+@app.route('/api/history/search', methods=['GET'])
+def search_history():
+    """Full-text search over the session's original and translated texts"""
+    session_id = get_or_create_session()
+    update_session_activity()
+    
+    try:
+        query = request.args.get('q', '').strip()
+        page = max(request.args.get('page', 1, type=int), 1)
+        per_page = min(request.args.get('per_page', 10, type=int), 50)  # Max 50 per page
+        
+        if not query:
+            return jsonify({'error': 'No search query provided'}), 400
         
-        # Query translations for current session
-        translations = Translation.query.filter_by(session_id=session_id)\
-                                      .order_by(Translation.created_at.desc())\
-                                      .paginate(page=page, per_page=per_page, error_out=False)
+        # One extra result tells us whether another page follows
+        backend, ranked = search_translations(session_id, query, limit=per_page + 1,
+                                              offset=(page - 1) * per_page)
+        has_next = len(ranked) > per_page
+        ranked = ranked[:per_page]
+        
+        translations = Translation.query.options(load_only(*SUMMARY_COLUMNS))\
+                                        .filter(Translation.id.in_([row[0] for row in ranked])).all()
+        by_id = {t.id: t for t in translations}
+        
+        results = []
+        for translation_id, score, matches in ranked:
+            if translation_id not in by_id:
+                continue
+            result = by_id[translation_id].to_dict(summary=True)
+            result['score'] = round(score, 4)
+            result['matches'] = matches
+            results.append(result)
         
         return jsonify({
-            'translations': [t.to_dict() for t in translations.items],
-            'total': translations.total,
-            'pages': translations.pages,
+            'query': query,
+            'results': results,
             'current_page': page,
-            'has_next': translations.has_next,
-            'has_prev': translations.has_prev
+            'has_next': has_next,
+            'has_prev': page > 1,
+            'search_backend': backend
         })
         
     except Exception as e:
-        return jsonify({'error': f'Failed to fetch history: {str(e)}'}), 500
+        return jsonify({'error': f'Search failed: {str(e)}'}), 500
 
 @app.route('/api/history/<int:translation_id>', methods=['GET'])
 def get_translation_detail(translation_id):
@@ -377,8 +1288,11 @@ def delete_translation(translation_id):
         if not translation:
             return jsonify({'error': 'Translation not found'}), 404
         
+        image_key = translation.image_key
         db.session.delete(translation)
         db.session.commit()
+        if image_key:
+            result_cache.collect_blobs({image_key})
         
         return jsonify({'message': 'Translation deleted successfully'})
         
@@ -392,8 +1306,16 @@ def clear_history():
     update_session_activity()
     
     try:
+        # Bulk deletes skip ORM cascades (and SQLite does not enforce ON DELETE), so drop blocks first
+        session_translation_ids = db.session.query(Translation.id).filter_by(session_id=session_id)
+        image_keys = {key for (key,) in db.session.query(Translation.image_key)
+                      .filter(Translation.session_id == session_id, Translation.image_key.isnot(None)).distinct()}
+        TextBlock.query.filter(TextBlock.translation_id.in_(session_translation_ids.scalar_subquery()))\
+                       .delete(synchronize_session=False)
         deleted_count = Translation.query.filter_by(session_id=session_id).delete()
+        reset_session_stats(session_id)
         db.session.commit()
+        result_cache.collect_blobs(image_keys)
         
         return jsonify({
             'message': f'Cleared {deleted_count} translations from history'
@@ -409,9 +1331,10 @@ def get_session_stats():
     update_session_activity()
     
     try:
-        translations = Translation.query.filter_by(session_id=session_id).all()
+        # Totals are maintained on every insert/delete (see session_stats.py)
+        stats = SessionStats.query.filter_by(session_id=session_id).first()
         
-        if not translations:
+        if not stats or not stats.translation_count:
             return jsonify({
                 'total_translations': 0,
                 'total_processing_time': 0,
@@ -420,24 +1343,38 @@ def get_session_stats():
                 'languages_detected': []
             })
         
-        total_translations = len(translations)
-        total_processing_time = sum(t.processing_time or 0 for t in translations)
-        total_texts = sum(len(json.loads(t.original_texts)) for t in translations if t.original_texts)
-        languages = list(set(t.detected_language for t in translations if t.detected_language))
-        
-        return jsonify({
-            'total_translations': total_translations,
-            'total_processing_time': round(total_processing_time, 2),
-            'average_processing_time': round(total_processing_time / total_translations, 2),
-            'total_texts_translated': total_texts,
-            'languages_detected': languages,
-            'first_translation': translations[-1].created_at.isoformat() if translations else None,
-            'latest_translation': translations[0].created_at.isoformat() if translations else None
-        })
+        return jsonify(stats.to_dict())
         
     except Exception as e:
         return jsonify({'error': f'Failed to fetch stats: {str(e)}'}), 500
 
+@app.route('/api/cache/stats', methods=['GET'])
+def get_cache_stats():
+    """Get translation memory hit/miss counters for this worker"""
+    return jsonify({'translation_memory': translation_memory.stats()})
+
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """Prometheus metrics for this worker process"""
+    memory_stats = translation_memory.stats()
+    samples = [
+        ('signboard_translation_memory_hits_total', 'counter', 'Translation memory hits by cache level',
+         {'level': 'memory'}, memory_stats['memory_hits']),
+        ('signboard_translation_memory_hits_total', 'counter', 'Translation memory hits by cache level',
+         {'level': 'db'}, memory_stats['db_hits']),
+        ('signboard_translation_memory_misses_total', 'counter', 'Translation memory misses',
+         {}, memory_stats['misses']),
+        ('signboard_translation_memory_entries', 'gauge', 'Entries in the in-process translation memory',
+         {}, memory_stats['memory_entries']),
+        ('signboard_session_activity_pending', 'gauge', 'Session activity updates waiting to be flushed',
+         {}, session_activity.pending()),
+        ('signboard_session_activity_flushes_total', 'counter', 'Bulk session activity flushes',
+         {}, session_activity.flushes),
+        ('signboard_job_queue_depth', 'gauge', 'Translation jobs queued or running in this process',
+         {}, job_queue.depth()),
+    ] + pass_stats.samples()
+    return Response(registry.expose(samples), mimetype='text/plain; version=0.0.4')
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
@@ -449,11 +1386,19 @@ def home():
     return jsonify({
         'message': 'Signboard Translator API with Database',
         'endpoints': {
-            '/api/translate': 'POST - Upload image for translation',
+            '/api/translate': 'POST - Upload image for translation (async=1 to queue a job)',
+            '/api/translate/stream': 'POST - Upload image, stream results as NDJSON or SSE',
+            '/api/translate/batch': 'POST - Upload several images or a zip archive for translation',
+            '/api/jobs/<job_id>': 'GET - Get async job status and result',
+            '/api/jobs/<job_id>/events': 'GET - Stream async job status (SSE)',
+            '/api/images/<key>': 'GET - Rendered overlay image (cacheable)',
             '/api/history': 'GET - Get translation history',
             '/api/history/<id>': 'GET/DELETE - Get or delete specific translation',
             '/api/history/clear': 'DELETE - Clear all history',
+            '/api/history/search': 'GET - Search history (q, page, per_page)',
             '/api/stats': 'GET - Get session statistics',
+            '/api/cache/stats': 'GET - Get translation cache statistics',
+            '/api/metrics': 'GET - Prometheus metrics',
             '/api/health': 'GET - Health check'
         }
     })
@@ -461,6 +1406,8 @@ def home():
 def create_tables():
     """Create database tables"""
     db.create_all()
+    with db.engine.begin() as connection:
+        install_search_index(connection)
 
 if __name__ == '__main__':
     print("Starting Signboard Translator API with Database...")
@@ -0,0 +1,262 @@
+# bench_pipeline.py - End-to-end /api/translate benchmark with JSON output
+#
+# Runs the whole pipeline (decode, OCR, translate, render, DB) over
+# synthetic signboards with a stub translator, either in-process through
+# process_upload or through the Flask test client, and writes throughput,
+# latency percentiles, peak RSS, OCR recall and per-stage means as JSON.
+#
+#   python benchmarks/bench_pipeline.py --count 5 --sizes small medium \
+#       --scripts latin cyrillic --output results/pipeline.json
+#
+# A throwaway SQLite database and render folder are used, so runs never
+# touch the development database. The result cache is off unless
+# --result-cache is given, otherwise repeated images only measure cache
+# hits. OCR recall needs the tesseract binary; the pipeline OCRs with the
+# 'eng' language data, so non-Latin recall shows what users get today.
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+# Point the app at scratch storage before it is imported
+SCRATCH_DIR = tempfile.mkdtemp(prefix='signboard-bench-')
+os.environ.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(SCRATCH_DIR, 'bench.db'))
+os.environ.setdefault('RENDER_FOLDER', os.path.join(SCRATCH_DIR, 'rendered'))
+
+import cv2
+import pytesseract
+
+with contextlib.redirect_stdout(sys.stderr):
+    from app import app, process_upload, set_translator_backend
+from models import db, Translation, UserSession
+from translators import StubTranslatorBackend
+from synthetic import SCRIPT_TEXTS, SIZES, find_font, make_corpus, word_recall
+
+
+def percentile(values, q):
+    """Linear-interpolated percentile of a non-empty list, q in [0, 100]"""
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process and of finished children (tesseract), in MB"""
+    if resource is None:
+        return None
+    # ru_maxrss is kilobytes on Linux and bytes on macOS
+    unit = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return {
+        'self': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / unit,
+        'children': resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / unit,
+    }
+
+
+def encode_corpus(corpus):
+    """PNG-encode each image once so encoding is not part of the measurement"""
+    encoded = []
+    for name, image, lines in corpus:
+        ok, buffer = cv2.imencode('.png', image)
+        if not ok:
+            raise RuntimeError(f'could not encode {name}')
+        encoded.append((name, buffer.tobytes(), lines, image.shape))
+    return encoded
+
+
+def make_session():
+    session_id = str(uuid.uuid4())
+    db.session.add(UserSession(session_id=session_id, ip_address='127.0.0.1', user_agent='bench_pipeline'))
+    db.session.commit()
+    return session_id
+
+
+def translate_in_process(session_id, name, content, lang):
+    body, status = process_upload(content, f'{name}.png', lang, session_id)
+    return body, status
+
+
+def make_client_translator(client):
+    def translate_with_client(session_id, name, content, lang):
+        response = client.post('/api/translate', data={
+            'image': (io.BytesIO(content), f'{name}.png'),
+            'target_language': lang
+        }, content_type='multipart/form-data')
+        return response.get_json(), response.status_code
+    return translate_with_client
+
+
+def stage_breakdown(translation_ids):
+    """Mean seconds per pipeline stage over the stored Translation rows"""
+    totals, counts = {}, {}
+    for translation in Translation.query.filter(Translation.id.in_(translation_ids)):
+        if not translation.stage_timings:
+            continue
+        for stage, seconds in json.loads(translation.stage_timings).items():
+            totals[stage] = totals.get(stage, 0) + seconds
+            counts[stage] = counts.get(stage, 0) + 1
+    return {stage: round(totals[stage] / counts[stage], 4) for stage in sorted(totals)}
+
+
+def run_mode(translate, items, lang, repeat, warmup, session_id, run_ocr):
+    """Run every item `repeat` times through `translate`, returning a summary dict"""
+    for name, content, _, _ in items[:warmup]:
+        translate(session_id, name, content, lang)
+
+    latencies, recalls, translation_ids, errors = [], [], [], 0
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for name, content, lines, _ in items:
+            start = time.perf_counter()
+            body, status = translate(session_id, name, content, lang)
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors += 1
+                continue
+            translation_ids.append(body['translation_id'])
+            if run_ocr:
+                recalls.append(word_recall(lines, body.get('text_blocks', [])))
+    elapsed = time.perf_counter() - started
+
+    return {
+        'images': len(latencies),
+        'errors': errors,
+        'wall_seconds': round(elapsed, 4),
+        'throughput_per_second': round(len(latencies) / elapsed, 3) if elapsed else None,
+        'latency_ms': {
+            'mean': round(statistics.mean(latencies) * 1000, 2),
+            'p50': round(percentile(latencies, 50) * 1000, 2),
+            'p95': round(percentile(latencies, 95) * 1000, 2),
+            'p99': round(percentile(latencies, 99) * 1000, 2),
+            'max': round(max(latencies) * 1000, 2),
+        },
+        'ocr_recall': round(statistics.mean(recalls), 4) if recalls else None,
+        'stage_seconds_mean': stage_breakdown(translation_ids),
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR, stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def tesseract_version():
+    try:
+        return str(pytesseract.get_tesseract_version())
+    except Exception:
+        return None
+
+
+def environment_info(args):
+    return {
+        'timestamp': datetime.utcnow().isoformat() + 'Z',
+        'git_revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'opencv': cv2.__version__,
+        'tesseract': tesseract_version(),
+        'config': {key: app.config[key] for key in (
+            'PIPELINE_VERSION', 'OCR_MODE', 'OCR_BACKEND', 'OCR_NORMALIZE', 'OCR_TARGET_TEXT_HEIGHT',
+            'OCR_MAX_PIXELS', 'OCR_CROP_TO_TEXT', 'RENDER_FORMAT', 'TRANSLATION_BATCH_SIZE',
+            'TRANSLATION_MEMORY_ENABLED', 'RESULT_CACHE_ENABLED'
+        )},
+        'args': vars(args),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='End-to-end pipeline benchmark on synthetic signboards')
+    parser.add_argument('--count', type=int, default=5, help='images per size and script')
+    parser.add_argument('--sizes', nargs='+', default=['small', 'medium'], choices=list(SIZES))
+    parser.add_argument('--scripts', nargs='+', default=['latin'], choices=list(SCRIPT_TEXTS))
+    parser.add_argument('--modes', nargs='+', default=['inprocess', 'client'], choices=['inprocess', 'client'])
+    parser.add_argument('--repeat', type=int, default=1, help='passes over the corpus per mode')
+    parser.add_argument('--warmup', type=int, default=1, help='untimed requests before each mode')
+    parser.add_argument('--latency', type=float, default=0.0, help='simulated translator round trip in seconds')
+    parser.add_argument('--lang', default='en', help='target language')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--tesseract-cmd', help='path to the tesseract binary')
+    parser.add_argument('--result-cache', action='store_true', help='keep the result cache enabled')
+    parser.add_argument('--output', help='write the JSON report here (default: stdout)')
+    args = parser.parse_args()
+
+    if args.tesseract_cmd:
+        pytesseract.pytesseract.tesseract_cmd = args.tesseract_cmd
+    elif shutil.which(pytesseract.pytesseract.tesseract_cmd) is None and shutil.which('tesseract'):
+        pytesseract.pytesseract.tesseract_cmd = shutil.which('tesseract')
+    run_ocr = shutil.which(pytesseract.pytesseract.tesseract_cmd) is not None
+    if not run_ocr:
+        print('tesseract not found: OCR finds no text and recall is not reported', file=sys.stderr)
+
+    app.config['RESULT_CACHE_ENABLED'] = args.result_cache
+    set_translator_backend(StubTranslatorBackend(latency=args.latency))
+
+    corpora, skipped = {}, []
+    for script in args.scripts:
+        font_path = None
+        if script != 'latin':
+            font_path = find_font(script)
+            if font_path is None:
+                print(f'no font found for {script}, skipping', file=sys.stderr)
+                skipped.append(script)
+                continue
+        corpus = make_corpus(args.count, sizes=args.sizes, seed=args.seed, script=script, font_path=font_path)
+        corpora[script] = encode_corpus(corpus)
+
+    # ru_maxrss only grows, so record the level reached before any request
+    report = {'environment': environment_info(args), 'skipped_scripts': skipped,
+              'peak_rss_mb_before_runs': peak_rss_mb(), 'results': []}
+    # The pipeline logs with print(); keep stdout for the report
+    with app.app_context(), contextlib.redirect_stdout(sys.stderr):
+        db.create_all()
+        session_id = make_session()
+        translators = {'inprocess': translate_in_process, 'client': make_client_translator(app.test_client())}
+        for mode in args.modes:
+            for script, items in corpora.items():
+                for size in args.sizes:
+                    size_items = [item for item in items if item[0].split('-')[-2] == size]
+                    print(f'{mode} {script} {size}: {len(size_items) * args.repeat} images', file=sys.stderr)
+                    summary = run_mode(translators[mode], size_items, args.lang, args.repeat,
+                                       args.warmup, session_id, run_ocr)
+                    summary.update({'mode': mode, 'script': script, 'size': size,
+                                    'width': SIZES[size][0], 'height': SIZES[size][1]})
+                    report['results'].append(summary)
+
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+        print(f'wrote {args.output}', file=sys.stderr)
+    else:
+        print(output)
+    shutil.rmtree(SCRATCH_DIR, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+# bench_preprocess.py - Time and memory per preprocessing profile on large images
+#
+#   python benchmarks/bench_preprocess.py --sizes medium large --repeat 5
+#   python benchmarks/bench_preprocess.py --profiles fast balanced accurate+deskew --opencl
+#
+# 'legacy' is the original four-intermediate pipeline, for comparison.
+# Memory is the tracemalloc peak of new numpy allocations per call (what
+# a request allocates on top of the reused per-thread buffers); the
+# buffers each worker thread keeps are reported separately. Images are
+# preprocessed at full resolution, without OCR normalisation.
+import argparse
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import preprocessing
+from synthetic import SIZES, make_sign
+
+DEFAULT_PROFILES = ['legacy', 'fast', 'balanced', 'accurate', 'balanced+deskew', 'balanced+denoise']
+
+
+def legacy_preprocess(image):
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    blurred = cv2.GaussianBlur(gray, (5, 5), 0)
+    thresh = cv2.adaptiveThreshold(blurred, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2)
+    return cv2.morphologyEx(thresh, cv2.MORPH_CLOSE, np.ones((2, 2), np.uint8)), None
+
+
+def run_profile(image, profile, repeat, use_opencl):
+    if profile == 'legacy':
+        run = legacy_preprocess
+    else:
+        def run(image):
+            return preprocessing.preprocess(image, profile, use_opencl=use_opencl)
+
+    run(image)  # Warm-up: allocates the thread's buffers, compiles OpenCL kernels
+    times = []
+    peaks = []
+    for _ in range(repeat):
+        tracemalloc.start()
+        start = time.perf_counter()
+        run(image)
+        times.append(time.perf_counter() - start)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return {
+        'mean_ms': statistics.mean(times) * 1000,
+        'max_ms': max(times) * 1000,
+        'alloc_mb': max(peaks) / 1e6,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Preprocessing time and memory per profile')
+    parser.add_argument('--sizes', nargs='+', default=['medium', 'large'], choices=list(SIZES))
+    parser.add_argument('--profiles', nargs='+', default=DEFAULT_PROFILES)
+    parser.add_argument('--repeat', type=int, default=5, help='timed runs per profile and size')
+    parser.add_argument('--opencl', action='store_true', help='run profiles on OpenCL (UMat) when available')
+    args = parser.parse_args()
+
+    if args.opencl and not preprocessing.opencl_available():
+        print('OpenCL not available: profiles run on the CPU')
+
+    for size in args.sizes:
+        width, height = SIZES[size]
+        image = make_sign(width, height, ['PHARMACY', 'OPEN 24 HOURS', 'NO PARKING'])
+        print(f"\n{size} ({width}x{height}), {args.repeat} runs per profile")
+        print(f"{'profile':<20} {'mean ms':>9} {'max ms':>9} {'alloc MB':>9}")
+        for profile in args.profiles:
+            repeat = 1 if 'denoise' in profile else args.repeat  # Non-local means takes seconds per run
+            result = run_profile(image, profile, repeat, args.opencl)
+            print(f"{profile:<20} {result['mean_ms']:>9.1f} {result['max_ms']:>9.1f} {result['alloc_mb']:>9.1f}")
+        retained = sum(buffer.nbytes for buffer in preprocessing.buffers.buffers.values())
+        print(f"per-thread buffers retained: {retained / 1e6:.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+# bench_resolution.py - Latency/accuracy of OCR with and without resolution normalisation
+#
+#   python benchmarks/bench_resolution.py --count 5 --sizes medium large
+#
+# This measures the single-pass path (OCR_ADAPTIVE=0: preprocess, then
+# extract_text_with_positions). Adaptive OCR, the default, scales and
+# preprocesses per pass instead; see bench_pipeline.py for it. OCR
+# accuracy needs the tesseract binary; without it only the preprocessing
+# latency is reported.
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import time
+
+import pytesseract
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app, extract_text_with_positions, preprocess_image
+from imaging import OcrTransform, normalize_for_ocr
+from synthetic import SIZES, make_corpus, word_recall
+
+
+def run_variant(corpus, normalize, crop_to_text, run_ocr):
+    timings = {'normalize': [], 'preprocess': [], 'ocr': []}
+    recalls = []
+    for _, image, lines in corpus:
+        start = time.perf_counter()
+        if normalize:
+            ocr_input, transform = normalize_for_ocr(
+                image, app.config['OCR_TARGET_TEXT_HEIGHT'], app.config['OCR_MAX_PIXELS'], crop_to_text
+            )
+        else:
+            ocr_input, transform = image, OcrTransform()
+        timings['normalize'].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        processed, _ = preprocess_image(ocr_input)
+        timings['preprocess'].append(time.perf_counter() - start)
+
+        if run_ocr:
+            start = time.perf_counter()
+            blocks = transform.to_original(extract_text_with_positions(processed))
+            timings['ocr'].append(time.perf_counter() - start)
+            recalls.append(word_recall(lines, blocks))
+
+    summary = {stage: statistics.mean(values) * 1000 for stage, values in timings.items() if values}
+    summary['recall'] = statistics.mean(recalls) if recalls else None
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description='OCR latency/accuracy with and without resolution normalisation')
+    parser.add_argument('--count', type=int, default=5, help='images per size')
+    parser.add_argument('--sizes', nargs='+', default=list(SIZES), choices=list(SIZES))
+    args = parser.parse_args()
+
+    run_ocr = shutil.which(pytesseract.pytesseract.tesseract_cmd) is not None
+    if not run_ocr:
+        print('tesseract not found: reporting preprocessing latency only')
+
+    for size in args.sizes:
+        corpus = make_corpus(args.count, sizes=[size])
+        print(f"\n{size} ({SIZES[size][0]}x{SIZES[size][1]}, {len(corpus)} images), mean ms per image")
+        print(f"{'variant':<14} {'normalize':>10} {'preprocess':>11} {'ocr':>8} {'recall':>7}")
+        for name, normalize, crop in (('full-res', False, False), ('normalized', True, False), ('norm+crop', True, True)):
+            result = run_variant(corpus, normalize, crop, run_ocr)
+            recall = f"{result['recall']:.2f}" if result['recall'] is not None else '-'
+            print(f"{name:<14} {result['normalize']:>10.1f} {result['preprocess']:>11.1f} "
+                  f"{result.get('ocr', 0):>8.1f} {recall:>7}")
+
+
+if __name__ == '__main__':
+    main()
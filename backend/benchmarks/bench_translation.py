@@ -0,0 +1,59 @@
+# bench_translation.py - Per-block vs batched translation latency
+#
+# Runs offline against StubTranslatorBackend, which sleeps for a fixed
+# round-trip time on every backend call.
+#
+#   python benchmarks/bench_translation.py --words 60 --latency 0.15
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app, set_translator_backend, translate_texts
+from translators import StubTranslatorBackend
+
+SIGN_WORDS = ['OPEN', 'EXIT', 'PHARMACY', 'ENTRANCE', 'PARKING', 'CLOSED',
+              'BAKERY', 'HOTEL', 'STATION', 'TOILETS', 'NO', 'SMOKING']
+
+
+def make_texts(count):
+    """Build a word list with the repetition typical of signboards"""
+    return [SIGN_WORDS[i % len(SIGN_WORDS)] if i % 3 else f'STREET{i}' for i in range(count)]
+
+
+def run(texts, latency, batched):
+    backend = StubTranslatorBackend(latency=latency)
+    set_translator_backend(backend)
+    start = time.perf_counter()
+    if batched:
+        translate_texts(texts, 'en')
+    else:
+        for text in texts:
+            translate_texts([text], 'en')
+    return time.perf_counter() - start, backend.calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Per-block vs batched translation latency')
+    parser.add_argument('--words', type=int, default=60, help='OCR blocks per request')
+    parser.add_argument('--latency', type=float, default=0.15, help='simulated round trip in seconds')
+    parser.add_argument('--batch-size', type=int, default=app.config['TRANSLATION_BATCH_SIZE'])
+    args = parser.parse_args()
+
+    app.config['TRANSLATION_BATCH_SIZE'] = args.batch_size
+    app.config['TRANSLATION_MEMORY_ENABLED'] = False  # Measure batching alone
+    texts = make_texts(args.words)
+
+    per_block_time, per_block_calls = run(texts, args.latency, batched=False)
+    batched_time, batched_calls = run(texts, args.latency, batched=True)
+
+    print(f"{'mode':<10} {'calls':>6} {'seconds':>9}")
+    print(f"{'per-block':<10} {per_block_calls:>6} {per_block_time:>9.3f}")
+    print(f"{'batched':<10} {batched_calls:>6} {batched_time:>9.3f}")
+    print(f"speedup: {per_block_time / batched_time:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,218 @@
+# load_test.py - Concurrent /api/translate + /api/history load against one database
+#
+# Starts several worker processes (like gunicorn workers) that share one
+# database and fire a mix of translate and history requests through the
+# Flask test client. Each profile runs on a fresh SQLite file:
+#
+#   baseline  SQLITE_TUNING=0 (driver defaults: rollback journal, FULL sync)
+#   tuned     SQLITE_TUNING=1 (WAL, synchronous=NORMAL, busy_timeout, mmap)
+#
+#   python benchmarks/load_test.py --workers 4 --requests 100 --output results/load.json
+#
+# OCR is replaced by fixed text blocks (extract_text_blocks, the stage
+# both adaptive and single-pass OCR go through) and translation by the
+# stub backend, so the numbers reflect request handling and database
+# writes, not Tesseract. A translate response without the stub's text
+# counts as an error, so a stub the pipeline no longer calls shows up
+# in the report instead of passing as 'No text detected'. With --database-url every profile runs against that
+# database instead (pool settings then come from the DB_POOL_* variables).
+import argparse
+import io
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROFILES = {
+    'baseline': {'SQLITE_TUNING': '0'},
+    'tuned': {'SQLITE_TUNING': '1'},
+}
+
+STUB_BLOCKS = ['PHARMACY', 'OPEN 24 HOURS', 'NO PARKING', 'EXIT', 'CENTRAL STATION', 'BAKERY']
+
+
+def load_app(environment):
+    """Import the app with `environment` applied; runs inside a fresh process"""
+    os.environ.update(environment)
+    os.chdir(environment['LOAD_TEST_DIR'])
+    sys.path.insert(0, BACKEND_DIR)
+    import contextlib
+    with contextlib.redirect_stdout(io.StringIO()):
+        import app as app_module
+    return app_module
+
+
+def setup_database(environment):
+    app_module = load_app(environment)
+    with app_module.app.app_context():
+        app_module.create_tables()
+
+
+def worker(environment, worker_id, requests, history_ratio, seed, barrier, results):
+    """One 'gunicorn worker': its own process, engine and session cookie"""
+    import contextlib
+    import cv2
+    import numpy as np
+
+    app_module = load_app(environment)
+    from translators import StubTranslatorBackend
+    app_module.set_translator_backend(StubTranslatorBackend())
+    blocks = [{'text': text, 'x': 10, 'y': 10 + 30 * i, 'width': 120, 'height': 24, 'confidence': 90.0}
+              for i, text in enumerate(STUB_BLOCKS)]
+    app_module.extract_text_blocks = lambda image, *args, **kwargs: [dict(block) for block in blocks]
+
+    rng = random.Random(seed * 1000 + worker_id)
+    client = app_module.app.test_client()
+    base = np.full((120, 200, 3), 255, np.uint8)
+
+    def upload(index):
+        # A distinct image per request so the result cache never short-circuits the pipeline
+        image = base.copy()
+        image[0, :4] = (worker_id, index % 256, index // 256 % 256)
+        image[1, :4] = (seed % 256, rng.randrange(256), rng.randrange(256))
+        ok, buffer = cv2.imencode('.png', image)
+        return io.BytesIO(buffer.tobytes())
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        client.get('/api/history')  # Create the session before the clock starts
+        barrier.wait()
+        samples = []
+        for index in range(requests):
+            endpoint = 'history' if rng.random() < history_ratio else 'translate'
+            start = time.perf_counter()
+            try:
+                if endpoint == 'history':
+                    response = client.get('/api/history?per_page=10')
+                else:
+                    response = client.post('/api/translate', data={
+                        'image': (upload(index), f'load-{worker_id}-{index}.png'),
+                        'target_language': 'de'
+                    }, content_type='multipart/form-data')
+                status = response.status_code
+                body = response.get_json(silent=True) or {}
+                error = body.get('error') if status >= 400 else None
+                if endpoint == 'translate' and status < 400 and body.get('original_texts') != STUB_BLOCKS:
+                    error = 'OCR stub bypassed: ' + body.get('message', 'unexpected text')
+            except Exception as e:
+                status, error = 599, str(e)
+            samples.append((endpoint, start, time.perf_counter(), status, error))
+    results.put(samples)
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def summarize(samples):
+    started = min(sample[1] for sample in samples)
+    finished = max(sample[2] for sample in samples)
+    wall = finished - started
+    summary = {'wall_seconds': round(wall, 3), 'endpoints': {}}
+    for endpoint in ('translate', 'history'):
+        rows = [sample for sample in samples if sample[0] == endpoint]
+        if not rows:
+            continue
+        latencies = [end - start for _, start, end, _, _ in rows]
+        ok = [row for row in rows if row[3] < 400 and row[4] is None]
+        errors = {}
+        for row in rows:
+            if row[3] >= 400 or row[4] is not None:
+                errors[row[4] or str(row[3])] = errors.get(row[4] or str(row[3]), 0) + 1
+        summary['endpoints'][endpoint] = {
+            'requests': len(rows),
+            'succeeded': len(ok),
+            'throughput_per_second': round(len(ok) / wall, 2) if wall else None,
+            'latency_ms': {
+                'mean': round(statistics.mean(latencies) * 1000, 2),
+                'p50': round(percentile(latencies, 50) * 1000, 2),
+                'p95': round(percentile(latencies, 95) * 1000, 2),
+                'p99': round(percentile(latencies, 99) * 1000, 2),
+                'max': round(max(latencies) * 1000, 2),
+            },
+            'errors': errors,
+        }
+    return summary
+
+
+def run_profile(name, overrides, args):
+    scratch = tempfile.mkdtemp(prefix=f'signboard-load-{name}-')
+    environment = dict(overrides)
+    environment['LOAD_TEST_DIR'] = scratch
+    environment['DATABASE_URL'] = args.database_url or 'sqlite:///' + os.path.join(scratch, 'load.db')
+    environment['RENDER_FOLDER'] = os.path.join(scratch, 'rendered')
+    environment['SESSION_ACTIVITY_FLUSH_INTERVAL'] = str(args.activity_flush_interval)
+
+    context = multiprocessing.get_context('spawn')
+    setup = context.Process(target=setup_database, args=(environment,))
+    setup.start()
+    setup.join()
+
+    barrier = context.Barrier(args.workers)
+    results = context.Queue()
+    processes = [
+        context.Process(target=worker, args=(environment, i, args.requests, args.history_ratio,
+                                             args.seed, barrier, results))
+        for i in range(args.workers)
+    ]
+    for process in processes:
+        process.start()
+    samples = []
+    for _ in processes:
+        samples.extend(results.get())
+    for process in processes:
+        process.join()
+    shutil.rmtree(scratch, ignore_errors=True)
+
+    summary = summarize(samples)
+    summary['profile'] = name
+    summary['environment'] = overrides
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Concurrent translate/history load test')
+    parser.add_argument('--workers', type=int, default=4, help='worker processes sharing the database')
+    parser.add_argument('--requests', type=int, default=50, help='requests per worker')
+    parser.add_argument('--history-ratio', type=float, default=0.5, help='share of /api/history requests')
+    parser.add_argument('--profiles', nargs='+', default=list(PROFILES), choices=list(PROFILES))
+    parser.add_argument('--activity-flush-interval', type=float, default=30,
+                        help='SESSION_ACTIVITY_FLUSH_INTERVAL for the workers (0 = write every request)')
+    parser.add_argument('--database-url', help='run against this database instead of scratch SQLite files')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='write the JSON report here (default: stdout)')
+    args = parser.parse_args()
+
+    report = {
+        'timestamp': datetime.utcnow().isoformat() + 'Z',
+        'cpu_count': os.cpu_count(),
+        'args': vars(args),
+        'results': []
+    }
+    for name in args.profiles:
+        print(f'{name}: {args.workers} workers x {args.requests} requests', file=sys.stderr)
+        report['results'].append(run_profile(name, PROFILES[name], args))
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+        print(f'wrote {args.output}', file=sys.stderr)
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+# synthetic.py - Synthetic signboard images with known text for benchmarks
+import os
+import random
+
+import cv2
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+SIGN_TEXTS = [
+    'PHARMACY', 'OPEN 24 HOURS', 'EXIT', 'NO PARKING', 'RUE DE LA PAIX',
+    'BAKERY', 'CENTRAL STATION', 'HOTEL', 'TOILETS', 'EMERGENCY EXIT',
+    'APOTHEKE', 'AUSGANG', 'FARMACIA', 'SALIDA', 'BOULANGERIE'
+]
+
+# Sign texts per script; Latin is drawn with OpenCV's built-in font, the
+# others need a TrueType font covering the script (see find_font)
+SCRIPT_TEXTS = {
+    'latin': SIGN_TEXTS,
+    'cyrillic': ['АПТЕКА', 'ВЫХОД', 'ВХОД', 'ОТКРЫТО', 'ГОСТИНИЦА', 'ВОКЗАЛ', 'ТУАЛЕТ', 'ХЛЕБ'],
+    'greek': ['ΦΑΡΜΑΚΕΙΟ', 'ΕΞΟΔΟΣ', 'ΕΙΣΟΔΟΣ', 'ΑΝΟΙΧΤΟ', 'ΞΕΝΟΔΟΧΕΙΟ', 'ΣΤΑΘΜΟΣ', 'ΤΟΥΑΛΕΤΕΣ'],
+    'cjk': ['出口', '入口', '药店', '营业中', '酒店', '火车站', '洗手间', '禁止停车'],
+}
+
+FONT_CANDIDATES = {
+    'cyrillic': ['DejaVuSans-Bold.ttf', 'DejaVuSans.ttf', 'arialbd.ttf', 'arial.ttf', 'Arial.ttf'],
+    'greek': ['DejaVuSans-Bold.ttf', 'DejaVuSans.ttf', 'arialbd.ttf', 'arial.ttf', 'Arial.ttf'],
+    'cjk': ['NotoSansCJK-Regular.ttc', 'NotoSansCJK-Bold.ttc', 'msyh.ttc', 'simhei.ttf', 'PingFang.ttc'],
+}
+
+FONT_DIRS = [
+    '/usr/share/fonts', '/usr/local/share/fonts', '/Library/Fonts', '/System/Library/Fonts',
+    os.path.join(os.environ.get('WINDIR', r'C:\Windows'), 'Fonts'),
+]
+
+# Megapixel sizes typical of phone uploads
+SIZES = {
+    'small': (800, 600),
+    'medium': (2048, 1536),
+    'large': (4032, 3024),
+}
+
+
+def make_sign(width, height, lines, seed=0, noise=True):
+    """Draw text lines on a sign-like background; returns a BGR image"""
+    rng = random.Random(seed)
+    background = rng.randint(170, 245)
+    image = np.full((height, width, 3), background, np.uint8)
+    if noise:
+        np_rng = np.random.default_rng(seed)
+        image = cv2.add(image, np_rng.integers(0, 20, image.shape, dtype=np.uint8))
+
+    font_scale = width / 500.0
+    thickness = max(2, int(font_scale * 2))
+    line_height = height // (len(lines) + 1)
+    for i, text in enumerate(lines):
+        (text_w, _), _ = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, font_scale, thickness)
+        x = max(10, (width - text_w) // 2 + rng.randint(-width // 20, width // 20))
+        y = line_height * (i + 1)
+        color = (rng.randint(0, 60),) * 3
+        cv2.putText(image, text, (x, y), cv2.FONT_HERSHEY_SIMPLEX, font_scale, color, thickness, cv2.LINE_AA)
+    return image
+
+
+def find_font(script):
+    """Path of an installed TrueType font for `script`, or None"""
+    names = FONT_CANDIDATES.get(script, [])
+    for directory in FONT_DIRS:
+        if not os.path.isdir(directory):
+            continue
+        for root, _, files in os.walk(directory):
+            for name in names:
+                if name in files:
+                    return os.path.join(root, name)
+    return None
+
+
+def make_sign_truetype(width, height, lines, font_path, seed=0, noise=True):
+    """Like make_sign, but draws the text with a TrueType font (any script)"""
+    rng = random.Random(seed)
+    background = rng.randint(170, 245)
+    image = np.full((height, width, 3), background, np.uint8)
+    if noise:
+        np_rng = np.random.default_rng(seed)
+        image = cv2.add(image, np_rng.integers(0, 20, image.shape, dtype=np.uint8))
+
+    pil_image = Image.fromarray(image)
+    draw = ImageDraw.Draw(pil_image)
+    line_height = height // (len(lines) + 1)
+    font = ImageFont.truetype(font_path, max(12, int(line_height * 0.5)))
+    for i, text in enumerate(lines):
+        left, top, right, bottom = draw.textbbox((0, 0), text, font=font)
+        x = max(10, (width - (right - left)) // 2 + rng.randint(-width // 20, width // 20))
+        y = line_height * (i + 1) - (bottom - top)
+        color = (rng.randint(0, 60),) * 3
+        draw.text((x, y), text, font=font, fill=color)
+    return np.array(pil_image)
+
+
+def make_corpus(count=12, sizes=None, seed=0, script='latin', font_path=None):
+    """List of (name, image, lines) covering the requested sizes
+
+    Scripts other than Latin need `font_path` (see find_font).
+    """
+    rng = random.Random(seed)
+    texts = SCRIPT_TEXTS[script]
+    corpus = []
+    for size_name in sizes or SIZES:
+        width, height = SIZES[size_name]
+        for i in range(count):
+            lines = rng.sample(texts, rng.randint(1, 3))
+            if script == 'latin':
+                image = make_sign(width, height, lines, seed=seed + i)
+            else:
+                image = make_sign_truetype(width, height, lines, font_path, seed=seed + i)
+            name = f'{size_name}-{i}' if script == 'latin' else f'{script}-{size_name}-{i}'
+            corpus.append((name, image, lines))
+    return corpus
+
+
+def word_recall(expected_lines, text_blocks):
+    """Fraction of expected words found among the OCR block texts"""
+    expected = [word for line in expected_lines for word in line.split()]
+    found = {word.upper() for block in text_blocks for word in block['text'].split()}
+    if not expected:
+        return 1.0
+    return sum(1 for word in expected if word in found) / len(expected)
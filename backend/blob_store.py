@@ -0,0 +1,114 @@
+# blob_store.py - Content-addressed local storage for rendered images
+import hashlib
+import io
+import os
+import re
+import tempfile
+
+import cv2
+import numpy as np
+from PIL import Image
+
+KEY_PATTERN = re.compile(r'^[0-9a-f]{64}\.(png|jpg|webp)$')
+
+RENDER_FORMATS = {
+    # format name: (PIL format, file extension, mimetype)
+    'png': ('PNG', 'png', 'image/png'),
+    'jpeg': ('JPEG', 'jpg', 'image/jpeg'),
+    'webp': ('WEBP', 'webp', 'image/webp'),
+}
+
+MIMETYPES = {extension: mimetype for _, extension, mimetype in RENDER_FORMATS.values()}
+
+
+def encode_image(pil_image, image_format='webp', quality=85, png_compress_level=3):
+    """Encode a PIL image; returns (bytes, file extension)"""
+    pil_format, extension, _ = RENDER_FORMATS[image_format]
+    buffer = io.BytesIO()
+    if pil_format == 'PNG':
+        pil_image.save(buffer, format=pil_format, compress_level=png_compress_level)
+    elif pil_format == 'JPEG':
+        pil_image.convert('RGB').save(buffer, format=pil_format, quality=quality, optimize=False)
+    else:
+        pil_image.save(buffer, format=pil_format, quality=quality, method=2)
+    return buffer.getvalue(), extension
+
+
+def encode_array(image, image_format='webp', quality=85, png_compress_level=3):
+    """Encode a BGR numpy image without a separate colour conversion; returns (bytes, file extension)
+
+    PNG goes through OpenCV, which is faster at it; WebP and JPEG are
+    faster in Pillow, which unpacks the BGR buffer directly.
+    """
+    if image_format == 'png':
+        ok, buffer = cv2.imencode('.png', image, [cv2.IMWRITE_PNG_COMPRESSION, png_compress_level])
+        if not ok:
+            raise ValueError('Could not encode image as png')
+        return buffer.tobytes(), 'png'
+    height, width = image.shape[:2]
+    pil_image = Image.frombuffer('RGB', (width, height), np.ascontiguousarray(image), 'raw', 'BGR', 0, 1)
+    return encode_image(pil_image, image_format=image_format, quality=quality,
+                        png_compress_level=png_compress_level)
+
+
+class BlobStore:
+    """Stores each distinct blob once, named by the SHA-256 of its content
+
+    Files are sharded into subdirectories by the first two hex digits of
+    the hash. Keys look like '<sha256>.<extension>'.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def path(self, key):
+        """Filesystem path for a key, or None if the key is malformed"""
+        if not KEY_PATTERN.match(key):
+            return None
+        return os.path.join(self.root, key[:2], key)
+
+    def exists(self, key):
+        path = self.path(key)
+        return path is not None and os.path.exists(path)
+
+    def put(self, data, extension):
+        """Store bytes and return their key; existing blobs are not rewritten"""
+        key = f'{hashlib.sha256(data).hexdigest()}.{extension}'
+        path = self.path(key)
+        if os.path.exists(path):
+            return key
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        # Write to a temp file and rename so readers never see partial blobs
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as tmp:
+                tmp.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return key
+
+    def size(self, key):
+        """Stored size in bytes, 0 if the blob does not exist"""
+        path = self.path(key)
+        try:
+            return os.path.getsize(path) if path else 0
+        except OSError:
+            return 0
+
+    def delete(self, key):
+        """Remove a blob; missing blobs are ignored"""
+        path = self.path(key)
+        if path is None:
+            return
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def mimetype(self, key):
+        return MIMETYPES.get(key.rsplit('.', 1)[-1], 'application/octet-stream')
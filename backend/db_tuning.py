@@ -0,0 +1,63 @@
+# db_tuning.py - Engine options and SQLite pragmas for concurrent workers
+#
+# SQLite: every new connection is switched to WAL (readers no longer wait
+# for the writer), synchronous=NORMAL (safe with WAL, no fsync per
+# commit), a busy timeout so writers queue instead of failing with
+# "database is locked", and memory-mapped reads.
+# Server databases: a bounded, pre-pinged, recycled connection pool.
+from sqlalchemy import event
+
+JOURNAL_MODES = {'DELETE', 'TRUNCATE', 'PERSIST', 'MEMORY', 'WAL', 'OFF'}
+SYNCHRONOUS_MODES = {'OFF', 'NORMAL', 'FULL', 'EXTRA'}
+
+
+def is_sqlite(uri):
+    return uri.startswith('sqlite')
+
+
+def engine_options(uri, config):
+    """SQLALCHEMY_ENGINE_OPTIONS for the configured database"""
+    if is_sqlite(uri):
+        if not config['SQLITE_TUNING']:
+            return {}
+        # pysqlite's own timeout (seconds) backs up PRAGMA busy_timeout
+        return {'connect_args': {'timeout': config['SQLITE_BUSY_TIMEOUT'] / 1000.0}}
+    return {
+        'pool_size': config['DB_POOL_SIZE'],
+        'max_overflow': config['DB_MAX_OVERFLOW'],
+        'pool_timeout': config['DB_POOL_TIMEOUT'],
+        'pool_recycle': config['DB_POOL_RECYCLE'],
+        'pool_pre_ping': config['DB_POOL_PRE_PING'],
+    }
+
+
+def sqlite_pragmas(config):
+    """PRAGMA statements run on every new SQLite connection"""
+    journal_mode = config['SQLITE_JOURNAL_MODE'].upper()
+    synchronous = config['SQLITE_SYNCHRONOUS'].upper()
+    if journal_mode not in JOURNAL_MODES:
+        raise ValueError(f'Unsupported SQLITE_JOURNAL_MODE: {journal_mode}')
+    if synchronous not in SYNCHRONOUS_MODES:
+        raise ValueError(f'Unsupported SQLITE_SYNCHRONOUS: {synchronous}')
+    return [
+        f'PRAGMA journal_mode={journal_mode}',
+        f'PRAGMA synchronous={synchronous}',
+        f"PRAGMA busy_timeout={int(config['SQLITE_BUSY_TIMEOUT'])}",
+        f"PRAGMA mmap_size={int(config['SQLITE_MMAP_SIZE'])}",
+    ]
+
+
+def install_sqlite_pragmas(engine, config):
+    """Apply the SQLite pragmas to each connection the engine opens"""
+    if engine.dialect.name != 'sqlite' or not config['SQLITE_TUNING']:
+        return
+    pragmas = sqlite_pragmas(config)
+
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
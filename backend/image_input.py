@@ -0,0 +1,162 @@
+# image_input.py - Upload sniffing and budgeted image decoding
+#
+# The header (format and declared dimensions) is read without touching
+# the pixel data, so oversized or mislabelled uploads are refused before
+# anything large is allocated. JPEGs that are larger than the decode
+# budget are decoded at 1/2, 1/4 or 1/8 scale by libjpeg itself
+# (IMREAD_REDUCED_*), which never materialises the full-size frame; other
+# formats cannot be reduced while decoding and are rejected instead.
+#
+# Uploads are handled as the spooled request file rather than as bytes:
+# decoding reads an in-memory spool in place and memory-maps one that
+# spilled to disk, so the encoded body is never copied into a bytes object.
+import io
+import math
+import mmap
+import tempfile
+
+import cv2
+import numpy as np
+from flask import Request, current_app
+from PIL import Image, UnidentifiedImageError
+
+# PIL format name -> format we report
+SUPPORTED_FORMATS = {'JPEG': 'jpeg', 'MPO': 'jpeg', 'PNG': 'png', 'GIF': 'gif'}
+
+REDUCED_DECODE_FLAGS = [
+    (1, cv2.IMREAD_COLOR),
+    (2, cv2.IMREAD_REDUCED_COLOR_2),
+    (4, cv2.IMREAD_REDUCED_COLOR_4),
+    (8, cv2.IMREAD_REDUCED_COLOR_8),
+]
+
+CHANNELS = 3  # Decoded frames are BGR
+
+
+class ImageRejected(Exception):
+    """Upload that is not a usable image or exceeds a budget; carries the HTTP status"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+class ImageHeader:
+    """Format and declared size of an encoded image"""
+
+    def __init__(self, image_format, width, height):
+        self.format = image_format
+        self.width = width
+        self.height = height
+
+    @property
+    def pixels(self):
+        return self.width * self.height
+
+    def __repr__(self):
+        return f'<ImageHeader {self.format} {self.width}x{self.height}>'
+
+
+class SpooledRequest(Request):
+    """Request whose file uploads spill to a temporary file past UPLOAD_SPOOL_MAX_MEMORY bytes"""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return tempfile.SpooledTemporaryFile(max_size=current_app.config['UPLOAD_SPOOL_MAX_MEMORY'], mode='rb+')
+
+
+def sniff_image(source):
+    """ImageHeader for encoded bytes or a seekable file, reading only the header
+
+    File positions are restored afterwards. Raises ImageRejected for
+    anything that is not a supported image.
+    """
+    stream = io.BytesIO(source) if is_bytes(source) else source
+    position = stream.tell()
+    try:
+        # Image.open parses the header only; pixels are decoded on load(), which is never called
+        with Image.open(stream) as image:
+            image_format = image.format
+            width, height = image.size
+    except Image.DecompressionBombError:
+        raise ImageRejected('Image resolution is too large', 413)
+    except (UnidentifiedImageError, OSError, SyntaxError, ValueError):
+        raise ImageRejected('Invalid image file', 400)
+    finally:
+        stream.seek(position)
+    if image_format not in SUPPORTED_FORMATS:
+        raise ImageRejected(f'Unsupported image format: {image_format}', 400)
+    return ImageHeader(SUPPORTED_FORMATS[image_format], width, height)
+
+
+def is_bytes(source):
+    """Whether an upload is given as bytes rather than a file"""
+    return isinstance(source, (bytes, bytearray, memoryview))
+
+
+def upload_size(source):
+    """Length in bytes of encoded bytes or a seekable file; the file position is left alone"""
+    if is_bytes(source):
+        return len(source)
+    position = source.tell()
+    size = source.seek(0, io.SEEK_END)
+    source.seek(position)
+    return size
+
+
+def encoded_buffer(source):
+    """uint8 array over the encoded bytes of `source` (bytes or a whole upload file), without copying
+
+    A spool still in memory is viewed in place and a file on disk is
+    memory-mapped read-only. Streams that are neither are read.
+    """
+    if is_bytes(source):
+        return np.frombuffer(source, np.uint8)
+    raw = getattr(source, '_file', source)  # SpooledTemporaryFile's BytesIO or file
+    if hasattr(raw, 'getbuffer'):
+        return np.frombuffer(raw.getbuffer(), np.uint8)
+    try:
+        fileno = raw.fileno()
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        fileno = None
+    if fileno is not None:
+        source.flush()
+        return np.frombuffer(mmap.mmap(fileno, 0, access=mmap.ACCESS_READ), np.uint8)
+    position = source.tell()
+    source.seek(0)
+    content = source.read()
+    source.seek(position)
+    return np.frombuffer(content, np.uint8)
+
+
+def decode_plan(header, max_pixels, max_decode_bytes):
+    """(reduction factor, imdecode flag) that keeps the decoded frame within budget
+
+    Raises ImageRejected (413) when the declared size exceeds max_pixels,
+    or when no allowed reduction fits max_decode_bytes.
+    """
+    if header.pixels > max_pixels:
+        raise ImageRejected(
+            f'Image is {header.width}x{header.height}; at most {max_pixels // 1000000} megapixels are accepted', 413
+        )
+    for factor, flag in REDUCED_DECODE_FLAGS:
+        if factor > 1 and header.format != 'jpeg':
+            break
+        decoded_bytes = math.ceil(header.width / factor) * math.ceil(header.height / factor) * CHANNELS
+        if decoded_bytes <= max_decode_bytes:
+            return factor, flag
+    raise ImageRejected(
+        f'Image is {header.width}x{header.height}; too large to decode within the memory budget', 413
+    )
+
+
+def decode_image(content, max_pixels, max_decode_bytes):
+    """Sniff, budget-check and decode an upload (bytes or file); returns (BGR image, header, reduction factor)"""
+    header = sniff_image(content)
+    factor, flag = decode_plan(header, max_pixels, max_decode_bytes)
+    image = cv2.imdecode(encoded_buffer(content), flag)
+    if image is None:
+        raise ImageRejected('Invalid image file', 400)
+    if factor > 1:
+        print(f"Decoded {header.width}x{header.height} {header.format} at 1/{factor} scale")
+    return image, header, factor
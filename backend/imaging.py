@@ -0,0 +1,145 @@
+# imaging.py - Resolution normalisation and ROI cropping ahead of OCR
+import math
+
+import cv2
+import numpy as np
+
+from ocr import find_text_regions
+
+THUMBNAIL_SIDE = 1024  # Longest side of the probe image used for estimates
+
+
+class OcrTransform:
+    """Maps coordinates from the OCR input back to the original image
+
+    original = offset + ocr / scale
+    """
+
+    def __init__(self, scale=1.0, offset_x=0, offset_y=0):
+        self.scale = scale
+        self.offset_x = offset_x
+        self.offset_y = offset_y
+
+    @property
+    def is_identity(self):
+        return self.scale == 1.0 and self.offset_x == 0 and self.offset_y == 0
+
+    def to_original(self, text_blocks):
+        """Rescale block boxes in place into original image space"""
+        if self.is_identity:
+            return text_blocks
+        for block in text_blocks:
+            block['x'] = int(round(self.offset_x + block['x'] / self.scale))
+            block['y'] = int(round(self.offset_y + block['y'] / self.scale))
+            block['width'] = int(round(block['width'] / self.scale))
+            block['height'] = int(round(block['height'] / self.scale))
+        return text_blocks
+
+
+def downscale(image, scale):
+    """Resize by `scale` < 1, returning the image and the exact scale achieved
+
+    Halving with INTER_AREA has a fast path in OpenCV, so the image is
+    halved while possible and the remaining (< 2x) step is linear.
+    Arbitrary-ratio INTER_AREA is several times slower on large photos.
+    """
+    height, width = image.shape[:2]
+    remaining = scale
+    while remaining <= 0.5:
+        image = cv2.resize(image, (max(1, image.shape[1] // 2), max(1, image.shape[0] // 2)),
+                           interpolation=cv2.INTER_AREA)
+        remaining *= 2
+    if remaining < 1.0:
+        target = (max(1, int(width * scale)), max(1, int(height * scale)))
+        image = cv2.resize(image, target, interpolation=cv2.INTER_LINEAR)
+    return image, image.shape[1] / width
+
+
+def make_probe(image):
+    """Small grayscale copy of the image and the factor it was shrunk by"""
+    height, width = image.shape[:2]
+    factor = 1.0
+    if max(height, width) > THUMBNAIL_SIDE:
+        image, factor = downscale(image, THUMBNAIL_SIDE / max(height, width))
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+    return gray, factor
+
+
+def estimate_text_height(probe_gray):
+    """Median height of character-like connected components, in probe pixels
+
+    Returns None when nothing resembling text is found.
+    """
+    binary = cv2.adaptiveThreshold(
+        probe_gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY_INV, 15, 10
+    )
+    count, _, stats, _ = cv2.connectedComponentsWithStats(binary, connectivity=8)
+    if count <= 1:
+        return None
+
+    heights = stats[1:, cv2.CC_STAT_HEIGHT]
+    widths = stats[1:, cv2.CC_STAT_WIDTH]
+    areas = stats[1:, cv2.CC_STAT_AREA]
+    fill = areas / np.maximum(heights * widths, 1)
+    probe_h = probe_gray.shape[0]
+    # Characters: not specks, not page-sized, roughly upright, partially filled
+    plausible = (
+        (heights >= 4) & (heights <= probe_h * 0.3) &
+        (widths <= heights * 3) & (fill > 0.1) & (fill < 0.95)
+    )
+    if plausible.sum() < 3:
+        return None
+    return float(np.median(heights[plausible]))
+
+
+def text_bounding_box(probe_gray, margin=0.05):
+    """Union of detected text regions in probe coordinates, or None"""
+    _, binary = cv2.threshold(probe_gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    regions = find_text_regions(binary, max_coverage=0.9)
+    if not regions:
+        return None
+    x0 = min(x for x, _, _, _ in regions)
+    y0 = min(y for _, y, _, _ in regions)
+    x1 = max(x + w for x, _, w, _ in regions)
+    y1 = max(y + h for _, y, _, h in regions)
+    pad_x, pad_y = int((x1 - x0) * margin), int((y1 - y0) * margin)
+    return x0 - pad_x, y0 - pad_y, x1 + pad_x, y1 + pad_y
+
+
+def normalize_for_ocr(image, target_text_height=32, max_pixels=4000000, crop_to_text=False):
+    """Downscale (and optionally crop) an image to what OCR actually needs
+
+    The scale brings the estimated character height down to
+    `target_text_height` and keeps the image under `max_pixels`; images
+    are never upscaled. With `crop_to_text` the image is first cropped to
+    the union of detected text regions. Returns (ocr_image, OcrTransform).
+    """
+    height, width = image.shape[:2]
+    probe, probe_factor = make_probe(image)
+    transform = OcrTransform()
+
+    if crop_to_text:
+        box = text_bounding_box(probe)
+        if box is not None:
+            x0 = max(0, int(box[0] / probe_factor))
+            y0 = max(0, int(box[1] / probe_factor))
+            x1 = min(width, int(math.ceil(box[2] / probe_factor)))
+            y1 = min(height, int(math.ceil(box[3] / probe_factor)))
+            if (x1 - x0) * (y1 - y0) < 0.9 * width * height:
+                image = image[y0:y1, x0:x1]
+                transform.offset_x, transform.offset_y = x0, y0
+                height, width = image.shape[:2]
+                probe, probe_factor = make_probe(image)
+
+    scale = 1.0
+    text_height = estimate_text_height(probe)
+    if text_height is not None and target_text_height:
+        scale = min(scale, target_text_height / (text_height / probe_factor))
+    if max_pixels and width * height > max_pixels:
+        scale = min(scale, math.sqrt(max_pixels / (width * height)))
+
+    if scale < 1.0:
+        # Use the exact achieved ratio so boxes map back precisely
+        image, transform.scale = downscale(image, scale)
+    return image, transform
+
@@ -0,0 +1,256 @@
+# jobs.py - Asynchronous translation jobs on a local worker pool
+#
+# The translation_jobs table is the broker: the web process inserts a row
+# and hands the job id to a local pool, and a worker claims the row with a
+# conditional UPDATE before running the pipeline. No external services
+# are needed, and a job can never run twice.
+#
+# Jobs left behind by a web process that stopped (still 'queued', or
+# 'running' past their timeout) are picked up by the next process to
+# serve a request: queued jobs are dispatched again, overdue running jobs
+# are failed. Since claiming is conditional, re-dispatching a job another
+# process still holds is harmless.
+import json
+import os
+import shutil
+import signal
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from models import db, TranslationJob
+
+ACTIVE_STATUSES = ('queued', 'running')
+
+
+class JobTimeout(Exception):
+    """Raised inside a worker when a job exceeds its timeout"""
+
+
+@contextmanager
+def job_deadline(seconds):
+    """Interrupt the enclosed block after `seconds` where SIGALRM is available.
+
+    Pool workers run jobs on their main thread, so the alarm fires inside
+    the pipeline. Elsewhere (thread executor, Windows) overdue jobs are
+    marked as timed out by JobQueue.expire instead.
+    """
+    if not seconds or not hasattr(signal, 'SIGALRM') or threading.current_thread() is not threading.main_thread():
+        yield
+        return
+
+    def handle_alarm(signum, frame):
+        raise JobTimeout(f'Job exceeded {seconds}s timeout')
+
+    previous = signal.signal(signal.SIGALRM, handle_alarm)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def init_worker():
+    """Drop database connections inherited from the parent process"""
+    from app import app
+    with app.app_context():
+        db.engine.dispose(close=False)
+
+
+def run_job(job_id):
+    """Worker entry point: claim the job row and run the pipeline"""
+    from app import app, process_upload
+
+    with app.app_context():
+        claimed = TranslationJob.query.filter_by(id=job_id, status='queued')\
+                                      .update({'status': 'running', 'started_at': datetime.utcnow()})
+        db.session.commit()
+        if not claimed:
+            return
+
+        job = db.session.get(TranslationJob, job_id)
+        upload_path = job.upload_path
+        try:
+            with open(upload_path, 'rb') as upload, job_deadline(job.timeout):
+                result, status_code = process_upload(
+                    upload, job.original_filename, job.target_language, job.session_id,
+                    preprocess_profile=job.preprocess_profile
+                )
+            outcome = {
+                'status': 'succeeded' if status_code < 400 else 'failed',
+                'result': json.dumps(result),
+                'status_code': status_code,
+                'error': result.get('error')
+            }
+        except JobTimeout as e:
+            db.session.rollback()
+            outcome = {'status': 'timeout', 'status_code': 504, 'error': str(e)}
+        except Exception as e:
+            print(f"Job {job_id} failed: {e}")
+            db.session.rollback()
+            outcome = {'status': 'failed', 'status_code': 500, 'error': f'Processing failed: {str(e)}'}
+        finally:
+            try:
+                os.remove(upload_path)
+            except OSError:
+                pass
+
+        # Leave the row alone if JobQueue.expire already gave up on it
+        outcome['finished_at'] = datetime.utcnow()
+        TranslationJob.query.filter_by(id=job_id, status='running').update(outcome)
+        db.session.commit()
+
+
+class JobQueue:
+    """Bounded queue of translation jobs backed by a local executor"""
+
+    def __init__(self, app=None):
+        self.app = None
+        self._executor = None
+        self._lock = threading.Lock()
+        self._held = set()  # Ids dispatched by this process and not finished yet
+        self._held_lock = threading.Lock()
+        self._recovered = False
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        app.config.setdefault('JOB_WORKERS', os.cpu_count() or 2)
+        app.config.setdefault('JOB_QUEUE_DEPTH', 100)
+        app.config.setdefault('JOB_TIMEOUT', 120)
+        app.config.setdefault('JOB_EXECUTOR', 'process')  # 'process' or 'thread'
+        app.config.setdefault('JOB_RECOVERY_GRACE', 60)
+        app.before_request(self.recover_once)
+
+    @property
+    def executor(self):
+        with self._lock:
+            if self._executor is None:
+                workers = self.app.config['JOB_WORKERS']
+                if self.app.config['JOB_EXECUTOR'] == 'thread':
+                    self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='translation-job')
+                else:
+                    self._executor = ProcessPoolExecutor(max_workers=workers, initializer=init_worker)
+            return self._executor
+
+    def _dispatch(self, job_id):
+        with self._held_lock:
+            self._held.add(job_id)
+        try:
+            future = self.executor.submit(run_job, job_id)
+        except BrokenProcessPool:
+            # A worker died; start a fresh pool and try once more
+            with self._lock:
+                self._executor = None
+            future = self.executor.submit(run_job, job_id)
+        future.add_done_callback(lambda _: self._release(job_id))
+
+    def _release(self, job_id):
+        with self._held_lock:
+            self._held.discard(job_id)
+
+    def depth(self):
+        """Jobs this process has dispatched that have not finished yet"""
+        with self._held_lock:
+            return len(self._held)
+
+    def recover_once(self):
+        """Run recover() the first time this process serves a request"""
+        if self._recovered:
+            return
+        with self._lock:
+            if self._recovered:
+                return
+            self._recovered = True
+        try:
+            self.recover()
+        except Exception as e:
+            db.session.rollback()
+            print(f"Job recovery failed: {e}")
+
+    def recover(self):
+        """Re-dispatch queued jobs and fail overdue running jobs left by a stopped process
+
+        Only jobs older than JOB_RECOVERY_GRACE seconds (and running jobs
+        past their timeout plus that grace) are touched, so jobs a live
+        process has just queued or started are left alone.
+        """
+        grace = self.app.config['JOB_RECOVERY_GRACE']
+        now = datetime.utcnow()
+        cutoff = now - timedelta(seconds=grace)
+        stale = TranslationJob.query.filter(TranslationJob.status.in_(ACTIVE_STATUSES),
+                                            TranslationJob.created_at < cutoff).all()
+        redispatch = []
+        for job in stale:
+            if job.status == 'queued' and os.path.exists(job.upload_path):
+                redispatch.append(job.id)
+                continue
+            if job.status == 'queued':
+                error = 'Upload was lost before the job ran'
+            elif job.started_at is not None and now > job.started_at + timedelta(seconds=(job.timeout or 0) + grace):
+                error = 'Job was interrupted by a server restart'
+            else:
+                continue  # Possibly still running in another process
+            TranslationJob.query.filter_by(id=job.id, status=job.status).update({
+                'status': 'failed',
+                'status_code': 500,
+                'error': error,
+                'finished_at': now
+            })
+            try:
+                os.remove(job.upload_path)
+            except OSError:
+                pass
+        db.session.commit()
+
+        for job_id in redispatch:
+            self._dispatch(job_id)
+        if stale:
+            print(f"Job recovery: re-dispatched {len(redispatch)} of {len(stale)} stale jobs")
+
+    def submit(self, upload_file, original_filename, target_language, session_id, preprocess_profile=None):
+        """Copy the upload file to disk and queue it; returns None when the queue is full"""
+        if self.depth() >= self.app.config['JOB_QUEUE_DEPTH']:
+            return None
+
+        job_id = str(uuid.uuid4())
+        upload_path = os.path.abspath(os.path.join(self.app.config['UPLOAD_FOLDER'], f'job-{job_id}'))
+        upload_file.seek(0)
+        with open(upload_path, 'wb') as upload:
+            shutil.copyfileobj(upload_file, upload)
+
+        job = TranslationJob(
+            id=job_id,
+            session_id=session_id,
+            original_filename=original_filename,
+            target_language=target_language,
+            preprocess_profile=preprocess_profile,
+            upload_path=upload_path,
+            timeout=self.app.config['JOB_TIMEOUT']
+        )
+        db.session.add(job)
+        db.session.commit()
+
+        self._dispatch(job.id)
+        return job
+
+    def expire(self, job, grace=5):
+        """Mark a job that overran its timeout without reporting back"""
+        if job.status != 'running' or not job.timeout or job.started_at is None:
+            return job
+        if datetime.utcnow() > job.started_at + timedelta(seconds=job.timeout + grace):
+            updated = TranslationJob.query.filter_by(id=job.id, status='running').update({
+                'status': 'timeout',
+                'status_code': 504,
+                'error': f'Job exceeded {job.timeout}s timeout',
+                'finished_at': datetime.utcnow()
+            })
+            db.session.commit()
+            if updated:
+                db.session.refresh(job)
+        return job
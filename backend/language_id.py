@@ -0,0 +1,207 @@
+# language_id.py - Local language identification for OCR text
+#
+# Runs before translation so blocks already in the target language never
+# reach the translator. Non-Latin scripts mostly identify the language on
+# their own; Latin text is scored against small per-language profiles of
+# common (sign) words and characteristic character n-grams. Short or
+# ambiguous text is reported as unknown rather than guessed; such text can
+# still be recognised as standard signage of a given language (OPEN,
+# HOTEL, CENTRAL STATION) by reads_as().
+import re
+import unicodedata
+
+# Scripts that (nearly) pin down a language
+SCRIPT_LANGUAGES = {
+    'GREEK': 'el',
+    'HANGUL': 'ko',
+    'HIRAGANA': 'ja',
+    'KATAKANA': 'ja',
+    'CJK': 'zh',
+    'THAI': 'th',
+    'HEBREW': 'he',
+    'ARABIC': 'ar',
+    'DEVANAGARI': 'hi',
+    'CYRILLIC': 'ru',
+}
+
+UKRAINIAN_LETTERS = set('іїєґІЇЄҐ')
+
+LATIN_WORDS = {
+    'en': 'the and of to in for is on with no not open closed exit entrance street road station '
+          'pharmacy bakery parking please only keep out push pull toilets welcome sale stop way '
+          'hours caution danger private emergency smoking entry left right floor this do',
+    'fr': 'le la les de des du et est une un pour pas ne sur avec rue sortie entrée ouvert fermé '
+          'interdit défense gare boulangerie pharmacie toilettes bienvenue poussez tirez au aux '
+          'stationnement fumer chien attention privé à vous',
+    'de': 'der die das und ist nicht mit für von zu im auf ein eine straße ausgang eingang '
+          'geöffnet geschlossen verboten bahnhof apotheke bäckerei parken rauchen bitte ziehen '
+          'drücken willkommen achtung privat notausgang zum zur',
+    'es': 'el la los las de del y es en un una por para con no salida entrada abierto cerrado '
+          'prohibido calle estación farmacia panadería fumar bienvenidos empuje tire baños '
+          'aparcar estacionar privado peligro al',
+    'it': 'il lo la gli le di del e è in un una per con non uscita ingresso aperto chiuso '
+          'vietato via stazione farmacia panetteria fumare benvenuti spingere tirare bagni '
+          'sosta privato pericolo alla',
+    'pt': 'o a os as de do da e é em um uma para com não saída entrada aberto fechado proibido '
+          'rua estação farmácia padaria fumar bem-vindo empurre puxe banheiros estacionar '
+          'privado perigo ao',
+    'nl': 'de het een en is van in op met niet voor uitgang ingang open gesloten verboden straat '
+          'station apotheek bakkerij parkeren roken welkom duwen trekken toiletten privé gevaar',
+}
+LATIN_WORDS = {language: set(words.split()) for language, words in LATIN_WORDS.items()}
+
+# Words shared by several languages ('de', 'la', 'open') count for less
+WORD_WEIGHTS = {}
+for vocabulary in LATIN_WORDS.values():
+    for word in vocabulary:
+        WORD_WEIGHTS[word] = WORD_WEIGHTS.get(word, 0) + 1
+WORD_WEIGHTS = {word: 2.0 / languages for word, languages in WORD_WEIGHTS.items()}
+
+LATIN_NGRAMS = {
+    'en': ['th', 'ing', 'wh', 'ck', 'ou', 'ee'],
+    'fr': ['é', 'è', 'ê', 'ç', 'eau', 'oi', 'ou', 'tion', 'ée'],
+    'de': ['ß', 'ä', 'ö', 'ü', 'sch', 'ung', 'ei', 'ie', 'tz'],
+    'es': ['ñ', 'ción', 'á', 'í', 'ó', 'ú', 'll', 'rr'],
+    'it': ['zz', 'cc', 'gli', 'zione', 'ò', 'ì', 'tt'],
+    'pt': ['ã', 'õ', 'ção', 'ç', 'lh', 'nh'],
+    'nl': ['ij', 'aa', 'oo', 'uu', 'sch', 'ee'],
+}
+
+# Words that make up common signs on their own; many are shared across languages (TAXI, HOTEL),
+# which is why they decide whether a text reads as a language rather than which language it is
+SIGN_WORDS = {
+    'en': 'open closed hotel taxi central station bus train metro subway airport terminal gate arrivals '
+          'departures information info tickets ticket office restaurant cafe coffee bar pub shop store '
+          'market supermarket bank hospital police fire museum park parking garage toilet toilets restroom '
+          'restrooms men women ladies gentlemen lift elevator stairs escalator platform exit entrance way '
+          'in out push pull stop slow danger caution warning keep wet floor no smoking entry sale '
+          'welcome hours daily until closed sorry we are from to city centre center north south east west '
+          'street road avenue square bridge hall library school church post pharmacy bakery hotel hostel '
+          'wifi free reserved private staff only emergency lost found check security customs',
+    'fr': 'ouvert fermé sortie entrée gare hôtel taxi métro aéroport billets accueil toilettes hommes '
+          'femmes dames poussez tirez interdit défense stationnement pharmacie boulangerie boucherie '
+          'épicerie marché mairie poste rue avenue place pont centre ville attention danger privé '
+          'soldes bienvenue horaires complet libre',
+    'de': 'offen geöffnet geschlossen ausgang eingang bahnhof hauptbahnhof hotel taxi flughafen fahrkarten '
+          'toiletten herren damen drücken ziehen verboten parken apotheke bäckerei markt rathaus post '
+          'straße platz brücke zentrum achtung vorsicht privat notausgang willkommen',
+    'es': 'abierto cerrado salida entrada estación hotel taxi aeropuerto billetes taquilla aseos baños '
+          'caballeros señoras empuje tire prohibido farmacia panadería mercado correos calle avenida plaza '
+          'centro peligro privado bienvenidos',
+    'it': 'aperto chiuso uscita ingresso stazione albergo hotel taxi aeroporto biglietti bagni uomini donne '
+          'spingere tirare vietato farmacia panetteria mercato posta via piazza centro pericolo privato '
+          'benvenuti',
+}
+SIGN_WORDS = {language: set(words.split()) for language, words in SIGN_WORDS.items()}
+MAX_SIGN_WORDS = 4
+
+WORD_PATTERN = re.compile(r'[^\W\d_]+', re.UNICODE)
+
+
+def char_script(char):
+    """Unicode script family of a letter, from its character name"""
+    name = unicodedata.name(char, '')
+    if name.startswith('CJK'):
+        return 'CJK'
+    for script in SCRIPT_LANGUAGES:
+        if name.startswith(script):
+            return script
+    if name.startswith('LATIN'):
+        return 'LATIN'
+    return None
+
+
+def script_counts(text):
+    counts = {}
+    for char in text:
+        if char.isalpha():
+            script = char_script(char)
+            if script:
+                counts[script] = counts.get(script, 0) + 1
+    return counts
+
+
+def score_latin(text):
+    """{language: score} for Latin-script text; empty when nothing matched"""
+    lowered = text.lower()
+    words = WORD_PATTERN.findall(lowered)
+    scores = {}
+    for language, vocabulary in LATIN_WORDS.items():
+        score = sum(WORD_WEIGHTS[word] for word in words if word in vocabulary)
+        score += 0.5 * sum(lowered.count(ngram) for ngram in LATIN_NGRAMS[language])
+        if score:
+            scores[language] = score
+    return scores
+
+
+def detect_language(text, min_confidence=0.5):
+    """(language, confidence) for a text, or (None, 0.0) when unsure
+
+    Confidence is the winning share of the evidence, 0..1.
+    """
+    counts = script_counts(text)
+    if not counts:
+        return None, 0.0
+    script, letters = max(counts.items(), key=lambda item: item[1])
+    total = sum(counts.values())
+    if script != 'LATIN':
+        kana = counts.get('HIRAGANA', 0) + counts.get('KATAKANA', 0)
+        if script in ('CJK', 'HIRAGANA', 'KATAKANA') and kana:
+            # Kana alongside (or instead of) Han means Japanese
+            language, letters = 'ja', kana + counts.get('CJK', 0)
+        elif script == 'CYRILLIC' and any(char in UKRAINIAN_LETTERS for char in text):
+            language = 'uk'
+        else:
+            language = SCRIPT_LANGUAGES[script]
+        confidence = letters / total
+        return (language, round(confidence, 2)) if confidence >= min_confidence else (None, 0.0)
+
+    scores = score_latin(text)
+    if not scores:
+        return None, 0.0
+    language, best = max(scores.items(), key=lambda item: item[1])
+    confidence = best / sum(scores.values())
+    # A lone shared word or n-gram is not evidence
+    if best < 1.0 or confidence < min_confidence:
+        return None, 0.0
+    return language, round(confidence, 2)
+
+
+def reads_as(text, language):
+    """True if a short text consists only of common sign words of `language`
+
+    For text too short to identify: 'OPEN 24 HOURS' or 'TAXI' read as
+    English (and TAXI as German too) and need no translation into it.
+    """
+    vocabulary = SIGN_WORDS.get(language)
+    if not vocabulary:
+        return False
+    words = WORD_PATTERN.findall(text.lower())
+    return 0 < len(words) <= MAX_SIGN_WORDS and all(
+        word in vocabulary or word in LATIN_WORDS.get(language, ()) for word in words
+    )
+
+
+def identify_blocks(text_blocks, min_confidence=0.5):
+    """Set block['language'] on each text block and return the request's language
+
+    A block's language is only its own detection, None when that is not
+    confident. The request language comes from the whole OCR output at
+    once, which has far more evidence than any single line; for
+    mixed-language signs it falls back to the language covering the most
+    text. It describes the upload as a whole (Translation.detected_language)
+    and is not copied onto undetected blocks: a short foreign word on an
+    otherwise English sign is not English.
+    """
+    languages = [detect_language(block['text'], min_confidence)[0] for block in text_blocks]
+    request_language, _ = detect_language(' '.join(block['text'] for block in text_blocks), min_confidence)
+    if request_language is None:
+        coverage = {}
+        for block, language in zip(text_blocks, languages):
+            if language:
+                coverage[language] = coverage.get(language, 0) + len(block['text'])
+        if coverage:
+            request_language = max(coverage, key=coverage.get)
+    for block, language in zip(text_blocks, languages):
+        block['language'] = language
+    return request_language
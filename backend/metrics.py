@@ -0,0 +1,136 @@
+# metrics.py - Stage latency histograms exposed in Prometheus text format
+#
+# Metrics are kept per process; with several gunicorn workers each one
+# reports its own series.
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    pairs = ','.join(
+        '{}="{}"'.format(name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in labels
+    )
+    return '{' + pairs + '}'
+
+
+def format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """Cumulative-bucket histogram with optional labels"""
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels.get(name, '')) for name in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {'counts': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series['counts'][i] += 1
+                    break
+            series['sum'] += value
+            series['count'] += 1
+
+    def expose(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                labels = list(zip(self.labelnames, key))
+                cumulative = 0
+                for bound, count in zip(self.buckets, series['counts']):
+                    cumulative += count
+                    bucket_labels = format_labels(labels + [('le', format_value(bound))])
+                    lines.append(f'{self.name}_bucket{bucket_labels} {cumulative}')
+                lines.append(f'{self.name}_sum{format_labels(labels)} {format_value(series["sum"])}')
+                lines.append(f'{self.name}_count{format_labels(labels)} {series["count"]}')
+        return lines
+
+
+class MetricsRegistry:
+    """Holds histograms and renders them with any extra gauge/counter values"""
+
+    def __init__(self):
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        with self._lock:
+            if name not in self._histograms:
+                self._histograms[name] = Histogram(name, documentation, labelnames, buckets)
+            return self._histograms[name]
+
+    def expose(self, samples=()):
+        """Prometheus text format; `samples` are (name, type, help, labels, value) tuples"""
+        lines = []
+        for histogram in self._histograms.values():
+            lines.extend(histogram.expose())
+        documented = set()
+        for name, metric_type, documentation, labels, value in samples:
+            if name not in documented:
+                lines.append(f'# HELP {name} {documentation}')
+                lines.append(f'# TYPE {name} {metric_type}')
+                documented.add(name)
+            lines.append(f'{name}{format_labels(list(labels.items()))} {format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+STAGE_SECONDS = registry.histogram(
+    'signboard_stage_duration_seconds',
+    'Time spent in each pipeline stage',
+    labelnames=('stage',)
+)
+
+REQUEST_SECONDS = registry.histogram(
+    'signboard_http_request_duration_seconds',
+    'HTTP request handling time until the response is returned',
+    labelnames=('endpoint', 'method', 'status')
+)
+
+_current_timings = contextvars.ContextVar('stage_timings', default=None)
+
+
+def start_stage_timings():
+    """Begin collecting a per-request stage breakdown in the current context"""
+    timings = {}
+    _current_timings.set(timings)
+    return timings
+
+
+@contextmanager
+def timed(stage, timings=None):
+    """Time a pipeline stage into the stage histogram
+
+    The duration is also added to `timings` when given, otherwise to the
+    breakdown started by start_stage_timings() in this context, if any.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.observe(elapsed, stage=stage)
+        if timings is None:
+            timings = _current_timings.get()
+        if timings is not None:
+            timings[stage] = timings.get(stage, 0) + elapsed
@@ -0,0 +1,34 @@
+"""add translation memory
+
+Revision ID: 3f2a9c1d7e4b
+Revises: 
+Create Date: 2026-10-16 09:12:44.318205
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f2a9c1d7e4b'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('translation_memory',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('source_hash', sa.String(length=64), nullable=False),
+    sa.Column('source_text', sa.Text(), nullable=False),
+    sa.Column('target_language', sa.String(length=10), nullable=False),
+    sa.Column('translated_text', sa.Text(), nullable=False),
+    sa.Column('detected_language', sa.String(length=10), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('source_hash', 'target_language', name='uq_translation_memory_source_target')
+    )
+
+
+def downgrade():
+    op.drop_table('translation_memory')
@@ -0,0 +1,35 @@
+"""store rendered images in blob store
+
+Revision ID: 5d9f03b6c8e1
+Revises: c4e81a7d5b26
+Create Date: 2026-10-16 13:40:12.093871
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d9f03b6c8e1'
+down_revision = 'c4e81a7d5b26'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Cached PNGs are not carried over; PIPELINE_VERSION 3 invalidates them anyway
+    with op.batch_alter_table('cached_results', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('image_key', sa.String(length=80), nullable=True))
+        batch_op.drop_column('processed_image')
+
+    with op.batch_alter_table('translations', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('image_key', sa.String(length=80), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('translations', schema=None) as batch_op:
+        batch_op.drop_column('image_key')
+
+    with op.batch_alter_table('cached_results', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('processed_image', sa.LargeBinary(), nullable=True))
+        batch_op.drop_column('image_key')
@@ -0,0 +1,49 @@
+"""add result cache
+
+Revision ID: 8b6d4e2f1a93
+Revises: 3f2a9c1d7e4b
+Create Date: 2026-10-16 10:03:27.551920
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b6d4e2f1a93'
+down_revision = '3f2a9c1d7e4b'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('cached_results',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('content_hash', sa.String(length=64), nullable=False),
+    sa.Column('image_dimensions', sa.String(length=50), nullable=True),
+    sa.Column('text_blocks', sa.Text(), nullable=False),
+    sa.Column('processed_image', sa.LargeBinary(), nullable=True),
+    sa.Column('size_bytes', sa.Integer(), nullable=False),
+    sa.Column('hit_count', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('last_accessed', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('content_hash')
+    )
+    with op.batch_alter_table('cached_results', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_cached_results_last_accessed'), ['last_accessed'], unique=False)
+
+    with op.batch_alter_table('translations', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('content_hash', sa.String(length=64), nullable=True))
+        batch_op.create_index(batch_op.f('ix_translations_content_hash'), ['content_hash'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('translations', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_translations_content_hash'))
+        batch_op.drop_column('content_hash')
+
+    with op.batch_alter_table('cached_results', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_cached_results_last_accessed'))
+
+    op.drop_table('cached_results')
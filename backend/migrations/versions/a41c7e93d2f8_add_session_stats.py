@@ -0,0 +1,72 @@
+"""add session stats
+
+Revision ID: a41c7e93d2f8
+Revises: e7a2c9f14b30
+Create Date: 2026-10-16 16:12:48.530917
+
+"""
+import json
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a41c7e93d2f8'
+down_revision = 'e7a2c9f14b30'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    session_stats = op.create_table('session_stats',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('session_id', sa.String(length=36), nullable=False),
+        sa.Column('translation_count', sa.Integer(), nullable=False),
+        sa.Column('total_processing_time', sa.Float(), nullable=False),
+        sa.Column('text_count', sa.Integer(), nullable=False),
+        sa.Column('language_counts', sa.Text(), nullable=True),
+        sa.Column('first_translation_at', sa.DateTime(), nullable=True),
+        sa.Column('last_translation_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('session_id')
+    )
+
+    # Backfill from existing history, one pass over the translations table
+    translations = sa.table('translations',
+        sa.column('session_id', sa.String),
+        sa.column('processing_time', sa.Float),
+        sa.column('original_texts', sa.Text),
+        sa.column('detected_language', sa.String),
+        sa.column('created_at', sa.DateTime)
+    )
+    totals = {}
+    rows = op.get_bind().execute(sa.select(
+        translations.c.session_id, translations.c.processing_time, translations.c.original_texts,
+        translations.c.detected_language, translations.c.created_at
+    ).where(translations.c.session_id.isnot(None)))
+    for session_id, processing_time, original_texts, detected_language, created_at in rows:
+        stats = totals.setdefault(session_id, {
+            'session_id': session_id, 'translation_count': 0, 'total_processing_time': 0.0,
+            'text_count': 0, 'languages': {}, 'first_translation_at': None, 'last_translation_at': None
+        })
+        stats['translation_count'] += 1
+        stats['total_processing_time'] += processing_time or 0.0
+        stats['text_count'] += len(json.loads(original_texts)) if original_texts else 0
+        if detected_language:
+            stats['languages'][detected_language] = stats['languages'].get(detected_language, 0) + 1
+        if created_at is not None:
+            if stats['first_translation_at'] is None or created_at < stats['first_translation_at']:
+                stats['first_translation_at'] = created_at
+            if stats['last_translation_at'] is None or created_at > stats['last_translation_at']:
+                stats['last_translation_at'] = created_at
+
+    for stats in totals.values():
+        languages = stats.pop('languages')
+        stats['language_counts'] = json.dumps(languages, sort_keys=True) if languages else None
+    if totals:
+        op.bulk_insert(session_stats, list(totals.values()))
+
+
+def downgrade():
+    op.drop_table('session_stats')
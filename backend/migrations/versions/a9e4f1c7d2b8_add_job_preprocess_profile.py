@@ -0,0 +1,26 @@
+"""add job preprocess profile
+
+Revision ID: a9e4f1c7d2b8
+Revises: f6c2d8b41a97
+Create Date: 2026-10-16 23:52:40.518302
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a9e4f1c7d2b8'
+down_revision = 'f6c2d8b41a97'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('translation_jobs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('preprocess_profile', sa.String(length=50), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('translation_jobs', schema=None) as batch_op:
+        batch_op.drop_column('preprocess_profile')
@@ -0,0 +1,55 @@
+"""index translation history
+
+Revision ID: b58e1f0c7a64
+Revises: a41c7e93d2f8
+Create Date: 2026-10-16 17:03:22.418305
+
+"""
+import json
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b58e1f0c7a64'
+down_revision = 'a41c7e93d2f8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('translations', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('text_count', sa.Integer(), nullable=True))
+
+    op.create_index(
+        'ix_translations_session_created', 'translations',
+        ['session_id', sa.text('created_at DESC'), sa.text('id DESC')], unique=False
+    )
+
+    # Backfill text_count from the stored JSON
+    translations = sa.table('translations',
+        sa.column('id', sa.Integer),
+        sa.column('original_texts', sa.Text),
+        sa.column('text_count', sa.Integer)
+    )
+    bind = op.get_bind()
+    rows = bind.execute(sa.select(translations.c.id, translations.c.original_texts)).fetchall()
+    counts = [
+        {'row_id': row_id, 'count': len(json.loads(original_texts)) if original_texts else 0}
+        for row_id, original_texts in rows
+    ]
+    if counts:
+        bind.execute(
+            translations.update()
+            .where(translations.c.id == sa.bindparam('row_id'))
+            .values(text_count=sa.bindparam('count')),
+            counts
+        )
+
+
+def downgrade():
+    op.drop_index('ix_translations_session_created', table_name='translations')
+
+    with op.batch_alter_table('translations', schema=None) as batch_op:
+        batch_op.drop_column('text_count')
@@ -0,0 +1,49 @@
+"""add translation memory engine
+
+Revision ID: c2f7a8e4b913
+Revises: a9e4f1c7d2b8
+Create Date: 2026-10-17 09:41:17.204516
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c2f7a8e4b913'
+down_revision = 'a9e4f1c7d2b8'
+branch_labels = None
+depends_on = None
+
+translation_memory = sa.table('translation_memory',
+    sa.column('source_text', sa.Text),
+    sa.column('translated_text', sa.Text),
+    sa.column('translation_engine', sa.String)
+)
+
+
+def upgrade():
+    # Google was the only engine before the offline ones were added. Passthroughs (translation
+    # equal to the source) are what an engine returns when it has no translation, so drop them.
+    with op.batch_alter_table('translation_memory', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('translation_engine', sa.String(length=50), nullable=False,
+                                      server_default='google_translate'))
+        batch_op.drop_constraint('uq_translation_memory_source_target', type_='unique')
+        batch_op.create_unique_constraint('uq_translation_memory_source_target_engine',
+                                          ['source_hash', 'target_language', 'translation_engine'])
+
+    op.execute(translation_memory.delete().where(
+        translation_memory.c.translated_text == translation_memory.c.source_text
+    ))
+
+
+def downgrade():
+    # Only one engine's entries fit the old (source, target) key
+    op.execute(translation_memory.delete().where(
+        translation_memory.c.translation_engine != 'google_translate'
+    ))
+    with op.batch_alter_table('translation_memory', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_translation_memory_source_target_engine', type_='unique')
+        batch_op.create_unique_constraint('uq_translation_memory_source_target',
+                                          ['source_hash', 'target_language'])
+        batch_op.drop_column('translation_engine')
@@ -0,0 +1,46 @@
+"""add translation jobs
+
+Revision ID: c4e81a7d5b26
+Revises: 8b6d4e2f1a93
+Create Date: 2026-10-16 11:21:05.804117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4e81a7d5b26'
+down_revision = '8b6d4e2f1a93'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('translation_jobs',
+    sa.Column('id', sa.String(length=36), nullable=False),
+    sa.Column('session_id', sa.String(length=36), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('original_filename', sa.String(length=255), nullable=False),
+    sa.Column('target_language', sa.String(length=10), nullable=False),
+    sa.Column('upload_path', sa.String(length=512), nullable=False),
+    sa.Column('timeout', sa.Float(), nullable=True),
+    sa.Column('result', sa.Text(), nullable=True),
+    sa.Column('status_code', sa.Integer(), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('translation_jobs', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_translation_jobs_session_id'), ['session_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_translation_jobs_status'), ['status'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('translation_jobs', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_translation_jobs_status'))
+        batch_op.drop_index(batch_op.f('ix_translation_jobs_session_id'))
+
+    op.drop_table('translation_jobs')
@@ -0,0 +1,130 @@
+"""move texts to text blocks
+
+Revision ID: d3b9a6f27e15
+Revises: b58e1f0c7a64
+Create Date: 2026-10-16 18:21:05.773149
+
+"""
+import json
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd3b9a6f27e15'
+down_revision = 'b58e1f0c7a64'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+translations = sa.table('translations',
+    sa.column('id', sa.Integer),
+    sa.column('original_texts', sa.Text),
+    sa.column('translated_texts', sa.Text),
+    sa.column('confidence_scores', sa.Text)
+)
+
+
+def recreate_history_index():
+    """Restore ix_translations_session_created as in the model
+
+    SQLite's batch table rebuild copies indexes from reflection, which
+    drops the DESC ordering.
+    """
+    op.drop_index('ix_translations_session_created', table_name='translations')
+    op.create_index(
+        'ix_translations_session_created', 'translations',
+        ['session_id', sa.text('created_at DESC'), sa.text('id DESC')], unique=False
+    )
+
+
+def upgrade():
+    text_blocks = op.create_table('text_blocks',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('translation_id', sa.Integer(), nullable=False),
+        sa.Column('position', sa.Integer(), nullable=False),
+        sa.Column('text', sa.Text(), nullable=False),
+        sa.Column('translated_text', sa.Text(), nullable=True),
+        sa.Column('language', sa.String(length=10), nullable=True),
+        sa.Column('confidence', sa.Float(), nullable=True),
+        sa.Column('x', sa.Integer(), nullable=True),
+        sa.Column('y', sa.Integer(), nullable=True),
+        sa.Column('width', sa.Integer(), nullable=True),
+        sa.Column('height', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['translation_id'], ['translations.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_text_blocks_translation_position', 'text_blocks', ['translation_id', 'position'], unique=False)
+
+    # Unpack the parallel JSON lists; bounding boxes were never stored, so they stay NULL
+    bind = op.get_bind()
+    rows = bind.execute(sa.select(
+        translations.c.id, translations.c.original_texts,
+        translations.c.translated_texts, translations.c.confidence_scores
+    ).order_by(translations.c.id))
+    pending = []
+    for translation_id, original_json, translated_json, confidence_json in rows:
+        originals = json.loads(original_json) if original_json else []
+        translated = json.loads(translated_json) if translated_json else []
+        confidences = json.loads(confidence_json) if confidence_json else []
+        for position, text in enumerate(originals):
+            confidence = confidences[position] if position < len(confidences) else None
+            pending.append({
+                'translation_id': translation_id,
+                'position': position,
+                'text': text,
+                'translated_text': translated[position] if position < len(translated) else text,
+                'confidence': float(confidence) if confidence is not None else None
+            })
+        if len(pending) >= BATCH_SIZE:
+            op.bulk_insert(text_blocks, pending)
+            pending = []
+    if pending:
+        op.bulk_insert(text_blocks, pending)
+
+    with op.batch_alter_table('translations', schema=None) as batch_op:
+        batch_op.drop_column('confidence_scores')
+        batch_op.drop_column('translated_texts')
+        batch_op.drop_column('original_texts')
+    recreate_history_index()
+
+
+def downgrade():
+    with op.batch_alter_table('translations', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('original_texts', sa.Text(), nullable=False, server_default='[]'))
+        batch_op.add_column(sa.Column('translated_texts', sa.Text(), nullable=False, server_default='[]'))
+        batch_op.add_column(sa.Column('confidence_scores', sa.Text(), nullable=True))
+    recreate_history_index()
+
+    text_blocks = sa.table('text_blocks',
+        sa.column('translation_id', sa.Integer),
+        sa.column('position', sa.Integer),
+        sa.column('text', sa.Text),
+        sa.column('translated_text', sa.Text),
+        sa.column('confidence', sa.Float)
+    )
+    bind = op.get_bind()
+    grouped = {}
+    rows = bind.execute(sa.select(
+        text_blocks.c.translation_id, text_blocks.c.text, text_blocks.c.translated_text, text_blocks.c.confidence
+    ).order_by(text_blocks.c.translation_id, text_blocks.c.position))
+    for translation_id, text, translated_text, confidence in rows:
+        lists = grouped.setdefault(translation_id, ([], [], []))
+        lists[0].append(text)
+        lists[1].append(translated_text if translated_text is not None else text)
+        lists[2].append(confidence)
+    if grouped:
+        bind.execute(
+            translations.update()
+            .where(translations.c.id == sa.bindparam('row_id'))
+            .values(original_texts=sa.bindparam('originals'), translated_texts=sa.bindparam('translated'),
+                    confidence_scores=sa.bindparam('confidences')),
+            [{'row_id': translation_id, 'originals': json.dumps(originals), 'translated': json.dumps(translated),
+              'confidences': json.dumps(confidences)}
+             for translation_id, (originals, translated, confidences) in grouped.items()]
+        )
+
+    op.drop_index('ix_text_blocks_translation_position', table_name='text_blocks')
+    op.drop_table('text_blocks')
@@ -0,0 +1,26 @@
+"""add translation stage timings
+
+Revision ID: e7a2c9f14b30
+Revises: 5d9f03b6c8e1
+Create Date: 2026-10-16 14:58:31.227406
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7a2c9f14b30'
+down_revision = '5d9f03b6c8e1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('translations', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('stage_timings', sa.Text(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('translations', schema=None) as batch_op:
+        batch_op.drop_column('stage_timings')
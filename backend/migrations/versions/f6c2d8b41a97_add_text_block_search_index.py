@@ -0,0 +1,76 @@
+"""add text block search index
+
+Revision ID: f6c2d8b41a97
+Revises: d3b9a6f27e15
+Create Date: 2026-10-16 19:02:37.615284
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'f6c2d8b41a97'
+down_revision = 'd3b9a6f27e15'
+branch_labels = None
+depends_on = None
+
+SQLITE_FTS_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS text_blocks_fts USING fts5(
+        text, translated_text, content='text_blocks', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS text_blocks_fts_insert AFTER INSERT ON text_blocks BEGIN
+        INSERT INTO text_blocks_fts(rowid, text, translated_text) VALUES (new.id, new.text, new.translated_text);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS text_blocks_fts_delete AFTER DELETE ON text_blocks BEGIN
+        INSERT INTO text_blocks_fts(text_blocks_fts, rowid, text, translated_text)
+        VALUES ('delete', old.id, old.text, old.translated_text);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS text_blocks_fts_update AFTER UPDATE ON text_blocks BEGIN
+        INSERT INTO text_blocks_fts(text_blocks_fts, rowid, text, translated_text)
+        VALUES ('delete', old.id, old.text, old.translated_text);
+        INSERT INTO text_blocks_fts(rowid, text, translated_text) VALUES (new.id, new.text, new.translated_text);
+    END""",
+]
+
+SQLITE_FTS_DROP = [
+    'DROP TRIGGER IF EXISTS text_blocks_fts_update',
+    'DROP TRIGGER IF EXISTS text_blocks_fts_delete',
+    'DROP TRIGGER IF EXISTS text_blocks_fts_insert',
+    'DROP TABLE IF EXISTS text_blocks_fts',
+]
+
+# 'simple' keeps words as written; signs mix languages, so no stemming
+POSTGRES_SEARCH_DDL = [
+    """ALTER TABLE text_blocks ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (to_tsvector('simple', coalesce(text, '') || ' ' || coalesce(translated_text, ''))) STORED""",
+    'CREATE INDEX IF NOT EXISTS ix_text_blocks_search_vector ON text_blocks USING gin (search_vector)',
+]
+
+POSTGRES_SEARCH_DROP = [
+    'DROP INDEX IF EXISTS ix_text_blocks_search_vector',
+    'ALTER TABLE text_blocks DROP COLUMN IF EXISTS search_vector',
+]
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == 'sqlite':
+        for statement in SQLITE_FTS_DDL:
+            op.execute(statement)
+        # Index the blocks that already exist
+        op.execute("INSERT INTO text_blocks_fts(text_blocks_fts) VALUES ('rebuild')")
+    elif bind.dialect.name == 'postgresql':
+        for statement in POSTGRES_SEARCH_DDL:
+            op.execute(statement)
+    # Other databases: /api/history/search falls back to LIKE
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == 'sqlite':
+        for statement in SQLITE_FTS_DROP:
+            op.execute(statement)
+    elif bind.dialect.name == 'postgresql':
+        for statement in POSTGRES_SEARCH_DROP:
+            op.execute(statement)
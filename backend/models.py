@@ -43,24 +43,42 @@ class Translation(db.Model):
     image_size = db.Column(db.Integer, nullable=False)  # File size in bytes
     image_dimensions = db.Column(db.String(50), nullable=True)  # "width x height"
     
-    # Translation data
-    original_texts = db.Column(db.Text, nullable=False)  # JSON string of original texts
-    translated_texts = db.Column(db.Text, nullable=False)  # JSON string of translated texts
+    # Translation data (the texts themselves live in text_blocks)
     detected_language = db.Column(db.String(10), nullable=True)  # Language code
-    confidence_scores = db.Column(db.Text, nullable=True)  # JSON string of OCR confidence scores
+    text_count = db.Column(db.Integer, nullable=True)  # Number of text blocks, so list views skip loading them
     
     # Processing metadata
     processing_time = db.Column(db.Float, nullable=True)  # Time taken in seconds
     ocr_engine = db.Column(db.String(50), default='tesseract')
     translation_engine = db.Column(db.String(50), default='google_translate')
+    content_hash = db.Column(db.String(64), nullable=True, index=True)  # Key of the shared CachedResult
+    image_key = db.Column(db.String(80), nullable=True)  # Rendered overlay in the blob store
+    stage_timings = db.Column(db.Text, nullable=True)  # JSON string of seconds per pipeline stage
     
     # Timestamps
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    # OCR blocks in reading order
+    blocks = db.relationship('TextBlock', backref='translation', lazy='select', order_by='TextBlock.position',
+                             cascade='all, delete-orphan')
+    
     def __repr__(self):
         return f'<Translation {self.id}>'
     
-    def to_dict(self):
+    def to_dict(self, summary=False):
+        if summary:
+            # List view projection: only columns in SUMMARY_COLUMNS, no JSON decoding
+            return {
+                'id': self.id,
+                'original_filename': self.original_filename,
+                'image_size': self.image_size,
+                'image_dimensions': self.image_dimensions,
+                'text_count': self.text_count,
+                'detected_language': self.detected_language,
+                'processing_time': self.processing_time,
+                'processed_image_url': f'/api/images/{self.image_key}' if self.image_key else None,
+                'created_at': self.created_at.isoformat()
+            }
         return {
             'id': self.id,
             'session_id': self.session_id,
@@ -68,33 +86,108 @@ class Translation(db.Model):
             'original_filename': self.original_filename,
             'image_size': self.image_size,
             'image_dimensions': self.image_dimensions,
-            'original_texts': json.loads(self.original_texts) if self.original_texts else [],
-            'translated_texts': json.loads(self.translated_texts) if self.translated_texts else [],
+            'original_texts': [block.text for block in self.blocks],
+            'translated_texts': [block.translated_text for block in self.blocks],
             'detected_language': self.detected_language,
-            'confidence_scores': json.loads(self.confidence_scores) if self.confidence_scores else [],
+            'confidence_scores': [block.confidence for block in self.blocks],
+            'text_blocks': [block.to_dict() for block in self.blocks],
+            'text_count': self.text_count,
             'processing_time': self.processing_time,
+            'stage_timings': json.loads(self.stage_timings) if self.stage_timings else None,
             'ocr_engine': self.ocr_engine,
             'translation_engine': self.translation_engine,
+            'content_hash': self.content_hash,
+            'processed_image_url': f'/api/images/{self.image_key}' if self.image_key else None,
             'created_at': self.created_at.isoformat()
         }
     
     @staticmethod
-    def create_from_result(filename, file_size, dimensions, original_texts, translated_texts, 
-                          confidence_scores=None, processing_time=None, user_id=None, session_id=None):
-        """Create a Translation record from processing results"""
+    def create_from_result(filename, file_size, dimensions, text_blocks, processing_time=None,
+                          user_id=None, session_id=None, content_hash=None, image_key=None, stage_timings=None,
+                          translation_engine=None, detected_language=None):
+        """Create a Translation record (and its TextBlock rows) from pipeline text blocks"""
         translation = Translation(
             session_id=session_id or str(uuid.uuid4()),
             user_id=user_id,
             original_filename=filename,
             image_size=file_size,
             image_dimensions=dimensions,
-            original_texts=json.dumps(original_texts),
-            translated_texts=json.dumps(translated_texts),
-            confidence_scores=json.dumps(confidence_scores) if confidence_scores else None,
-            processing_time=processing_time
+            text_count=len(text_blocks),
+            processing_time=processing_time,
+            content_hash=content_hash,
+            image_key=image_key,
+            detected_language=detected_language,
+            stage_timings=json.dumps(stage_timings) if stage_timings else None
         )
+        if translation_engine:
+            translation.translation_engine = translation_engine
+        # Children are inserted in one executemany when the parent is flushed
+        translation.blocks = [TextBlock.from_block(i, block) for i, block in enumerate(text_blocks)]
         return translation
 
+class TextBlock(db.Model):
+    """One OCR text block of a translation, with its box and translation"""
+    __tablename__ = 'text_blocks'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    translation_id = db.Column(db.Integer, db.ForeignKey('translations.id', ondelete='CASCADE'), nullable=False)
+    position = db.Column(db.Integer, nullable=False)  # Reading order within the image
+    text = db.Column(db.Text, nullable=False)
+    translated_text = db.Column(db.Text, nullable=True)
+    language = db.Column(db.String(10), nullable=True)  # Detected source language
+    confidence = db.Column(db.Float, nullable=True)
+    
+    # Bounding box in original image pixels (unknown for rows migrated from the JSON columns)
+    x = db.Column(db.Integer, nullable=True)
+    y = db.Column(db.Integer, nullable=True)
+    width = db.Column(db.Integer, nullable=True)
+    height = db.Column(db.Integer, nullable=True)
+    
+    __table_args__ = (
+        db.Index('ix_text_blocks_translation_position', 'translation_id', 'position'),
+    )
+    
+    def __repr__(self):
+        return f'<TextBlock {self.translation_id}:{self.position}>'
+    
+    def to_dict(self):
+        return {
+            'text': self.text,
+            'translated_text': self.translated_text,
+            'language': self.language,
+            'confidence': self.confidence,
+            'x': self.x,
+            'y': self.y,
+            'width': self.width,
+            'height': self.height
+        }
+    
+    @staticmethod
+    def from_block(position, block):
+        """TextBlock from a pipeline block dict"""
+        confidence = block.get('confidence')
+        return TextBlock(
+            position=position,
+            text=block['text'],
+            translated_text=block.get('translated_text', block['text']),
+            language=block.get('language'),
+            confidence=float(confidence) if confidence is not None else None,
+            x=block.get('x'),
+            y=block.get('y'),
+            width=block.get('width'),
+            height=block.get('height')
+        )
+
+# History is always listed per session, newest first
+db.Index('ix_translations_session_created', Translation.session_id, Translation.created_at.desc(), Translation.id.desc())
+
+# Columns loaded for Translation.to_dict(summary=True)
+SUMMARY_COLUMNS = (
+    Translation.id, Translation.original_filename, Translation.image_size, Translation.image_dimensions,
+    Translation.text_count, Translation.detected_language, Translation.processing_time,
+    Translation.image_key, Translation.created_at
+)
+
 class UserSession(db.Model):
     """User session model for tracking anonymous users"""
     __tablename__ = 'user_sessions'
@@ -116,4 +209,117 @@ class UserSession(db.Model):
             'ip_address': self.ip_address,
             'created_at': self.created_at.isoformat(),
             'last_activity': self.last_activity.isoformat()
-        }
\ No newline at end of file
+        }
+
+class SessionStats(db.Model):
+    """Running per-session totals behind /api/stats, kept in step with translations"""
+    __tablename__ = 'session_stats'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    session_id = db.Column(db.String(36), unique=True, nullable=False)
+    translation_count = db.Column(db.Integer, nullable=False, default=0)
+    total_processing_time = db.Column(db.Float, nullable=False, default=0.0)
+    text_count = db.Column(db.Integer, nullable=False, default=0)
+    language_counts = db.Column(db.Text, nullable=True)  # JSON string of {language: translations}
+    first_translation_at = db.Column(db.DateTime, nullable=True)
+    last_translation_at = db.Column(db.DateTime, nullable=True)
+    
+    def __repr__(self):
+        return f'<SessionStats {self.session_id}>'
+    
+    def to_dict(self):
+        count = self.translation_count or 0
+        total_time = self.total_processing_time or 0
+        return {
+            'total_translations': count,
+            'total_processing_time': round(total_time, 2),
+            'average_processing_time': round(total_time / count, 2) if count else 0,
+            'total_texts_translated': self.text_count or 0,
+            'languages_detected': sorted(json.loads(self.language_counts)) if self.language_counts else [],
+            'first_translation': self.first_translation_at.isoformat() if self.first_translation_at else None,
+            'latest_translation': self.last_translation_at.isoformat() if self.last_translation_at else None
+        }
+
+class TranslationMemoryEntry(db.Model):
+    """Translation memory entry keyed by (source text, target language, translation engine)"""
+    __tablename__ = 'translation_memory'
+    __table_args__ = (
+        db.UniqueConstraint('source_hash', 'target_language', 'translation_engine',
+                            name='uq_translation_memory_source_target_engine'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    source_hash = db.Column(db.String(64), nullable=False)  # SHA-256 of source_text
+    source_text = db.Column(db.Text, nullable=False)
+    target_language = db.Column(db.String(10), nullable=False)
+    translation_engine = db.Column(db.String(50), nullable=False, server_default='google_translate')
+    translated_text = db.Column(db.Text, nullable=False)
+    detected_language = db.Column(db.String(10), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<TranslationMemoryEntry {self.source_text!r} -> {self.target_language} ({self.translation_engine})>'
+
+class CachedResult(db.Model):
+    """Pipeline result shared by every upload of the same image bytes"""
+    __tablename__ = 'cached_results'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    content_hash = db.Column(db.String(64), unique=True, nullable=False)  # SHA-256 of bytes + language + pipeline version
+    image_dimensions = db.Column(db.String(50), nullable=True)  # "width x height"
+    text_blocks = db.Column(db.Text, nullable=False)  # JSON string of text blocks incl. translations
+    image_key = db.Column(db.String(80), nullable=True)  # Rendered overlay in the blob store
+    size_bytes = db.Column(db.Integer, nullable=False, default=0)
+    hit_count = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    last_accessed = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    
+    def __repr__(self):
+        return f'<CachedResult {self.content_hash[:12]}>'
+
+class TranslationJob(db.Model):
+    """Background translation job; the table doubles as the local job broker"""
+    __tablename__ = 'translation_jobs'
+    
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    session_id = db.Column(db.String(36), nullable=False, index=True)
+    status = db.Column(db.String(20), nullable=False, default='queued', index=True)  # queued, running, succeeded, failed, timeout
+    
+    # Job input
+    original_filename = db.Column(db.String(255), nullable=False)
+    target_language = db.Column(db.String(10), nullable=False, default='en')
+    preprocess_profile = db.Column(db.String(50), nullable=True)  # None = server default
+    upload_path = db.Column(db.String(512), nullable=False)  # Spooled upload on local disk
+    timeout = db.Column(db.Float, nullable=True)  # Seconds allowed once running
+    
+    # Job output
+    result = db.Column(db.Text, nullable=True)  # JSON response body
+    status_code = db.Column(db.Integer, nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    
+    # Timestamps
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    
+    def __repr__(self):
+        return f'<TranslationJob {self.id} {self.status}>'
+    
+    @property
+    def is_finished(self):
+        return self.status in ('succeeded', 'failed', 'timeout')
+    
+    def to_dict(self):
+        return {
+            'job_id': self.id,
+            'status': self.status,
+            'original_filename': self.original_filename,
+            'target_language': self.target_language,
+            'preprocess_profile': self.preprocess_profile,
+            'result': json.loads(self.result) if self.result else None,
+            'status_code': self.status_code,
+            'error': self.error,
+            'created_at': self.created_at.isoformat(),
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
@@ -0,0 +1,271 @@
+# ocr.py - OCR engines producing text blocks with positions
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+import numpy as np
+import pytesseract
+
+try:
+    import tesserocr
+except ImportError:  # Optional in-process binding
+    tesserocr = None
+
+
+def parse_tesseract_data(data, offset_x=0, offset_y=0, grouping='line'):
+    """Turn pytesseract image_to_data output into text block dicts
+
+    With grouping='line' (default) words are merged into one block per
+    text line using Tesseract's block_num/par_num/line_num layout, so a
+    phrase like "Rue de la Paix" is translated and drawn as a unit;
+    'paragraph' merges whole paragraphs. grouping='word' keeps one block
+    per word.
+    """
+    if grouping in LAYOUT_LEVELS and 'line_num' in data:
+        return group_words(data, offset_x, offset_y, LAYOUT_LEVELS[grouping])
+
+    text_blocks = []
+    for i in range(len(data['text'])):
+        if int(float(data['conf'][i])) > 1:  # Confidence threshold
+            text = data['text'][i].strip()
+            if text and len(text) > 1:  # Only process non-empty text with more than 1 character
+                text_blocks.append({
+                    'text': text,
+                    'x': data['left'][i] + offset_x,
+                    'y': data['top'][i] + offset_y,
+                    'width': data['width'][i],
+                    'height': data['height'][i],
+                    'confidence': data['conf'][i]
+                })
+    return text_blocks
+
+
+# How many of (block_num, par_num, line_num) identify a group
+LAYOUT_LEVELS = {'paragraph': 2, 'line': 3}
+
+
+def group_words(data, offset_x=0, offset_y=0, depth=3):
+    """One block per Tesseract layout group: joined words, union box, mean confidence"""
+    groups = {}
+    for i in range(len(data['text'])):
+        text = data['text'][i].strip()
+        if not text or int(float(data['conf'][i])) <= 1:  # Confidence threshold
+            continue
+        key = (data['block_num'][i], data['par_num'][i], data['line_num'][i])[:depth]
+        groups.setdefault(key, []).append(i)
+
+    text_blocks = []
+    for key in sorted(groups):
+        words = groups[key]
+        text = ' '.join(data['text'][i].strip() for i in words)
+        if len(text) <= 1:  # Single stray characters are mostly noise
+            continue
+        x0 = min(data['left'][i] for i in words)
+        y0 = min(data['top'][i] for i in words)
+        x1 = max(data['left'][i] + data['width'][i] for i in words)
+        y1 = max(data['top'][i] + data['height'][i] for i in words)
+        text_blocks.append({
+            'text': text,
+            'x': x0 + offset_x,
+            'y': y0 + offset_y,
+            'width': x1 - x0,
+            'height': y1 - y0,
+            'confidence': round(sum(float(data['conf'][i]) for i in words) / len(words), 2),
+            'word_count': len(words)
+        })
+    return text_blocks
+
+
+_engines = threading.local()
+
+
+def get_tesserocr_api(lang='eng', psm=None):
+    """Warm Tesseract engine for the calling thread
+
+    Engines are initialised once per (lang, psm) and reused, so the
+    language data is only loaded on the first call in each worker.
+    """
+    engines = getattr(_engines, 'apis', None)
+    if engines is None:
+        engines = _engines.apis = {}
+    key = (lang, psm)
+    api = engines.get(key)
+    if api is None:
+        kwargs = {'lang': lang}
+        if psm is not None:
+            kwargs['psm'] = psm
+        api = tesserocr.PyTessBaseAPI(**kwargs)
+        engines[key] = api
+    return api
+
+
+def tesserocr_image_to_data(image, lang='eng', psm=None):
+    """image_to_data equivalent that feeds the NumPy buffer straight to the engine"""
+    image = np.ascontiguousarray(image)
+    height, width = image.shape[:2]
+    channels = 1 if image.ndim == 2 else image.shape[2]
+    if channels == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+
+    api = get_tesserocr_api(lang, psm)
+    api.SetImageBytes(image.tobytes(), width, height, channels, width * channels)
+    api.Recognize()
+
+    data = {'text': [], 'conf': [], 'left': [], 'top': [], 'width': [], 'height': [],
+            'block_num': [], 'par_num': [], 'line_num': []}
+    level = tesserocr.RIL.WORD
+    iterator = api.GetIterator()
+    if iterator is None:
+        return data
+    # Rebuild pytesseract's layout numbering; par/line restart in each parent like Tesseract's TSV
+    block_num = par_num = line_num = 0
+    for word in tesserocr.iterate_level(iterator, level):
+        if word.IsAtBeginningOf(tesserocr.RIL.BLOCK):
+            block_num, par_num, line_num = block_num + 1, 0, 0
+        if word.IsAtBeginningOf(tesserocr.RIL.PARA):
+            par_num, line_num = par_num + 1, 0
+        if word.IsAtBeginningOf(tesserocr.RIL.TEXTLINE):
+            line_num += 1
+        box = word.BoundingBox(level)
+        if box is None:
+            continue
+        x1, y1, x2, y2 = box
+        data['text'].append(word.GetUTF8Text(level) or '')
+        data['conf'].append(word.Confidence(level))
+        data['left'].append(x1)
+        data['top'].append(y1)
+        data['width'].append(x2 - x1)
+        data['height'].append(y2 - y1)
+        data['block_num'].append(block_num)
+        data['par_num'].append(par_num)
+        data['line_num'].append(line_num)
+    return data
+
+
+def image_to_data(image, psm=None, lang='eng', backend='auto'):
+    """Run Tesseract with the selected backend, returning image_to_data-style dicts
+
+    `backend` is 'tesserocr' (in-process), 'pytesseract' (subprocess) or
+    'auto', which prefers tesserocr when the binding is installed. Falls
+    back to pytesseract if the binding is missing or fails to initialise.
+    """
+    if backend in ('auto', 'tesserocr') and tesserocr is not None:
+        try:
+            return tesserocr_image_to_data(image, lang=lang, psm=psm)
+        except RuntimeError as e:
+            print(f"tesserocr unavailable, falling back to pytesseract: {e}")
+    elif backend == 'tesserocr':
+        print("tesserocr is not installed, falling back to pytesseract")
+
+    config = f'--psm {psm}' if psm is not None else ''
+    return pytesseract.image_to_data(image, lang=lang, config=config, output_type=pytesseract.Output.DICT)
+
+
+def ocr_full_image(image, psm=None, backend='auto', grouping='line'):
+    """Single Tesseract pass over the whole image"""
+    return parse_tesseract_data(image_to_data(image, psm=psm, backend=backend), grouping=grouping)
+
+
+def find_text_regions(binary_image, padding=8, max_coverage=0.7):
+    """Find candidate text regions in a preprocessed (dark text on light) image
+
+    Characters are merged into line-sized blobs with a wide dilation and the
+    external contours of those blobs are returned as (x, y, w, h) boxes,
+    padded and with overlapping boxes merged. Returns an empty list when the
+    regions would cover most of the image anyway.
+    """
+    height, width = binary_image.shape[:2]
+    inverted = cv2.bitwise_not(binary_image)
+
+    # Kernel scales with resolution so it bridges letter and word gaps
+    kernel_w = max(9, width // 80)
+    kernel_h = max(3, height // 200)
+    kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (kernel_w, kernel_h))
+    dilated = cv2.dilate(inverted, kernel, iterations=1)
+
+    contours, _ = cv2.findContours(dilated, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    min_height = max(8, height // 200)
+    boxes = []
+    for contour in contours:
+        x, y, w, h = cv2.boundingRect(contour)
+        if h < min_height or w < min_height or h > height * 0.5:
+            continue
+        x0, y0 = max(0, x - padding), max(0, y - padding)
+        x1, y1 = min(width, x + w + padding), min(height, y + h + padding)
+        boxes.append([x0, y0, x1, y1])
+
+    boxes = merge_overlapping_boxes(boxes)
+    covered = sum((x1 - x0) * (y1 - y0) for x0, y0, x1, y1 in boxes)
+    if not boxes or covered > max_coverage * width * height:
+        return []
+    return [(x0, y0, x1 - x0, y1 - y0) for x0, y0, x1, y1 in boxes]
+
+
+def merge_overlapping_boxes(boxes):
+    """Merge [x0, y0, x1, y1] boxes until none overlap"""
+    merged = True
+    while merged:
+        merged = False
+        boxes.sort()
+        result = []
+        for box in boxes:
+            for other in result:
+                if box[0] <= other[2] and other[0] <= box[2] and box[1] <= other[3] and other[1] <= box[3]:
+                    other[0], other[1] = min(other[0], box[0]), min(other[1], box[1])
+                    other[2], other[3] = max(other[2], box[2]), max(other[3], box[3])
+                    merged = True
+                    break
+            else:
+                result.append(box)
+        boxes = result
+    return boxes
+
+
+def _ocr_region(crop, offset_x, offset_y, psm, backend, tesseract_cmd, grouping='line'):
+    """Process pool task: OCR one crop and shift boxes into image coordinates"""
+    pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+    data = image_to_data(crop, psm=psm, backend=backend)
+    return parse_tesseract_data(data, offset_x, offset_y, grouping=grouping)
+
+
+_region_pool = None
+_region_pool_lock = threading.Lock()
+
+
+def get_region_pool(workers=None):
+    """Process pool shared by region OCR calls in this process"""
+    global _region_pool
+    with _region_pool_lock:
+        if _region_pool is None:
+            _region_pool = ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 2)
+        return _region_pool
+
+
+def ocr_regions(image, psm=None, backend='auto', workers=None, grouping='line'):
+    """OCR candidate text regions in parallel across a process pool
+
+    Produces the same block format as ocr_full_image, with coordinates in
+    the space of `image`. Falls back to a single full-image pass when no
+    useful regions are found.
+    """
+    regions = find_text_regions(image)
+    if not regions:
+        return ocr_full_image(image, psm=psm, backend=backend, grouping=grouping)
+
+    pool = get_region_pool(workers)
+    tesseract_cmd = pytesseract.pytesseract.tesseract_cmd
+    # Largest regions first so the long tasks start early
+    regions.sort(key=lambda r: r[2] * r[3], reverse=True)
+    futures = [
+        pool.submit(_ocr_region, np.ascontiguousarray(image[y:y + h, x:x + w]), x, y, psm, backend, tesseract_cmd,
+                    grouping)
+        for x, y, w, h in regions
+    ]
+
+    text_blocks = []
+    for future in futures:
+        text_blocks.extend(future.result())
+    # Restore reading order
+    text_blocks.sort(key=lambda block: (block['y'], block['x']))
+    return text_blocks
@@ -0,0 +1,215 @@
+# preprocessing.py - Binarisation ahead of OCR, with selectable profiles
+#
+# Each step writes into a per-thread buffer through OpenCV's dst=
+# argument, ping-ponging between two full-size planes, so a worker
+# allocates its buffers once per image size instead of four fresh
+# intermediates per request. With OpenCL enabled and available the same
+# steps run on UMat (GPU/iGPU) and fall back to the CPU path on error.
+#
+# Profiles:
+#   fast      adaptive mean threshold, no blur or morphology
+#   balanced  Gaussian blur, adaptive Gaussian threshold, 2x2 close (the original pipeline)
+#   accurate  CLAHE contrast, light blur, large-window threshold for uneven lighting, close
+# Modifiers, appended with '+' (e.g. 'accurate+deskew'; on their own they modify 'balanced'):
+#   denoise   non-local means denoising of the grayscale plane (slow)
+#   deskew    estimate text skew and rotate it level; OCR boxes are rotated back
+import threading
+
+import cv2
+import numpy as np
+
+PROFILES = {
+    'fast': {'clahe': False, 'blur': 0, 'method': cv2.ADAPTIVE_THRESH_MEAN_C, 'block_size': 15, 'c': 5,
+             'close': False},
+    'balanced': {'clahe': False, 'blur': 5, 'method': cv2.ADAPTIVE_THRESH_GAUSSIAN_C, 'block_size': 11, 'c': 2,
+                 'close': True},
+    'accurate': {'clahe': True, 'blur': 3, 'method': cv2.ADAPTIVE_THRESH_GAUSSIAN_C, 'block_size': 31, 'c': 10,
+                 'close': True},
+}
+MODIFIERS = ('denoise', 'deskew')
+
+CLOSE_KERNEL = np.ones((2, 2), np.uint8)
+MAX_SKEW = 15.0  # Degrees; larger estimates are more likely layout than skew
+MIN_SKEW = 0.5
+
+
+def parse_profile(spec):
+    """(base profile, set of modifiers) for a spec like 'accurate+deskew'; ValueError if unknown"""
+    parts = [part.strip() for part in (spec or 'balanced').lower().split('+') if part.strip()]
+    base = 'balanced'
+    modifiers = set()
+    for part in parts:
+        if part in PROFILES:
+            base = part
+        elif part in MODIFIERS:
+            modifiers.add(part)
+        else:
+            raise ValueError(f"Unknown preprocessing profile '{part}' "
+                             f"(profiles: {', '.join(PROFILES)}; modifiers: {', '.join(MODIFIERS)})")
+    return base, modifiers
+
+
+def profile_name(spec):
+    """Canonical spelling of a profile spec, e.g. 'deskew+accurate' -> 'accurate+deskew'"""
+    base, modifiers = parse_profile(spec)
+    return '+'.join([base] + sorted(modifiers))
+
+
+class BufferPool(threading.local):
+    """Per-thread reusable image planes, reallocated only when the size changes"""
+
+    def __init__(self):
+        self.buffers = {}
+        self.allocations = 0
+
+    def get(self, name, shape, dtype=np.uint8):
+        buffer = self.buffers.get(name)
+        if buffer is None or buffer.shape != shape or buffer.dtype != dtype:
+            buffer = self.buffers[name] = np.empty(shape, dtype)
+            self.allocations += 1
+        return buffer
+
+
+buffers = BufferPool()
+_clahe = threading.local()
+_opencl_failed = False
+
+
+def get_clahe():
+    if not hasattr(_clahe, 'instance'):
+        _clahe.instance = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
+    return _clahe.instance
+
+
+def opencl_available():
+    return cv2.ocl.haveOpenCL()
+
+
+def estimate_skew(binary):
+    """Skew of the text lines in a binary image (dark text on white), in degrees, counter-clockwise positive
+
+    Characters are smeared horizontally into line blobs on a small copy;
+    the answer is the length-weighted median angle of the elongated blobs.
+    """
+    height, width = binary.shape[:2]
+    scale = min(1.0, 1000.0 / max(height, width))
+    small = cv2.resize(binary, (max(1, int(width * scale)), max(1, int(height * scale))),
+                       interpolation=cv2.INTER_AREA) if scale < 1.0 else binary
+    ink = cv2.threshold(small, 127, 255, cv2.THRESH_BINARY_INV)[1]
+    ink = cv2.morphologyEx(ink, cv2.MORPH_OPEN, np.ones((2, 2), np.uint8))  # Drop speckle noise
+    lines = cv2.dilate(ink, cv2.getStructuringElement(cv2.MORPH_RECT, (15, 3)))
+    contours, _ = cv2.findContours(lines, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    angles = []
+    for contour in contours:
+        (_, _), (w, h), angle = cv2.minAreaRect(contour)
+        if w < h:
+            w, h, angle = h, w, angle - 90
+        if w < 40 or w < 3 * h:
+            continue  # Not a text line
+        angle = (angle + 90) % 180 - 90  # Fold to [-90, 90)
+        angles.append((angle, w))
+    if not angles:
+        return 0.0
+    angles.sort()
+    half = sum(weight for _, weight in angles) / 2
+    running = 0
+    for angle, weight in angles:
+        running += weight
+        if running >= half:
+            return -angle
+    return 0.0
+
+
+def rotation_matrix(shape, angle):
+    height, width = shape[:2]
+    return cv2.getRotationMatrix2D((width / 2, height / 2), -angle, 1.0)
+
+
+def rotate_boxes(text_blocks, inverse):
+    """Map OCR boxes from the deskewed image back, as axis-aligned boxes around the rotated corners"""
+    for block in text_blocks:
+        x, y, w, h = block['x'], block['y'], block['width'], block['height']
+        corners = np.array([[x, y, 1], [x + w, y, 1], [x, y + h, 1], [x + w, y + h, 1]], np.float64)
+        mapped = corners @ inverse.T
+        x0, y0 = mapped.min(axis=0)
+        x1, y1 = mapped.max(axis=0)
+        block['x'], block['y'] = int(round(x0)), int(round(y0))
+        block['width'], block['height'] = int(round(x1 - x0)), int(round(y1 - y0))
+    return text_blocks
+
+
+def _steps_cpu(image, params, modifiers):
+    shape = image.shape[:2]
+    front, back = buffers.get('a', shape), buffers.get('b', shape)
+    if image.ndim == 3:
+        cv2.cvtColor(image, cv2.COLOR_BGR2GRAY, dst=front)
+    else:
+        np.copyto(front, image)
+    if 'denoise' in modifiers:
+        cv2.fastNlMeansDenoising(front, dst=back, h=10)
+        front, back = back, front
+    if params['clahe']:
+        get_clahe().apply(front, dst=back)
+        front, back = back, front
+    if params['blur']:
+        cv2.GaussianBlur(front, (params['blur'], params['blur']), 0, dst=back)
+        front, back = back, front
+    cv2.adaptiveThreshold(front, 255, params['method'], cv2.THRESH_BINARY, params['block_size'], params['c'],
+                          dst=back)
+    front, back = back, front
+    if params['close']:
+        cv2.morphologyEx(front, cv2.MORPH_CLOSE, CLOSE_KERNEL, dst=back)
+        front, back = back, front
+    if 'deskew' in modifiers:
+        angle = estimate_skew(front)
+        if MIN_SKEW <= abs(angle) <= MAX_SKEW:
+            matrix = rotation_matrix(shape, angle)
+            cv2.warpAffine(front, matrix, (shape[1], shape[0]), dst=back, flags=cv2.INTER_NEAREST,
+                           borderMode=cv2.BORDER_CONSTANT, borderValue=255)
+            return back, cv2.invertAffineTransform(matrix)
+    return front, None
+
+
+def _steps_opencl(image, params, modifiers):
+    current = cv2.UMat(image)
+    current = cv2.cvtColor(current, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else current
+    if 'denoise' in modifiers:
+        current = cv2.fastNlMeansDenoising(current, h=10)
+    if params['clahe']:
+        current = get_clahe().apply(current)
+    if params['blur']:
+        current = cv2.GaussianBlur(current, (params['blur'], params['blur']), 0)
+    current = cv2.adaptiveThreshold(current, 255, params['method'], cv2.THRESH_BINARY,
+                                    params['block_size'], params['c'])
+    if params['close']:
+        current = cv2.morphologyEx(current, cv2.MORPH_CLOSE, CLOSE_KERNEL)
+    binary = current.get()
+    if 'deskew' in modifiers:
+        angle = estimate_skew(binary)
+        if MIN_SKEW <= abs(angle) <= MAX_SKEW:
+            matrix = rotation_matrix(binary.shape, angle)
+            binary = cv2.warpAffine(binary, matrix, (binary.shape[1], binary.shape[0]), flags=cv2.INTER_NEAREST,
+                                    borderMode=cv2.BORDER_CONSTANT, borderValue=255)
+            return binary, cv2.invertAffineTransform(matrix)
+    return binary, None
+
+
+def preprocess(image, profile='balanced', use_opencl=False):
+    """Binarise a BGR (or grayscale) image for OCR
+
+    Returns (binary image, inverse rotation or None). On the CPU path the
+    binary image is one of this thread's buffers: it stays valid until
+    the thread's next preprocess() call. When deskewing rotated the
+    image, pass the inverse rotation to rotate_boxes() for the OCR boxes.
+    """
+    global _opencl_failed
+    base, modifiers = parse_profile(profile)
+    params = PROFILES[base]
+    if use_opencl and not _opencl_failed and opencl_available():
+        try:
+            cv2.ocl.setUseOpenCL(True)
+            return _steps_opencl(image, params, modifiers)
+        except cv2.error as e:
+            _opencl_failed = True
+            print(f"OpenCL preprocessing failed, using the CPU from now on: {e}")
+    return _steps_cpu(image, params, modifiers)
@@ -0,0 +1,144 @@
+# rendering.py - Translated-text overlays
+#
+# Fonts are loaded once per process and cached by (face, size). Each text
+# block gets the largest font size whose text fits its box. Three outputs
+# share that layout:
+#
+#   composite  translations drawn onto the photo; only the block regions
+#              are converted to PIL and written back, the frame is never
+#              copied as a whole
+#   overlay    just the boxes and text on a transparent RGBA layer the
+#              client stacks on top of the original
+#   vector     no image at all, a JSON description of the boxes and text
+from functools import lru_cache
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+PADDING = 2  # Background box margin around the OCR box, in pixels
+
+
+@lru_cache(maxsize=256)
+def load_font(faces, size):
+    """First of `faces` (a tuple of file names or paths) that loads at `size`
+
+    Falls back to PIL's built-in bitmap font, which has a single size.
+    """
+    for face in faces:
+        try:
+            return ImageFont.truetype(face, size)
+        except OSError:
+            continue
+    return ImageFont.load_default()
+
+
+def text_size(font, text):
+    left, top, right, bottom = font.getbbox(text)
+    return right - left, bottom - top
+
+
+def fit_font(text, width, height, faces, min_size=8, max_size=96):
+    """Largest font (by binary search over sizes) whose rendering of `text` fits width x height"""
+    low = min_size
+    high = max(min_size, min(max_size, int(height)))
+    font = load_font(faces, low)
+    if not isinstance(font, ImageFont.FreeTypeFont):
+        return font  # Bitmap fallback cannot be resized
+    while low < high:
+        size = (low + high + 1) // 2
+        text_width, text_height = text_size(load_font(faces, size), text)
+        if text_width <= width and text_height <= height:
+            low = size
+        else:
+            high = size - 1
+    return load_font(faces, low)
+
+
+def layout_overlay(text_blocks, faces, min_size=8, max_size=96):
+    """Boxes and fitted text for every translated block
+
+    Blocks whose translation equals the original text are left out, as
+    there is nothing to draw over them.
+    """
+    elements = []
+    for block in text_blocks:
+        translated = block.get('translated_text')
+        if not translated or translated == block['text']:
+            continue
+        x, y, width, height = block['x'], block['y'], block['width'], block['height']
+        font = fit_font(translated, width, height, faces, min_size, max_size)
+        text_width, text_height = text_size(font, translated)
+        left, top, _, _ = font.getbbox(translated)
+        elements.append({
+            'x': x,
+            'y': y,
+            'width': width,
+            'height': height,
+            'text': translated,
+            'font_size': getattr(font, 'size', None),
+            # Text origin that centres it vertically in the box
+            'text_x': x - left,
+            'text_y': y + (height - text_height) // 2 - top,
+            'font': font,
+        })
+    return elements
+
+
+def draw_element(draw, element, offset_x=0, offset_y=0):
+    x, y = element['x'] - offset_x, element['y'] - offset_y
+    draw.rectangle(
+        [x - PADDING, y - PADDING, x + element['width'] + PADDING, y + element['height'] + PADDING],
+        fill='white',
+        outline='black'
+    )
+    draw.text(
+        (element['text_x'] - offset_x, element['text_y'] - offset_y),
+        element['text'],
+        fill='black',
+        font=element['font']
+    )
+
+
+def composite(image, elements):
+    """Draw the elements onto a BGR frame in place and return it
+
+    Each element's region is cropped, drawn on as a small PIL image and
+    written back, so the cost scales with the text area, not the photo.
+    """
+    height, width = image.shape[:2]
+    for element in elements:
+        x0 = max(0, element['x'] - PADDING)
+        y0 = max(0, element['y'] - PADDING)
+        x1 = min(width, element['x'] + element['width'] + PADDING + 1)
+        y1 = min(height, element['y'] + element['height'] + PADDING + 1)
+        if x1 <= x0 or y1 <= y0:
+            continue
+        region = image[y0:y1, x0:x1]
+        pil_region = Image.fromarray(np.ascontiguousarray(region[:, :, ::-1]))
+        draw_element(ImageDraw.Draw(pil_region), element, x0, y0)
+        region[:] = np.asarray(pil_region)[:, :, ::-1]
+    return image
+
+
+def overlay_layer(width, height, elements):
+    """Transparent RGBA image holding only the boxes and text"""
+    layer = Image.new('RGBA', (width, height), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(layer)
+    for element in elements:
+        draw_element(draw, element)
+    return layer
+
+
+def vector_overlay(width, height, elements):
+    """JSON-ready description of the overlay for clients that draw it themselves"""
+    return {
+        'width': width,
+        'height': height,
+        'padding': PADDING,
+        'background': '#ffffff',
+        'color': '#000000',
+        'elements': [
+            {key: element[key] for key in ('x', 'y', 'width', 'height', 'text', 'font_size', 'text_x', 'text_y')}
+            for element in elements
+        ]
+    }
@@ -0,0 +1,122 @@
+# result_cache.py - Content-addressed cache of pipeline results for repeat uploads
+import hashlib
+import json
+from datetime import datetime
+
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+
+from models import db, CachedResult, Translation
+
+
+def content_key(file_content, target_language, pipeline_version, chunk_size=1024 * 1024):
+    """Hash the upload (bytes, or a file read in chunks) together with everything that affects the result"""
+    digest = hashlib.sha256()
+    if isinstance(file_content, (bytes, bytearray, memoryview)):
+        digest.update(file_content)
+    else:
+        position = file_content.tell()
+        file_content.seek(0)
+        for chunk in iter(lambda: file_content.read(chunk_size), b''):
+            digest.update(chunk)
+        file_content.seek(position)
+    digest.update(b'\0' + target_language.encode('utf-8'))
+    digest.update(b'\0' + str(pipeline_version).encode('utf-8'))
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """Stores text blocks and the rendered image key per content hash.
+
+    Entries are evicted least-recently-used first once the cache holds
+    more than `max_entries` results or `max_bytes` of payload. With a
+    `blob_store`, an entry's size includes its rendered image, and images
+    that no cache entry or history row references any more are deleted
+    from the store on eviction.
+    """
+
+    def __init__(self, max_entries=1000, max_bytes=256 * 1024 * 1024, blob_store=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.blob_store = blob_store
+
+    def get(self, key):
+        """Return {'text_blocks', 'image_dimensions', 'image_key'} or None"""
+        entry = CachedResult.query.filter_by(content_hash=key).first()
+        if entry is None:
+            return None
+        if entry.image_key and self.blob_store is not None and not self.blob_store.exists(entry.image_key):
+            # Image was collected (e.g. by an eviction whose transaction rolled back); recompute
+            db.session.delete(entry)
+            return None
+        entry.hit_count += 1
+        entry.last_accessed = datetime.utcnow()
+        return {
+            'text_blocks': json.loads(entry.text_blocks),
+            'image_dimensions': entry.image_dimensions,
+            'image_key': entry.image_key
+        }
+
+    def put(self, key, text_blocks, image_dimensions=None, image_key=None):
+        """Store a result; the caller commits
+
+        The rendered image itself lives in the blob store under `image_key`
+        and is shared with the history rows; it counts towards the entry's
+        size but is only deleted once nothing references it.
+        """
+        if CachedResult.query.filter_by(content_hash=key).first() is not None:
+            return
+        blocks_json = json.dumps(text_blocks)
+        size = len(blocks_json)
+        if image_key and self.blob_store is not None:
+            size += self.blob_store.size(image_key)
+        if size > self.max_bytes:
+            return
+        try:
+            # Another worker may finish the same upload first
+            with db.session.begin_nested():
+                db.session.add(CachedResult(
+                    content_hash=key,
+                    image_dimensions=image_dimensions,
+                    text_blocks=blocks_json,
+                    image_key=image_key,
+                    size_bytes=size
+                ))
+        except IntegrityError:
+            return
+        self.evict()
+
+    def evict(self):
+        """Drop least recently used entries until the size bounds hold"""
+        count, total = db.session.query(
+            func.count(CachedResult.id), func.coalesce(func.sum(CachedResult.size_bytes), 0)
+        ).one()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+
+        victims = db.session.query(CachedResult.id, CachedResult.size_bytes, CachedResult.image_key)\
+                            .order_by(CachedResult.last_accessed.asc())
+        doomed = []
+        image_keys = set()
+        for entry_id, size, image_key in victims.yield_per(100):
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            doomed.append(entry_id)
+            if image_key:
+                image_keys.add(image_key)
+            count -= 1
+            total -= size
+        if doomed:
+            CachedResult.query.filter(CachedResult.id.in_(doomed)).delete(synchronize_session=False)
+            self.collect_blobs(image_keys)
+
+    def collect_blobs(self, image_keys):
+        """Delete the given blobs unless a cache entry or history row still references them"""
+        if self.blob_store is None or not image_keys:
+            return
+        referenced = {key for (key,) in db.session.query(CachedResult.image_key)
+                      .filter(CachedResult.image_key.in_(image_keys))}
+        referenced.update(key for (key,) in db.session.query(Translation.image_key)
+                          .filter(Translation.image_key.in_(image_keys)))
+        for image_key in image_keys - referenced:
+            self.blob_store.delete(image_key)
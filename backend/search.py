@@ -0,0 +1,198 @@
+# search.py - Full-text search over text blocks
+#
+# SQLite keeps an external-content FTS5 table (text_blocks_fts) in step
+# with text_blocks through triggers; PostgreSQL uses a generated tsvector
+# column with a GIN index. Both are maintained by the database on every
+# insert and delete, including bulk deletes. Other databases (or SQLite
+# builds without FTS5) fall back to a LIKE scan.
+import re
+
+from sqlalchemy import text
+
+from models import db
+
+SQLITE_FTS_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS text_blocks_fts USING fts5(
+        text, translated_text, content='text_blocks', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS text_blocks_fts_insert AFTER INSERT ON text_blocks BEGIN
+        INSERT INTO text_blocks_fts(rowid, text, translated_text) VALUES (new.id, new.text, new.translated_text);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS text_blocks_fts_delete AFTER DELETE ON text_blocks BEGIN
+        INSERT INTO text_blocks_fts(text_blocks_fts, rowid, text, translated_text)
+        VALUES ('delete', old.id, old.text, old.translated_text);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS text_blocks_fts_update AFTER UPDATE ON text_blocks BEGIN
+        INSERT INTO text_blocks_fts(text_blocks_fts, rowid, text, translated_text)
+        VALUES ('delete', old.id, old.text, old.translated_text);
+        INSERT INTO text_blocks_fts(rowid, text, translated_text) VALUES (new.id, new.text, new.translated_text);
+    END""",
+]
+
+# 'simple' keeps words as written; signs mix languages, so no stemming
+POSTGRES_SEARCH_DDL = [
+    """ALTER TABLE text_blocks ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (to_tsvector('simple', coalesce(text, '') || ' ' || coalesce(translated_text, ''))) STORED""",
+    'CREATE INDEX IF NOT EXISTS ix_text_blocks_search_vector ON text_blocks USING gin (search_vector)',
+]
+
+TOKEN_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+
+def query_terms(query):
+    """Words of a user query, lowercased; punctuation and operators are dropped"""
+    return [term.lower() for term in TOKEN_PATTERN.findall(query or '')]
+
+
+def install_search_index(connection):
+    """Create the full-text index objects for this database, if supported
+
+    For databases built with db.create_all() (create_tables); migrated
+    databases get the same objects from the migration. Returns the search
+    backend that is now available.
+    """
+    dialect = connection.dialect.name
+    if dialect == 'sqlite':
+        exists = connection.execute(text(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'text_blocks_fts'"
+        )).first()
+        if exists:
+            return 'fts5'
+        try:
+            for statement in SQLITE_FTS_DDL:
+                connection.execute(text(statement))
+        except Exception as e:
+            print(f"FTS5 unavailable, search will use LIKE: {e}")
+            return 'like'
+        # Index rows written before the FTS table existed
+        connection.execute(text("INSERT INTO text_blocks_fts(text_blocks_fts) VALUES ('rebuild')"))
+        return 'fts5'
+    if dialect == 'postgresql':
+        for statement in POSTGRES_SEARCH_DDL:
+            connection.execute(text(statement))
+        return 'tsvector'
+    return 'like'
+
+
+def search_backend():
+    """'fts5', 'tsvector' or 'like' for the current database"""
+    connection = db.session.connection()
+    dialect = connection.dialect.name
+    if dialect == 'sqlite':
+        exists = connection.execute(text(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'text_blocks_fts'"
+        )).first()
+        return 'fts5' if exists else 'like'
+    if dialect == 'postgresql':
+        exists = connection.execute(text(
+            "SELECT 1 FROM information_schema.columns "
+            "WHERE table_name = 'text_blocks' AND column_name = 'search_vector'"
+        )).first()
+        return 'tsvector' if exists else 'like'
+    return 'like'
+
+
+def _ranked_sql(backend, terms):
+    """SQL returning (translation_id, score) for one page, best match first, plus its parameters"""
+    if backend == 'fts5':
+        # Every term must match, as a prefix; quoting disables FTS5 query syntax.
+        # bm25() is only usable in the FTS query itself, hence the materialized CTE
+        params = {'match': ' '.join(f'"{term}"*' for term in terms)}
+        sql = """
+            WITH matches AS MATERIALIZED (
+                SELECT rowid AS block_id, bm25(text_blocks_fts) AS score
+                FROM text_blocks_fts WHERE text_blocks_fts MATCH :match
+            )
+            SELECT b.translation_id, -min(m.score) AS score
+            FROM matches m
+            JOIN text_blocks b ON b.id = m.block_id
+            JOIN translations t ON t.id = b.translation_id
+            WHERE t.session_id = :session_id
+            GROUP BY b.translation_id
+            ORDER BY score DESC, max(t.created_at) DESC
+            LIMIT :limit OFFSET :offset
+        """
+    elif backend == 'tsvector':
+        params = {'tsquery': ' & '.join(f'{term}:*' for term in terms)}
+        sql = """
+            SELECT b.translation_id, max(ts_rank(b.search_vector, q)) AS score
+            FROM text_blocks b
+            JOIN translations t ON t.id = b.translation_id,
+                 to_tsquery('simple', :tsquery) q
+            WHERE b.search_vector @@ q AND t.session_id = :session_id
+            GROUP BY b.translation_id
+            ORDER BY score DESC, max(t.created_at) DESC
+            LIMIT :limit OFFSET :offset
+        """
+    else:
+        # Score is the number of blocks containing every term
+        params = {f'term{i}': f'%{term}%' for i, term in enumerate(terms)}
+        conditions = ' AND '.join(
+            f"(lower(b.text) LIKE :term{i} OR lower(coalesce(b.translated_text, '')) LIKE :term{i})"
+            for i in range(len(terms))
+        )
+        sql = f"""
+            SELECT b.translation_id, count(*) AS score
+            FROM text_blocks b
+            JOIN translations t ON t.id = b.translation_id
+            WHERE t.session_id = :session_id AND {conditions}
+            GROUP BY b.translation_id
+            ORDER BY score DESC, max(t.created_at) DESC
+            LIMIT :limit OFFSET :offset
+        """
+    return sql, params
+
+
+def _matching_blocks_sql(backend, terms, translation_ids):
+    id_params = {f'id{i}': translation_id for i, translation_id in enumerate(translation_ids)}
+    id_list = ', '.join(f':id{i}' for i in range(len(translation_ids)))
+    if backend == 'fts5':
+        params = {'match': ' '.join(f'"{term}"*' for term in terms)}
+        where = 'b.id IN (SELECT rowid FROM text_blocks_fts WHERE text_blocks_fts MATCH :match)'
+    elif backend == 'tsvector':
+        params = {'tsquery': ' & '.join(f'{term}:*' for term in terms)}
+        where = "b.search_vector @@ to_tsquery('simple', :tsquery)"
+    else:
+        params = {f'term{i}': f'%{term}%' for i, term in enumerate(terms)}
+        where = ' AND '.join(
+            f"(lower(b.text) LIKE :term{i} OR lower(coalesce(b.translated_text, '')) LIKE :term{i})"
+            for i in range(len(terms))
+        )
+    sql = f"""
+        SELECT b.translation_id, b.position, b.text, b.translated_text
+        FROM text_blocks b
+        WHERE b.translation_id IN ({id_list}) AND {where}
+        ORDER BY b.translation_id, b.position
+    """
+    params.update(id_params)
+    return sql, params
+
+
+def search_translations(session_id, query, limit=10, offset=0):
+    """Rank a session's translations against `query`
+
+    Returns (backend, [(translation_id, score, matching blocks)]) with at
+    most `limit` results; blocks are dicts with position, text and
+    translated_text.
+    """
+    terms = query_terms(query)
+    backend = search_backend()
+    if not terms:
+        return backend, []
+
+    sql, params = _ranked_sql(backend, terms)
+    params.update({'session_id': session_id, 'limit': limit, 'offset': offset})
+    ranked = db.session.execute(text(sql), params).fetchall()
+    if not ranked:
+        return backend, []
+
+    translation_ids = [row[0] for row in ranked]
+    sql, params = _matching_blocks_sql(backend, terms, translation_ids)
+    matches = {}
+    for translation_id, position, block_text, translated_text in db.session.execute(text(sql), params):
+        matches.setdefault(translation_id, []).append({
+            'position': position, 'text': block_text, 'translated_text': translated_text
+        })
+    return backend, [(translation_id, float(score), matches.get(translation_id, []))
+                     for translation_id, score in ranked]
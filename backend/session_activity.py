@@ -0,0 +1,99 @@
+# session_activity.py - Buffered last_activity updates for user sessions
+#
+# Requests only record the time they saw a session in memory. A background
+# thread writes the latest time per session in one bulk UPDATE every
+# flush interval, so read-only endpoints no longer take the database write
+# lock. user_sessions.last_activity lags by at most the flush interval.
+import atexit
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy import bindparam, update
+
+from models import db, UserSession
+
+
+class SessionActivityBuffer:
+    """Coalesces last_activity bumps and flushes them periodically"""
+
+    def __init__(self, app=None):
+        self.app = None
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self.flushes = 0
+        self.rows_written = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        app.config.setdefault('SESSION_ACTIVITY_FLUSH_INTERVAL', 30)
+        atexit.register(self._flush_at_exit)
+
+    def touch(self, session_id, when=None):
+        """Record activity for a session; written on the next flush"""
+        when = when or datetime.utcnow()
+        with self._lock:
+            # Only the latest time per session matters
+            if self._pending.get(session_id, when) <= when:
+                self._pending[session_id] = when
+        if self.app.config['SESSION_ACTIVITY_FLUSH_INTERVAL'] <= 0:
+            self.flush()
+        else:
+            self._ensure_thread()
+
+    def pending(self):
+        with self._lock:
+            return len(self._pending)
+
+    def flush(self):
+        """Write buffered activity in one bulk UPDATE; needs an app context"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+
+        statement = update(UserSession.__table__)\
+            .where(UserSession.__table__.c.session_id == bindparam('sid'))\
+            .where(UserSession.__table__.c.last_activity < bindparam('seen_at'))\
+            .values(last_activity=bindparam('seen_at'))
+        try:
+            db.session.execute(statement, [
+                {'sid': session_id, 'seen_at': seen_at} for session_id, seen_at in pending.items()
+            ])
+            db.session.commit()
+        except Exception as e:
+            print(f"Session activity flush failed: {e}")
+            db.session.rollback()
+            # Put the updates back unless newer ones arrived meanwhile
+            with self._lock:
+                for session_id, seen_at in pending.items():
+                    if self._pending.get(session_id, seen_at) <= seen_at:
+                        self._pending[session_id] = seen_at
+            return 0
+
+        self.flushes += 1
+        self.rows_written += len(pending)
+        return len(pending)
+
+    def _ensure_thread(self):
+        # Started on first use so forked web workers each get their own
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='session-activity', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.app.config['SESSION_ACTIVITY_FLUSH_INTERVAL'])
+            with self.app.app_context():
+                self.flush()
+
+    def _flush_at_exit(self):
+        if self._pending and self.app is not None:
+            with self.app.app_context():
+                self.flush()
@@ -0,0 +1,102 @@
+# session_stats.py - Keep session_stats in step with the translations table
+#
+# A before_flush hook applies every Translation insert and delete to the
+# session's SessionStats row inside the same transaction, so /api/stats
+# reads one row instead of scanning the history. Bulk query deletes
+# bypass the hook; callers use reset_session_stats() for those.
+import json
+from datetime import datetime
+
+from sqlalchemy import event, func
+from sqlalchemy.dialects import postgresql, sqlite
+
+from models import db, Translation, SessionStats
+
+
+def text_count(translation):
+    return translation.text_count or 0
+
+
+def get_stats_row(session, session_id):
+    """SessionStats row for a session, created if missing and locked for update"""
+    dialect = session.get_bind().dialect.name
+    if dialect in ('sqlite', 'postgresql'):
+        insert = sqlite.insert if dialect == 'sqlite' else postgresql.insert
+        session.execute(
+            insert(SessionStats.__table__).values(
+                session_id=session_id, translation_count=0, total_processing_time=0.0, text_count=0
+            ).on_conflict_do_nothing(index_elements=['session_id'])
+        )
+    else:
+        stats = session.query(SessionStats).filter_by(session_id=session_id).with_for_update().first()
+        if stats is None:
+            stats = SessionStats(session_id=session_id, translation_count=0,
+                                 total_processing_time=0.0, text_count=0)
+            session.add(stats)
+        return stats
+    return session.query(SessionStats).filter_by(session_id=session_id)\
+                  .populate_existing().with_for_update().one()
+
+
+def apply_translation(stats, translation, sign):
+    """Add (sign=1) or remove (sign=-1) one translation from the totals"""
+    stats.translation_count = (stats.translation_count or 0) + sign
+    stats.total_processing_time = (stats.total_processing_time or 0.0) + sign * (translation.processing_time or 0.0)
+    stats.text_count = (stats.text_count or 0) + sign * text_count(translation)
+
+    if translation.detected_language:
+        languages = json.loads(stats.language_counts) if stats.language_counts else {}
+        count = languages.get(translation.detected_language, 0) + sign
+        if count > 0:
+            languages[translation.detected_language] = count
+        else:
+            languages.pop(translation.detected_language, None)
+        stats.language_counts = json.dumps(languages, sort_keys=True)
+
+
+def refresh_bounds(session, stats, excluded_ids):
+    """Recompute first/last timestamps from the remaining translations"""
+    query = session.query(func.min(Translation.created_at), func.max(Translation.created_at))\
+                   .filter(Translation.session_id == stats.session_id)
+    if excluded_ids:
+        query = query.filter(Translation.id.notin_(excluded_ids))
+    stats.first_translation_at, stats.last_translation_at = query.one()
+
+
+@event.listens_for(db.session, 'before_flush')
+def update_session_stats(session, flush_context, instances):
+    added = [obj for obj in session.new if isinstance(obj, Translation)]
+    deleted = [obj for obj in session.deleted if isinstance(obj, Translation) and obj.id is not None]
+    if not added and not deleted:
+        return
+
+    for session_id in {t.session_id for t in added + deleted if t.session_id}:
+        stats = get_stats_row(session, session_id)
+
+        removed = [t for t in deleted if t.session_id == session_id]
+        for translation in removed:
+            apply_translation(stats, translation, -1)
+        if removed and any(t.created_at in (stats.first_translation_at, stats.last_translation_at) for t in removed):
+            refresh_bounds(session, stats, [t.id for t in removed])
+
+        for translation in (t for t in added if t.session_id == session_id):
+            # created_at is normally filled in at INSERT time; set it now so the bounds can use it
+            if translation.created_at is None:
+                translation.created_at = datetime.utcnow()
+            apply_translation(stats, translation, 1)
+            if stats.first_translation_at is None or translation.created_at < stats.first_translation_at:
+                stats.first_translation_at = translation.created_at
+            if stats.last_translation_at is None or translation.created_at > stats.last_translation_at:
+                stats.last_translation_at = translation.created_at
+
+
+def reset_session_stats(session_id):
+    """Zero a session's totals after its translations were bulk-deleted"""
+    SessionStats.query.filter_by(session_id=session_id).update({
+        'translation_count': 0,
+        'total_processing_time': 0.0,
+        'text_count': 0,
+        'language_counts': None,
+        'first_translation_at': None,
+        'last_translation_at': None
+    })
@@ -0,0 +1,161 @@
+# translation_memory.py - Translation memory cache in front of the translator backend
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+from sqlalchemy.dialects import postgresql, sqlite
+
+from models import db, TranslationMemoryEntry
+
+
+def source_hash(text):
+    """Stable key for a source text"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class LRUCache:
+    """Thread-safe in-process LRU cache with per-entry TTL"""
+
+    def __init__(self, max_size=10000, ttl=3600):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class TranslationMemory:
+    """Two-level translation cache: in-process LRU backed by the database.
+
+    The `translation_memory` table is shared by every worker, so a string
+    translated once is served from the database by all of them and only
+    the in-process layer is per worker. Entries are kept per translation
+    engine, so switching engines never serves another engine's output.
+    """
+
+    def __init__(self, max_size=10000, ttl=3600):
+        self.cache = LRUCache(max_size=max_size, ttl=ttl)
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _count(self, memory_hits=0, db_hits=0, misses=0):
+        with self._lock:
+            self.memory_hits += memory_hits
+            self.db_hits += db_hits
+            self.misses += misses
+
+    def get_many(self, texts, target_language, engine):
+        """Look texts up; returns {text: translated_text} for the hits"""
+        found = {}
+        missing = {}
+        for text in texts:
+            translated = self.cache.get((text, target_language, engine))
+            if translated is not None:
+                found[text] = translated
+            else:
+                missing[source_hash(text)] = text
+
+        memory_hits = len(found)
+        if missing:
+            entries = TranslationMemoryEntry.query.filter(
+                TranslationMemoryEntry.target_language == target_language,
+                TranslationMemoryEntry.translation_engine == engine,
+                TranslationMemoryEntry.source_hash.in_(list(missing))
+            ).all()
+            for entry in entries:
+                text = missing.get(entry.source_hash)
+                if text is None or entry.source_text != text:
+                    continue
+                found[text] = entry.translated_text
+                self.cache.put((text, target_language, engine), entry.translated_text)
+
+        db_hits = len(found) - memory_hits
+        self._count(memory_hits=memory_hits, db_hits=db_hits, misses=len(texts) - len(found))
+        return found
+
+    def put_many(self, translations, target_language, engine, detected_languages=None):
+        """Store {text: translated_text} in both cache levels
+
+        Translations equal to their source are not stored: that is what a
+        backend returns when it has nothing better (a phrase table miss),
+        and another engine may well translate the text.
+
+        The rows are written inside a savepoint of the caller's transaction
+        and committed with it: a database error rolls back only this write
+        (and is raised), and nothing else the caller has pending is flushed
+        or committed early.
+        """
+        translations = {text: translated for text, translated in translations.items() if translated != text}
+        if not translations:
+            return
+        detected_languages = detected_languages or {}
+        for text, translated in translations.items():
+            self.cache.put((text, target_language, engine), translated)
+
+        rows = [{
+            'source_hash': source_hash(text),
+            'source_text': text,
+            'target_language': target_language,
+            'translation_engine': engine,
+            'translated_text': translated,
+            'detected_language': detected_languages.get(text),
+            'created_at': datetime.utcnow()
+        } for text, translated in translations.items()]
+
+        # Another worker may have stored the same string in the meantime
+        dialect = db.session.get_bind().dialect.name
+        with db.session.begin_nested():
+            if dialect in ('sqlite', 'postgresql'):
+                insert = sqlite.insert if dialect == 'sqlite' else postgresql.insert
+                stmt = insert(TranslationMemoryEntry.__table__).on_conflict_do_nothing(
+                    index_elements=['source_hash', 'target_language', 'translation_engine']
+                )
+                db.session.execute(stmt, rows)
+            else:
+                for row in rows:
+                    exists = TranslationMemoryEntry.query.filter_by(
+                        source_hash=row['source_hash'],
+                        target_language=target_language,
+                        translation_engine=engine
+                    ).first()
+                    if not exists:
+                        db.session.add(TranslationMemoryEntry(**row))
+
+    def stats(self):
+        lookups = self.memory_hits + self.db_hits + self.misses
+        return {
+            'memory_hits': self.memory_hits,
+            'db_hits': self.db_hits,
+            'misses': self.misses,
+            'hit_rate': round((self.memory_hits + self.db_hits) / lookups, 4) if lookups else 0,
+            'memory_entries': len(self.cache)
+        }
@@ -0,0 +1,299 @@
+# translators.py - Pluggable translation backends
+import os
+import re
+import threading
+import time
+
+
+class TranslationResult:
+    """Translated text together with the source language the backend detected"""
+
+    def __init__(self, text, src=None):
+        self.text = text
+        self.src = src
+
+    def __repr__(self):
+        return f'<TranslationResult {self.text!r} ({self.src})>'
+
+
+class TranslatorBackend:
+    """Base class for translation backends.
+
+    Backends receive a list of texts and return one TranslationResult per
+    input, in the same order.
+    """
+
+    name = 'base'
+
+    def translate_batch(self, texts, target_language='en'):
+        raise NotImplementedError
+
+    def warm_up(self, target_languages=()):
+        """Load whatever the backend needs up front so the first request does not pay for it"""
+
+
+class GoogleTranslatorBackend(TranslatorBackend):
+    """googletrans backend.
+
+    googletrans translates list inputs one request per item, so a batch is
+    joined into a single newline-separated request and split back apart.
+    If the line count does not survive the round trip the batch is retried
+    item by item.
+
+    The source language Google detects for a joined request describes the
+    batch as a whole (its majority language), not each line, so results
+    from a joined request carry src=None rather than that guess; only the
+    per-item retry reports a per-line src.
+    """
+
+    name = 'google_translate'
+    separator = '\n'
+
+    def __init__(self, translator=None):
+        if translator is None:
+            from googletrans import Translator
+            translator = Translator()
+        self.translator = translator
+
+    def translate_batch(self, texts, target_language='en'):
+        if not texts:
+            return []
+        joined = self.separator.join(text.replace(self.separator, ' ') for text in texts)
+        result = self.translator.translate(joined, dest=target_language)
+        lines = result.text.split(self.separator)
+        if len(lines) == len(texts):
+            return [TranslationResult(line.strip()) for line in lines]
+
+        print(f"Batch translation returned {len(lines)} lines for {len(texts)} texts, retrying per item")
+        return [
+            TranslationResult(r.text, r.src)
+            for r in (self.translator.translate(text, dest=target_language) for text in texts)
+        ]
+
+
+class StubTranslatorBackend(TranslatorBackend):
+    """Offline backend for tests and benchmarks.
+
+    Looks texts up in an optional dictionary, otherwise returns them tagged
+    with the target language. `latency` simulates a per-call round trip.
+    """
+
+    name = 'stub'
+
+    def __init__(self, dictionary=None, latency=0.0, src='xx'):
+        self.dictionary = dictionary or {}
+        self.latency = latency
+        self.src = src
+        self.calls = 0
+
+    def translate_batch(self, texts, target_language='en'):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return [
+            TranslationResult(self.dictionary.get(text, f'[{target_language}] {text}'), self.src)
+            for text in texts
+        ]
+
+
+class PhraseTableBackend(TranslatorBackend):
+    """Offline dictionary/phrase-table backend.
+
+    Tables are tab-separated `source<TAB>translation` files, one per target
+    language (`<directory>/<target>.tsv`), loaded on first use. A text that
+    matches a whole entry is replaced outright; otherwise the longest
+    matching phrases are substituted word by word and unknown words are
+    kept as they are. Matching ignores case, and all-caps input (common on
+    signs) gets an all-caps translation.
+    """
+
+    name = 'phrase_table'
+    word_pattern = re.compile(r'\w+(?:[\'-]\w+)*|\S', re.UNICODE)
+
+    def __init__(self, directory, src=None):
+        self.directory = directory
+        self.src = src
+        self._tables = {}
+        self._lock = threading.Lock()
+
+    def load_table(self, target_language):
+        """{source phrase (lowercased): translation} plus the longest phrase length in words"""
+        with self._lock:
+            if target_language not in self._tables:
+                table = {}
+                path = os.path.join(self.directory, f'{target_language}.tsv')
+                if os.path.exists(path):
+                    with open(path, encoding='utf-8') as f:
+                        for line in f:
+                            if not line.strip() or line.startswith('#') or '\t' not in line:
+                                continue
+                            source, translation = line.rstrip('\n').split('\t', 1)
+                            table[source.strip().lower()] = translation.strip()
+                else:
+                    print(f"No phrase table for '{target_language}' at {path}")
+                longest = max((len(source.split()) for source in table), default=0)
+                self._tables[target_language] = (table, longest)
+            return self._tables[target_language]
+
+    def translate_one(self, text, table, longest):
+        translated = table.get(text.strip().lower())
+        if translated is None:
+            words = self.word_pattern.findall(text)
+            output = []
+            i = 0
+            while i < len(words):
+                for size in range(min(longest, len(words) - i), 0, -1):
+                    match = table.get(' '.join(words[i:i + size]).lower())
+                    if match is not None:
+                        output.append(match)
+                        i += size
+                        break
+                else:
+                    output.append(words[i])
+                    i += 1
+            translated = ' '.join(output)
+            if not translated.strip(' .,:;!?').lower() or translated.lower() == ' '.join(words).lower():
+                return text  # Nothing matched
+        return translated.upper() if text.isupper() else translated
+
+    def translate_batch(self, texts, target_language='en'):
+        table, longest = self.load_table(target_language)
+        return [TranslationResult(self.translate_one(text, table, longest), self.src) for text in texts]
+
+    def warm_up(self, target_languages=()):
+        for target_language in target_languages:
+            self.load_table(target_language)
+
+
+# ISO 639-1 -> the 639-3 codes multi-target OPUS-MT models use in their >>xxx<< target tokens
+MARIAN_TARGET_CODES = {
+    'ar': 'ara', 'de': 'deu', 'el': 'ell', 'en': 'eng', 'es': 'spa', 'fr': 'fra', 'he': 'heb', 'hi': 'hin',
+    'it': 'ita', 'ja': 'jpn', 'ko': 'kor', 'nl': 'nld', 'pl': 'pol', 'pt': 'por', 'ru': 'rus', 'th': 'tha',
+    'tr': 'tur', 'uk': 'ukr', 'zh': 'cmn_Hans', 'zh-cn': 'cmn_Hans', 'zh-tw': 'cmn_Hant',
+}
+
+
+class MarianBackend(TranslatorBackend):
+    """Local MarianMT models run on the CPU through transformers.
+
+    One model per language pair, named by `model_template`, is loaded on
+    first use and kept for the life of the worker. Batches are translated
+    in one padded generate() call. Requires the optional transformers,
+    sentencepiece and torch packages.
+
+    Supported pairs are whatever models exist under the template.
+    Helsinki-NLP publishes a multilingual-source model for English only
+    (opus-mt-mul-en), so the default source_language 'mul' supports target
+    'en' alone; for other targets set source_language to the language of
+    the signs (opus-mt-fr-de, ...) or point the template at one fixed
+    multi-target model (e.g. opus-mt-en-mul), whose >>xxx<< target token
+    is added to every input. A model that cannot be loaded, or that does
+    not cover the target, raises ValueError; the failure is remembered so
+    later batches fail fast instead of retrying the download.
+    """
+
+    name = 'marian'
+
+    def __init__(self, model_template='Helsinki-NLP/opus-mt-{source}-{target}', source_language='mul',
+                 max_length=256, threads=None):
+        self.model_template = model_template
+        self.source_language = source_language
+        self.max_length = max_length
+        self.threads = threads
+        self._models = {}
+        self._lock = threading.Lock()
+
+    def model_name(self, target_language):
+        """Model for source_language -> target_language; ValueError for a pair OPUS-MT does not publish"""
+        if '{source}' in self.model_template and self.source_language == 'mul' and target_language != 'en':
+            raise ValueError(
+                f"No multilingual-source translation model for target '{target_language}': only mul->en "
+                f"exists. Set MARIAN_SOURCE_LANGUAGE to the source language or MARIAN_MODEL_TEMPLATE to a "
+                f"multi-target model"
+            )
+        return self.model_template.format(source=self.source_language, target=target_language)
+
+    def target_token(self, tokenizer, target_language):
+        """'>>xxx<< ' prefix selecting the target in multi-target models, '' for single-target ones"""
+        supported = set(getattr(tokenizer, 'supported_language_codes', None) or ())
+        if not supported:
+            return ''
+        for code in (target_language, MARIAN_TARGET_CODES.get(target_language.lower())):
+            if code and f'>>{code}<<' in supported:
+                return f'>>{code}<< '
+        raise ValueError(f"Translation model does not support target language '{target_language}'")
+
+    def load_model(self, target_language):
+        """(tokenizer, model, target token prefix) for target_language, loading it once"""
+        with self._lock:
+            if target_language not in self._models:
+                try:
+                    self._models[target_language] = self._load(target_language)
+                except ValueError as e:
+                    self._models[target_language] = e
+            loaded = self._models[target_language]
+        if isinstance(loaded, Exception):
+            raise ValueError(str(loaded))
+        return loaded
+
+    def _load(self, target_language):
+        import torch
+        from transformers import MarianMTModel, MarianTokenizer
+        if self.threads:
+            torch.set_num_threads(self.threads)
+        model_name = self.model_name(target_language)
+        print(f"Loading translation model {model_name}")
+        try:
+            tokenizer = MarianTokenizer.from_pretrained(model_name)
+            model = MarianMTModel.from_pretrained(model_name)
+        except OSError as e:
+            raise ValueError(f"Translation model {model_name} could not be loaded: {e}") from e
+        model.eval()
+        return tokenizer, model, self.target_token(tokenizer, target_language)
+
+    def translate_batch(self, texts, target_language='en'):
+        if not texts:
+            return []
+        import torch
+        tokenizer, model, prefix = self.load_model(target_language)
+        inputs = tokenizer([prefix + text for text in texts], return_tensors='pt', padding=True, truncation=True,
+                           max_length=self.max_length)
+        with torch.inference_mode():
+            outputs = model.generate(**inputs, max_length=self.max_length)
+        translated = tokenizer.batch_decode(outputs, skip_special_tokens=True)
+        src = self.source_language if self.source_language != 'mul' else None
+        return [TranslationResult(text, src) for text in translated]
+
+    def warm_up(self, target_languages=()):
+        for target_language in target_languages:
+            self.load_model(target_language)
+
+
+def create_translator_backend(engine, config):
+    """Translator backend for a TRANSLATION_ENGINE name"""
+    if engine == 'google_translate':
+        return GoogleTranslatorBackend()
+    if engine == 'phrase_table':
+        return PhraseTableBackend(config['PHRASE_TABLE_DIR'])
+    if engine == 'marian':
+        return MarianBackend(model_template=config['MARIAN_MODEL_TEMPLATE'],
+                             source_language=config['MARIAN_SOURCE_LANGUAGE'],
+                             threads=config['MARIAN_THREADS'])
+    if engine == 'stub':
+        return StubTranslatorBackend()
+    raise ValueError(f'Unknown TRANSLATION_ENGINE: {engine}')
+
+
+def chunk_texts(texts, max_items=50, max_chars=4000):
+    """Split texts into size-bounded chunks for batched translation"""
+    chunk = []
+    chunk_chars = 0
+    for text in texts:
+        if chunk and (len(chunk) >= max_items or chunk_chars + len(text) > max_chars):
+            yield chunk
+            chunk = []
+            chunk_chars = 0
+        chunk.append(text)
+        chunk_chars += len(text)
+    if chunk:
+        yield chunk
@@ -22,6 +22,9 @@
     const [isLoading, setIsLoading] = useState(false);
     const [currentPage, setCurrentPage] = useState(1);
     const [totalPages, setTotalPages] = useState(1);
+    const [hasNext, setHasNext] = useState(false);
+    // pageCursors[n] is the cursor that fetches page n + 1 (page 1 needs none)
+    const [pageCursors, setPageCursors] = useState([null]);
     const [error, setError] = useState('');
 
     // Fetch history when component opens
@@ -37,7 +40,9 @@
       setError('');
       
       try {
-        const response = await fetch(`http://localhost:5000/api/history?page=${currentPage}&per_page=10`, {
+        const cursor = pageCursors[currentPage - 1];
+        const query = cursor ? `cursor=${encodeURIComponent(cursor)}` : `page=${currentPage}`;
+        const response = await fetch(`http://localhost:5000/api/history?${query}&per_page=10&summary=1`, {
           credentials: 'include'
         });
         
@@ -48,6 +53,14 @@
         const data = await response.json();
         setHistory(data.translations);
         setTotalPages(data.pages);
+        setHasNext(data.has_next);
+        if (data.next_cursor) {
+          setPageCursors(prev => {
+            const next = prev.slice(0, currentPage);
+            next[currentPage] = data.next_cursor;
+            return next;
+          });
+        }
       } catch (err) {
         setError('Failed to load translation history');
         console.error('History fetch error:', err);
@@ -71,6 +84,24 @@
       }
     };
 
+    // List entries are summaries; load the texts when one is opened
+    const selectTranslation = async (translationId) => {
+      try {
+        const response = await fetch(`http://localhost:5000/api/history/${translationId}`, {
+          credentials: 'include'
+        });
+        
+        if (!response.ok) {
+          throw new Error('Failed to fetch translation');
+        }
+        
+        setSelectedTranslation(await response.json());
+      } catch (err) {
+        setError('Failed to load translation');
+        console.error('Translation fetch error:', err);
+      }
+    };
+
     const deleteTranslation = async (translationId) => {
       if (!window.confirm('Are you sure you want to delete this translation?')) return;
       
@@ -110,6 +141,10 @@
         setHistory([]);
         setStats(null);
         setSelectedTranslation(null);
+        setPageCursors([null]);
+        setCurrentPage(1);
+        setTotalPages(1);
+        setHasNext(false);
         fetchStats();
       } catch (err) {
         setError('Failed to clear history');
@@ -204,7 +239,7 @@
                             ? 'bg-indigo-50 border border-indigo-200'
                             : 'hover:bg-gray-50 border border-transparent'
                         }`}
-                        onClick={() => setSelectedTranslation(translation)}
+                        onClick={() => selectTranslation(translation.id)}
                       >
                         <div className="flex items-center justify-between">
                           <div className="flex items-center">
@@ -219,7 +254,7 @@
                         </div>
                         <div className="flex items-center justify-between mt-2">
                           <span className="text-xs text-gray-500">
-                            {translation.original_texts.length} texts found
+                            {translation.text_count ?? 0} texts found
                           </span>
                           <span className="text-xs text-gray-500">
                             {formatDate(translation.created_at).split(',')[0]}
@@ -246,8 +281,8 @@
                       {currentPage} of {totalPages}
                     </span>
                     <button
-                      onClick={() => setCurrentPage(prev => Math.min(totalPages, prev + 1))}
-                      disabled={currentPage === totalPages}
+                      onClick={() => setCurrentPage(prev => prev + 1)}
+                      disabled={!hasNext}
                       className="px-3 py-1 text-sm border rounded disabled:opacity-50"
                     >
                       Next
@@ -291,6 +326,17 @@
                       </div>
                     </div>
 
+                    {selectedTranslation.processed_image_url && (
+                      <div>
+                        <label className="text-sm font-medium text-gray-600">Processed Image:</label>
+                        <img
+                          src={`http://localhost:5000${selectedTranslation.processed_image_url}`}
+                          alt="Translated"
+                          className="mt-1 max-h-64 object-contain rounded-lg border"
+                        />
+                      </div>
+                    )}
+
                     <div>
                       <label className="text-sm font-medium text-gray-600">Processing Time:</label>
                       <p className="text-gray-800">{selectedTranslation.processing_time}s</p>
@@ -37,25 +37,39 @@ const Translator = () => {
 
       console.log("Sending request to backend...");
 
-      const response = await fetch("http://localhost:5000/api/translate", {
+      // Streaming endpoint: one JSON event per line as the pipeline progresses
+      const response = await fetch("http://localhost:5000/api/translate/stream", {
         method: "POST",
         body: formData,
         credentials: "include",
       });
 
-      const data = await response.json();
-      console.log("Backend response:", data);
-      console.log("Original texts:", data.original_texts);
-      console.log("Translated texts:", data.translated_texts);
-      
-      if (!response.ok) throw new Error(data.error || "Translation failed");
+      if (!response.ok) {
+        const data = await response.json();
+        throw new Error(data.error || "Translation failed");
+      }
+
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffered = "";
+      let finished = false;
+
+      while (!finished) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffered += decoder.decode(value, { stream: true });
 
-      // Verify data structure before setting result
-      if (!data.original_texts || !data.translated_texts) {
-        throw new Error("Invalid response format from server");
+        const lines = buffered.split("\n");
+        buffered = lines.pop();
+        for (const line of lines) {
+          if (!line.trim()) continue;
+          finished = handleStreamEvent(JSON.parse(line)) || finished;
+        }
       }
 
-      setResult(data);
+      if (!finished) {
+        throw new Error("Connection closed before translation finished");
+      }
     } catch (err) {
       console.error("Translation error:", err);
       setError(err.message);
@@ -64,6 +78,48 @@ const Translator = () => {
     }
   };
 
+  // Apply one streamed pipeline event to the result; returns true once finished
+  const handleStreamEvent = (event) => {
+    console.log("Stream event:", event.event);
+
+    switch (event.event) {
+      case "ocr": {
+        const texts = event.text_blocks.map((block) => block.text);
+        setResult({
+          original_texts: texts,
+          translated_texts: texts.map(() => null),
+          text_blocks: event.text_blocks,
+          processed_image_url: null,
+        });
+        return false;
+      }
+      case "translation":
+        setResult((prev) => {
+          if (!prev) return prev;
+          const translated = [...prev.translated_texts];
+          translated[event.index] = event.translated_text;
+          return { ...prev, translated_texts: translated };
+        });
+        return false;
+      case "image":
+        setResult((prev) => (prev ? { ...prev, processed_image_url: event.processed_image_url } : prev));
+        return false;
+      case "done": {
+        const { event: _event, ...data } = event;
+        // Verify data structure before setting result
+        if (!data.original_texts || !data.translated_texts) {
+          throw new Error("Invalid response format from server");
+        }
+        setResult(data);
+        return true;
+      }
+      case "error":
+        throw new Error(event.error || "Translation failed");
+      default:
+        return false;
+    }
+  };
+
   return (
     <div className="max-w-3xl mx-auto p-6 bg-white rounded-xl shadow-lg">
       <h2 className="text-2xl font-semibold text-gray-800 mb-4 flex items-center gap-2">
@@ -152,11 +208,11 @@ const Translator = () => {
           )}
 
           {/* Processed Image */}
-          {result.processed_image && (
+          {result.processed_image_url && (
             <div className="mb-4">
               <h4 className="text-sm font-medium text-gray-600 mb-2">Processed Image:</h4>
               <img
-                src={`data:image/png;base64,${result.processed_image}`}
+                src={`http://localhost:5000${result.processed_image_url}`}
                 alt="Translated"
                 className="mx-auto max-h-80 object-contain rounded-lg border"
               />
@@ -185,6 +241,8 @@ const Translator = () => {
                       <p className="font-medium text-green-700 bg-green-50 p-2 rounded border border-green-200">
                         {result.translated_texts && result.translated_texts[i] 
                           ? result.translated_texts[i] 
+                          : loading
+                          ? "Translating..."
                           : "Translation not available"}
                       </p>
                     </div>